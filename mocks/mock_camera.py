@@ -2,14 +2,19 @@
 import numpy as np
 import time
 import random
+from tb_ir.frame import Frame
+from tb_ir.palette import Colouriser
 
 class MockCameraController:
-    def __init__(self):
+    def __init__(self, acquisition_mode="raw", colouriser=None):
         self.palette_width = 80
         self.palette_height = 60
         self.thermal_width = 80
         self.thermal_height = 60
         self.opened = True
+        self.fps = 32
+        self.acquisition_mode = acquisition_mode
+        self.colouriser = colouriser if colouriser is not None else Colouriser()
         self._t0 = time.time()
 
     def read_frame(self):
@@ -22,5 +27,21 @@ class MockCameraController:
             temp_c = 22.0 + random.uniform(-0.5, 0.5)
         return rgb, temp_c
 
+    def get_frame(self):
+        # Gleiche Schnittstelle wie CameraController: Frame mit Rohdaten (Rohwert = (T + 100) * 10)
+        time.sleep(1.0 / self.fps)  # Bildrate der echten Kamera nachbilden
+        rgb, temp_c = self.read_frame()
+        raw = int(round((temp_c + 100.0) * 10.0))
+        thermal = np.full((self.thermal_height, self.thermal_width), raw, dtype=np.uint16)
+        if self.acquisition_mode == "raw":
+            # Wie die echte Kamera: Palette erst beim ersten Zugriff auf frame.image
+            frame = Frame(thermal=thermal, temp=temp_c)
+            frame.defer_image(self.colouriser.render)
+            return frame
+        return Frame(image=rgb, thermal=thermal, temp=temp_c)
+
+    def shutdown(self):
+        self.release()
+
     def release(self):
         self.opened = False
@@ -16,10 +16,10 @@ class MockFrameDatabase:
 
     def insert_frame(self, frame):
         """
-        Store the frame with the current timestamp in memory.
+        Store a copy of the frame image with its capture timestamp in memory.
         """
-        self.frame_buffer.append(frame)
-        self.timestamp_buffer.append(time.time())
+        self.frame_buffer.append(frame.image.copy())
+        self.timestamp_buffer.append(frame.timestamp if frame.timestamp is not None else time.time())
         logging.info(f"[MOCK DB] Frame stored (total {len(self.frame_buffer)} frames).")
 
     def get_frames_from_last_n_seconds(self, seconds=10):
@@ -34,6 +34,14 @@ class MockFrameDatabase:
         logging.info(f"[MOCK DB] Returning {len(frames)} frames from last {seconds} seconds.")
         return frames
 
+    def writer_stats(self):
+        """
+        Same keys as FrameDatabase.writer_stats(); the mock stores synchronously.
+        """
+        return {"written": len(self.frame_buffer), "dropped": 0, "batches": 0,
+                "queued": 0, "lag_ms_last": 0.0, "lag_ms_max": 0.0,
+                "pruned": 0, "vacuumed_pages": 0}
+
     def close(self):
         """
         Clear the buffer (simulating DB close).
@@ -0,0 +1,152 @@
+# replay_camera.py
+import time
+from pathlib import Path
+import numpy as np
+from tb_ir.frame_pool import FramePool
+from tb_ir.palette import Colouriser
+from tb_ir.radiometric import METADATA_DTYPE, RadiometricRecording
+
+# Aufzeichnungsformat (Verzeichnis):
+#   frames.npy    (N, H, W) uint16  Rohwerte wie vom SDK, per mmap gelesen
+#   metadata.npy  strukturiertes Array mit METADATA_DTYPE, ein Eintrag je Frame (optional)
+# oder eine radiometrische Aufnahme (.tbr, tb_ir/radiometric.py) von record_video
+FRAMES_FILE = "frames.npy"
+METADATA_FILE = "metadata.npy"
+
+
+def record_sequence(cam, path, count):
+    """
+    Nimmt count Frames von einer Kamera (CameraController-Schnittstelle) auf und
+    schreibt sie im Replay-Format nach path. Die Frames gehen direkt in ein
+    memmap-Array, es wird nichts im RAM gesammelt.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    frames = None
+    metadata = np.zeros(count, dtype=METADATA_DTYPE)
+    for i in range(count):
+        frame = cam.get_frame()
+        try:
+            if frames is None:
+                frames = np.lib.format.open_memmap(
+                    path / FRAMES_FILE, mode="w+", dtype=np.uint16, shape=(count,) + frame.thermal.shape)
+            frames[i] = frame.thermal
+            metadata[i] = (
+                time.time(),
+                frame.counter or 0, frame.counter_hw or 0, frame.hw_timestamp or 0, frame.flag_state or 0,
+                frame.temp_chip or 0.0, frame.temp_flag or 0.0, frame.temp_box or 0.0)
+        finally:
+            frame.release()
+    if frames is not None:
+        frames.flush()
+    np.save(path / METADATA_FILE, metadata)
+
+
+class ReplayCameraController:
+    """
+    Spielt eine aufgezeichnete Rohdaten-Sequenz mit der Schnittstelle des
+    CameraController ab (get_frame() -> gepoolter Frame, shutdown()).
+
+    speed=1.0 spielt in Echtzeit (Abstände aus metadata.timestamp bzw. fps),
+    speed=4.0 viermal so schnell, speed=0 so schnell wie möglich.
+    Die Datei wird nur gemappt, jeder Frame wird einmal in den Pool-Puffer kopiert.
+    path ist ein Aufnahme-Verzeichnis oder eine .tbr-Datei.
+    """
+    def __init__(self, path, speed=1.0, fps=32, loop=True, pool_size=16, colouriser=None):
+        path = Path(path)
+        if path.is_file():
+            # Radiometrische Aufnahme: Frames und Metadaten sind Views auf dasselbe memmap
+            recording = RadiometricRecording(path)
+            if len(recording) == 0:
+                raise RuntimeError(f"Replay file {path} contains no frames")
+            self.frames, self.metadata = recording.thermal, recording.metadata
+            fps = recording.fps or fps
+        else:
+            self.frames = np.load(path / FRAMES_FILE, mmap_mode="r")
+            if self.frames.ndim != 3 or self.frames.dtype != np.uint16:
+                raise RuntimeError(f"Invalid replay file {path / FRAMES_FILE}: {self.frames.dtype} {self.frames.shape}")
+            metadata_path = path / METADATA_FILE
+            self.metadata = np.load(metadata_path) if metadata_path.exists() else None
+            if self.metadata is not None and len(self.metadata) != len(self.frames):
+                raise RuntimeError("Replay metadata does not match frame count")
+
+        self.count, self.thermal_height, self.thermal_width = self.frames.shape
+        self.palette_height, self.palette_width = self.thermal_height, self.thermal_width
+        self.speed = speed
+        self.fps = fps
+        self.loop = loop
+        self.colouriser = colouriser if colouriser is not None else Colouriser()
+        self.pool = FramePool(
+            thermal_shape=(self.thermal_height, self.thermal_width),
+            palette_shape=(self.thermal_height, self.thermal_width, 3),
+            size=pool_size)
+        self.index = 0
+        self.loops = 0
+        self.opened = True
+        self._next_due = None
+        self._intervals = self._frame_intervals()
+        self._counter_span = self._counter_hw_span = self.count
+        # Aufnahmen ohne SDK-Metadaten (Webcam/Mock) haben nur Nullen -> Zähler synthetisch erzeugen
+        self._has_counters = self.metadata is not None and bool(self.metadata["counter_hw"].any())
+        if self._has_counters:
+            self._counter_span = int(self.metadata["counter"][-1]) - int(self.metadata["counter"][0]) + 1
+            self._counter_hw_span = int(self.metadata["counter_hw"][-1]) - int(self.metadata["counter_hw"][0]) + 1
+        print(f"Replay camera: {self.count} frames {self.thermal_width}x{self.thermal_height} from {path} (speed {speed})")
+
+    def _frame_intervals(self):
+        # Sollabstand vor jedem Frame in Sekunden (Originaltakt)
+        default = 1.0 / self.fps
+        if self.metadata is None or self.count < 2:
+            return np.full(self.count, default)
+        intervals = np.diff(self.metadata["timestamp"], prepend=self.metadata["timestamp"][0] - default)
+        intervals[(intervals <= 0) | (intervals > 1.0)] = default
+        return intervals
+
+    def _wait_for_slot(self):
+        if self.speed <= 0:
+            return
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        else:
+            self._next_due += self._intervals[self.index] / self.speed
+            # Hinterher (z. B. Debugger): nicht aufholen, sondern neu synchronisieren
+            if now - self._next_due > 1.0:
+                self._next_due = now
+        delay = self._next_due - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def get_frame(self):
+        if not self.opened:
+            raise RuntimeError("Replay camera is closed.")
+        if self.index >= self.count:
+            if not self.loop:
+                raise RuntimeError("Replay finished.")
+            self.index = 0
+            self.loops += 1
+        self._wait_for_slot()
+
+        frame = self.pool.acquire()
+        np.copyto(frame.thermal, self.frames[self.index])
+        if self._has_counters:
+            meta = self.metadata[self.index]
+            # Zähler über Schleifen hinweg fortsetzen, sonst sieht die Drop-Statistik einen Reset
+            frame.counter = int(meta["counter"]) + self.loops * self._counter_span
+            frame.counter_hw = int(meta["counter_hw"]) + self.loops * self._counter_hw_span
+            frame.hw_timestamp = int(meta["hw_timestamp"])
+            frame.flag_state = int(meta["flag_state"])
+            frame.temp_chip = float(meta["temp_chip"])
+            frame.temp_flag = float(meta["temp_flag"])
+            frame.temp_box = float(meta["temp_box"])
+        else:
+            frame.counter = frame.counter_hw = self.loops * self.count + self.index
+        frame.temp = None
+        frame.stats = None
+        frame.defer_image(self.colouriser.render)
+        self.index += 1
+        return frame
+
+    def shutdown(self):
+        self.opened = False
+        self.frames = None
@@ -0,0 +1,166 @@
+# synthetic_camera.py
+import json
+import time
+import numpy as np
+from tb_ir.frame_pool import FramePool
+from tb_ir.palette import Colouriser
+from tb_ir.thermal_stats import RAW_SCALE, celsius_to_raw
+
+NOISE_BANK_SIZE = 16  # vorberechnete Rauschbilder, pro Frame wird nur eines addiert (640x480: ~10 MB)
+
+
+class _HotSpot:
+    """
+    Gauß-förmiger Hotspot, als Rohwert-Delta einmal vorberechnet.
+    Bewegt sich mit (vx, vy) Pixel/s und prallt an den Bildrändern ab.
+    """
+    def __init__(self, x, y, radius, temp, base_temp, vx=0.0, vy=0.0):
+        self.x, self.y = float(x), float(y)
+        self.vx, self.vy = float(vx), float(vy)
+        self.radius = int(radius)
+        size = 2 * self.radius + 1
+        yy, xx = np.mgrid[:size, :size] - self.radius
+        sigma = max(self.radius / 2.0, 0.5)
+        gauss = np.exp(-(xx ** 2 + yy ** 2) / (2.0 * sigma ** 2))
+        self.kernel = np.round(gauss * max(temp - base_temp, 0.0) * RAW_SCALE).astype(np.uint16)
+
+    def position(self, t, width, height):
+        return _bounce(self.x + self.vx * t, width - 1), _bounce(self.y + self.vy * t, height - 1)
+
+    def stamp(self, thermal, cx, cy):
+        # Kernel auf den sichtbaren Bildausschnitt zuschneiden und addieren
+        height, width = thermal.shape
+        r = self.radius
+        x0, y0 = int(round(cx)) - r, int(round(cy)) - r
+        x1, y1 = x0 + self.kernel.shape[1], y0 + self.kernel.shape[0]
+        ix0, iy0, ix1, iy1 = max(x0, 0), max(y0, 0), min(x1, width), min(y1, height)
+        if ix1 <= ix0 or iy1 <= iy0:
+            return
+        thermal[iy0:iy1, ix0:ix1] += self.kernel[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0]
+
+
+def _bounce(pos, limit):
+    if limit <= 0:
+        return 0.0
+    period = 2.0 * limit
+    pos = pos % period
+    return period - pos if pos > limit else pos
+
+
+class SyntheticCameraController:
+    """
+    Lastgenerator mit der Schnittstelle des CameraController.
+
+    Auflösung, Bildrate (fps=0: ungebremst), Rauschen, bewegte Hotspots und
+    ein Anomalie-Fahrplan sind frei konfigurierbar. Hintergrund, Rauschen und
+    Hotspot-Kernel werden einmal vorberechnet; pro Frame bleiben eine
+    vektorisierte Addition in den Pool-Puffer und je Hotspot ein Slice-Add.
+
+    anomalies: [{"at": s, "duration": s, "temp": °C, "x": px, "y": px,
+                 "radius": px, "every": s (optional, wiederholt)}]
+    """
+    def __init__(self, width=382, height=288, fps=32, base_temp=22.0, gradient=2.0, noise=0.3,
+                 hot_spots=None, anomalies=None, link_drop_rate=0.0, seed=0, pool_size=16, colouriser=None):
+        self.thermal_width, self.thermal_height = int(width), int(height)
+        self.palette_width, self.palette_height = self.thermal_width, self.thermal_height
+        self.fps = fps
+        self.base_temp = base_temp
+        self.link_drop_rate = link_drop_rate
+        self.rng = np.random.default_rng(seed)
+        self.colouriser = colouriser if colouriser is not None else Colouriser()
+        self.pool = FramePool(
+            thermal_shape=(self.thermal_height, self.thermal_width),
+            palette_shape=(self.thermal_height, self.thermal_width, 3),
+            size=pool_size)
+
+        # Rauschen als uint16 mit Offset, damit Hintergrund + Rauschen ohne Vorzeichen/Clipping addiert werden kann
+        noise_raw = max(int(round(noise * RAW_SCALE)), 0)
+        self._noise_offset = 4 * noise_raw
+        bank = self.rng.normal(0.0, noise_raw, size=(NOISE_BANK_SIZE, self.thermal_height, self.thermal_width))
+        np.clip(bank, -self._noise_offset, self._noise_offset, out=bank)
+        self._noise_bank = (np.round(bank) + self._noise_offset).astype(np.uint16)
+
+        # Hintergrund: Grundtemperatur mit leichtem vertikalem Gradienten
+        rows = np.linspace(0.0, gradient, self.thermal_height, dtype=np.float64)[:, None]
+        background = celsius_to_raw(base_temp) + np.round(rows * RAW_SCALE) - self._noise_offset
+        self._background = np.ascontiguousarray(
+            np.broadcast_to(background, (self.thermal_height, self.thermal_width))).astype(np.uint16)
+
+        self.hot_spots = [_HotSpot(base_temp=base_temp, **spot) for spot in (hot_spots or [])]
+        self.anomalies = []
+        for anomaly in anomalies or []:
+            spot = _HotSpot(anomaly["x"], anomaly["y"], anomaly.get("radius", 6), anomaly["temp"], base_temp)
+            self.anomalies.append((float(anomaly["at"]), float(anomaly.get("duration", 3.0)),
+                                   anomaly.get("every"), spot))
+
+        self.index = 0
+        self.counter_hw = 0
+        self.opened = True
+        self._next_due = None
+        print(f"Synthetic camera: {self.thermal_width}x{self.thermal_height} @ {fps} fps, "
+              f"{len(self.hot_spots)} hot spot(s), {len(self.anomalies)} scripted anomaly(ies)")
+
+    @classmethod
+    def from_config(cls, source, **kwargs):
+        """
+        source: Pfad zu einer JSON-Datei mit den Konstruktor-Parametern, "1" = Standardwerte.
+        """
+        config = {}
+        if source and source != "1":
+            with open(source, "r") as f:
+                config = json.load(f)
+        config.update(kwargs)
+        return cls(**config)
+
+    def _wait_for_slot(self):
+        if not self.fps:
+            return
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        else:
+            self._next_due += 1.0 / self.fps
+            if now - self._next_due > 1.0:
+                self._next_due = now
+        delay = self._next_due - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _anomaly_active(self, t, at, duration, every):
+        if t < at:
+            return False
+        if every:
+            return (t - at) % float(every) < duration
+        return t - at < duration
+
+    def get_frame(self):
+        if not self.opened:
+            raise RuntimeError("Synthetic camera is closed.")
+        self._wait_for_slot()
+        # Szenenzeit: bei fps=0 aus dem Frame-Index, damit der Fahrplan reproduzierbar bleibt
+        t = self.index / self.fps if self.fps else self.index / 32.0
+
+        frame = self.pool.acquire()
+        thermal = frame.thermal
+        np.add(self._background, self._noise_bank[self.index % NOISE_BANK_SIZE], out=thermal)
+        for spot in self.hot_spots:
+            spot.stamp(thermal, *spot.position(t, self.thermal_width, self.thermal_height))
+        for at, duration, every, spot in self.anomalies:
+            if self._anomaly_active(t, at, duration, every):
+                spot.stamp(thermal, spot.x, spot.y)
+
+        self.counter_hw += 1
+        if self.link_drop_rate and self.rng.random() < self.link_drop_rate:
+            self.counter_hw += 1  # simulierter Verlust zwischen Sensor und SDK (USB)
+        frame.counter = self.index
+        frame.counter_hw = self.counter_hw
+        frame.hw_timestamp = int(t * 1e9)
+        frame.flag_state = 0
+        frame.temp = None
+        frame.stats = None
+        frame.defer_image(self.colouriser.render)
+        self.index += 1
+        return frame
+
+    def shutdown(self):
+        self.opened = False
@@ -3,5 +3,7 @@
 DB_PATH : str = 'prozess.db'
 SERVER_URL : str = "http://localhost:4001"
 MAX_ROWS : int = 10000
+MAX_DB_BYTES : int = 512 * 1024 * 1024
+MAX_FRAME_AGE_S : float = 24 * 3600
 BUFFER_SIZE : int = 3000
 SLEEP_TIME : float = 0.02
\ No newline at end of file
@@ -7,6 +7,7 @@ from tb_main_helper import AppContext
 from logging import DEBUG, Logger
 from tb_queue_test import Tb_QueueTest
 from pathlib import Path
+from tb_ir.acquisition_metrics import AcquisitionMetrics
 
 @dataclass
 class Errors():
@@ -55,6 +56,16 @@ def check_queue_test(logger: Logger,queueTest : Tb_QueueTest, counter : int) ->
             logger.debug(f"QueueTest {queueTest.name}: okay")
         queueTest.started = False
 
+def log_ir_metrics(logger: Logger, metrics: AcquisitionMetrics, counter : int) -> None:
+    if counter != 0:
+        return
+    stats = metrics.snapshot()
+    logger.debug(
+        f"IR Akquisition: frames={stats['frames']} errors={stats['errors']} "
+        f"sensor_dropped={stats['sensor_dropped']} link_dropped={stats['link_dropped']} "
+        f"loop_dropped={stats['loop_dropped']} bus_dropped={stats['bus_dropped']} "
+        f"sdk_call_mean_ms={stats['sdk_call']['mean_ms']} consume_latency_max_ms={stats['consume_latency']['max_ms']}")
+
 def main ():
     counter : int = 0
     loop_forever : bool = False
@@ -119,6 +130,8 @@ def main ():
                 errors.test_queues_ir = True # type: ignore
 
             errors.heartbeat = app.heartbeat.run(cnt=counter)
+
+            log_ir_metrics(logger=logger_main, metrics=app.ir_metrics, counter=counter)
             
             # Error handling - Server process   
             if not errors.server and app.events_server.error_from_server_process.wait(timeout=0):
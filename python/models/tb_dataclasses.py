@@ -20,6 +20,7 @@ class SocketEventsFromBackend(Enum):
     REQ_MANUAL_CALL_RECORD = "REQ_MANUAL_CALL_RECORD"
     REQ_CALL_LIVE_TEMPRETURE = "REQ_CALL_LIVE_TEMPRETURE"
     REQ_CALL_HISTORY_TEMPRETURE = "REQ_CALL_HISTORY_TEMPRETURE"
+    REQ_CALL_ACQUISITION_STATS = "REQ_CALL_ACQUISITION_STATS"
     REQ_SET_EVENT = "REQ_SET_EVENT"
     MESSAGE = "MESSAGE"
 
@@ -35,6 +36,7 @@ class SocketEventsToBackend(Enum):
     ACK_MANUAL_CALL_RECORD = "ACK_MANUAL_CALL_RECORD"
     ACK_CALL_LIVE_TEMPRETURE = "ACK_CALL_LIVE_TEMPRETURE"
     ACK_CALL_HISTORY_TEMPRETURE = "ACK_CALL_HISTORY_TEMPRETURE"
+    ACK_CALL_ACQUISITION_STATS = "ACK_CALL_ACQUISITION_STATS"
     ACK_SET_EVENT = "ACK_SET_EVENT"
     ACK_MESSAGE = "ACK_MESSAGE"
     REQ_TEST = "REQ_TEST"
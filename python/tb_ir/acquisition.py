@@ -0,0 +1,66 @@
+import threading
+import time
+import logging
+from tb_ir.thermal_stats import ThermalStatsEngine
+
+
+class AcquisitionThread(threading.Thread):
+    """
+    Owns the CameraController and is the only caller of cam.get_frame().
+    Every grabbed frame gets its ThermalStats computed once and is then
+    published exactly once on the FrameBus.
+
+    metrics (AcquisitionMetrics, optional) receives the SDK call duration of
+    every frame and the counter gaps derived from its metadata.
+    """
+    def __init__(self, cam, bus, stats_engine=None, error_backoff_s=1.0, metrics=None):
+        super().__init__(name="ir_acquisition", daemon=True)
+        self.cam = cam
+        self.bus = bus
+        self.stats_engine = stats_engine if stats_engine is not None else ThermalStatsEngine()
+        self.error_backoff_s = error_backoff_s
+        self.metrics = metrics
+        self._stop_event = threading.Event()
+        self.frames = 0
+        self.errors = 0
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+    def run(self):
+        logging.info("[ACQ] Acquisition thread started.")
+        while not self._stop_event.is_set():
+            call_start = time.perf_counter()
+            try:
+                frame = self.cam.get_frame()
+                timestamp = time.time()
+            except Exception as e:
+                self.errors += 1
+                if self.metrics is not None:
+                    self.metrics.record_error(time.perf_counter() - call_start)
+                logging.error(f"[ACQ] Camera error: {e}")
+                self._stop_event.wait(self.error_backoff_s)
+                continue
+            # thermal first: reading .image would render a raw-only frame here
+            if frame is None or (frame.thermal is None and frame.image is None):
+                self.errors += 1
+                if self.metrics is not None:
+                    self.metrics.record_error(time.perf_counter() - call_start)
+                if frame is not None:
+                    frame.release()
+                self._stop_event.wait(self.error_backoff_s)
+                continue
+            sdk_call_s = time.perf_counter() - call_start
+            if frame.thermal is not None:
+                frame.stats = self.stats_engine.compute(frame.thermal)
+                if frame.stats is not None:
+                    frame.temp = frame.stats.mean
+            if self.metrics is not None:
+                self.metrics.record_frame(frame, sdk_call_s)
+            self.bus.publish(frame, timestamp)
+            # bus and subscribers hold their own references now
+            frame.release()
+            self.frames += 1
+        logging.info("[ACQ] Acquisition thread stopped.")
@@ -0,0 +1,156 @@
+import multiprocessing
+
+# Upper bucket edges in milliseconds, the last bucket collects everything above
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+COUNTER_WRAP = 2 ** 32  # EvoIRFrameMetadata.counter / counterHW are c_uint
+
+_COUNTERS = (
+    "frames",           # frames published on the bus
+    "errors",           # failed get_frame() calls / empty frames
+    "duplicates",       # SDK returned the same frame twice (counter unchanged)
+    "sensor_dropped",   # gaps in counterHW: sensor frames we never received
+    "loop_dropped",     # gaps in counter: frames the SDK had but our loop was too slow for
+    "link_dropped",     # sensor gaps not seen by the SDK: lost between sensor and SDK (USB)
+    "bus_dropped",      # frames dropped by overflowing bus subscribers
+    "counter_resets",   # counter went backwards (camera / SDK restart)
+)
+_HISTOGRAMS = ("sdk_call", "consume_latency")
+_HIST_FIELDS = len(LATENCY_BUCKETS_MS) + 3  # buckets + overflow, sum_ms, max_ms
+
+
+class AcquisitionMetrics:
+    """
+    Acquisition counters and latency histograms in shared memory.
+
+    Created by the supervisor (main process) and handed to Tb_IrProcess; the
+    acquisition thread and the detection loop write, main.py and the backend
+    handler read snapshot(). The last counter values used for gap detection
+    are kept in the writing process only.
+    """
+    def __init__(self):
+        self._values = multiprocessing.Array("d", len(_COUNTERS) + len(_HISTOGRAMS) * _HIST_FIELDS)
+        self._last_counter = None
+        self._last_counter_hw = None
+
+    def __getstate__(self):
+        return {"_values": self._values}
+
+    def __setstate__(self, state):
+        self._values = state["_values"]
+        self._last_counter = None
+        self._last_counter_hw = None
+
+    @staticmethod
+    def _counter_index(name):
+        return _COUNTERS.index(name)
+
+    @staticmethod
+    def _hist_offset(name):
+        return len(_COUNTERS) + _HISTOGRAMS.index(name) * _HIST_FIELDS
+
+    def _observe(self, name, seconds):
+        # Caller holds the lock
+        ms = seconds * 1000.0
+        offset = self._hist_offset(name)
+        bucket = len(LATENCY_BUCKETS_MS)
+        for i, edge in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= edge:
+                bucket = i
+                break
+        values = self._values
+        values[offset + bucket] += 1
+        values[offset + len(LATENCY_BUCKETS_MS) + 1] += ms
+        if ms > values[offset + len(LATENCY_BUCKETS_MS) + 2]:
+            values[offset + len(LATENCY_BUCKETS_MS) + 2] = ms
+
+    @staticmethod
+    def _gap(last, current):
+        """
+        Missing frames between two counter values, None for a reset.
+        """
+        delta = (current - last) % COUNTER_WRAP
+        if delta > COUNTER_WRAP // 2:
+            return None
+        return delta - 1
+
+    def record_frame(self, frame, sdk_call_s):
+        """
+        Called by the acquisition thread for every frame it publishes.
+        """
+        loop_gap = sensor_gap = 0
+        reset = duplicate = False
+        if frame.counter is not None and self._last_counter is not None:
+            gap = self._gap(self._last_counter, frame.counter)
+            if gap is None:
+                reset = True
+            elif gap < 0:
+                duplicate = True
+            else:
+                loop_gap = gap
+        if frame.counter_hw is not None and self._last_counter_hw is not None and not reset:
+            gap = self._gap(self._last_counter_hw, frame.counter_hw)
+            if gap is None:
+                reset = True
+            elif gap > 0:
+                sensor_gap = gap
+        if frame.counter is not None:
+            self._last_counter = frame.counter
+        if frame.counter_hw is not None:
+            self._last_counter_hw = frame.counter_hw
+
+        values = self._values
+        with values.get_lock():
+            values[self._counter_index("frames")] += 1
+            if reset:
+                values[self._counter_index("counter_resets")] += 1
+            elif duplicate:
+                values[self._counter_index("duplicates")] += 1
+            else:
+                values[self._counter_index("loop_dropped")] += loop_gap
+                values[self._counter_index("sensor_dropped")] += sensor_gap
+                values[self._counter_index("link_dropped")] += max(0, sensor_gap - loop_gap)
+            self._observe("sdk_call", sdk_call_s)
+
+    def record_error(self, sdk_call_s=None):
+        values = self._values
+        with values.get_lock():
+            values[self._counter_index("errors")] += 1
+            if sdk_call_s is not None:
+                self._observe("sdk_call", sdk_call_s)
+
+    def record_consume(self, latency_s, bus_dropped=None):
+        """
+        Called by the consumer (detection loop) with capture-to-consume latency.
+        """
+        values = self._values
+        with values.get_lock():
+            self._observe("consume_latency", latency_s)
+            if bus_dropped is not None:
+                values[self._counter_index("bus_dropped")] = bus_dropped
+
+    def snapshot(self):
+        """
+        Consistent copy of all counters and histograms as a dict.
+        """
+        with self._values.get_lock():
+            values = list(self._values)
+        result = {name: int(values[i]) for i, name in enumerate(_COUNTERS)}
+        for name in _HISTOGRAMS:
+            offset = self._hist_offset(name)
+            buckets = values[offset:offset + len(LATENCY_BUCKETS_MS) + 1]
+            count = int(sum(buckets))
+            sum_ms = values[offset + len(LATENCY_BUCKETS_MS) + 1]
+            result[name] = {
+                "buckets_ms": {f"<={edge}": int(n) for edge, n in zip(LATENCY_BUCKETS_MS, buckets)},
+                "overflow": int(buckets[-1]),
+                "count": count,
+                "mean_ms": sum_ms / count if count else None,
+                "max_ms": values[offset + len(LATENCY_BUCKETS_MS) + 2] if count else None,
+            }
+        return result
+
+    def reset(self):
+        with self._values.get_lock():
+            for i in range(len(self._values)):
+                self._values[i] = 0.0
@@ -0,0 +1,184 @@
+import time
+import logging
+from tb_ir.frame import Frame
+from tb_ir.mjpeg_avi import MjpegAviWriter, jpeg_size
+from tb_ir.event_session import EventSession
+
+SEGMENT_POLL_S = 0.5
+
+
+class _ClipWriter:
+    """
+    Opens the MJPG muxer lazily with the size of the first frame.
+    Raw thermal frames (2-D) are coloured with the shared colouriser into
+    one scratch buffer and encoded once; stored JPEGs go in unchanged.
+    release() sets the container rate measured from the capture timestamps.
+    """
+    def __init__(self, filename, fps, colouriser, writer_factory=MjpegAviWriter):
+        self.filename = filename
+        self.fps = fps
+        self.colouriser = colouriser
+        self.writer_factory = writer_factory
+        self.writer = None
+        self.frames = 0
+        self.first_ts = None
+        self.last_ts = None
+        self._scratch = None
+
+    def _mark(self, timestamp):
+        if timestamp is None:
+            return
+        if self.first_ts is None:
+            self.first_ts = timestamp
+        self.last_ts = timestamp
+
+    def write(self, data, timestamp=None):
+        if data.ndim == 2:
+            self._scratch = self.colouriser.render(Frame(thermal=data), self._scratch)
+            data = self._scratch
+        if self.writer is None:
+            height, width = data.shape[:2]
+            self.writer = self.writer_factory(self.filename, width, height, self.fps)
+        self.writer.write(data)
+        self.frames += 1
+        self._mark(timestamp)
+
+    def write_jpeg(self, data, timestamp=None):
+        if self.writer is None:
+            self.writer = self.writer_factory(self.filename, *jpeg_size(data), fps=self.fps)
+        self.writer.write_jpeg(data)
+        self.frames += 1
+        self._mark(timestamp)
+
+    def release(self):
+        if self.writer is None:
+            return
+        if self.frames > 1 and self.last_ts > self.first_ts:
+            self.writer.set_fps((self.frames - 1) / (self.last_ts - self.first_ts))
+        self.writer.release()
+
+
+def write_anomaly_clip(bus, ring, colouriser, filename, event_time, pre_seconds, post_seconds, fps=32,
+                       should_stop=lambda: False, db=None, session=None, writer_factory=MjpegAviWriter):
+    """
+    Writes pre-event frames from the FrameRingBuffer followed by post-event
+    frames from the FrameBus into one MJPG file.
+
+    The bus subscription is opened first and its first frame marks the cut:
+    the ring supplies [event_time - pre_seconds, cut), the subscription
+    everything from the cut on, so no frame is lost or written twice while
+    the pre-event part is being encoded. Returns the number of frames written.
+
+    If the ring does not reach back to the start of the window (e.g. the
+    pre-event duration was raised after start-up), the gap is filled from
+    db: JPEG rows are copied into the clip without decoding, raw thermal
+    rows are streamed and coloured like the ring frames.
+
+    With an EventSession the post-event part runs until the session's
+    window closes, so triggers arriving while the clip is written extend
+    it instead of starting another clip.
+
+    The container rate is measured from the capture timestamps of the
+    written frames; fps is only the fallback while the ring has not
+    measured the camera rate yet, which also sizes the subscription.
+
+    writer_factory replaces the MjpegAviWriter constructor, e.g. with
+    EncoderClient.writer to encode in the encoder process.
+    """
+    if session is None:
+        session = EventSession(post_seconds, post_seconds)
+    fps = ring.frame_rate() or fps
+    clip = _ClipWriter(filename, fps, colouriser, writer_factory)
+    overruns = ring.overruns
+    with bus.subscribe(name="anomaly_video", maxlen=max(1, int(post_seconds * fps))) as sub:
+        bus_frame = sub.get(timeout=2.0)
+        cut = bus_frame.timestamp if bus_frame is not None else time.time()
+        start = (event_time if event_time is not None else cut) - pre_seconds
+        session.begin(cut)
+        # The ring is filled by another bus subscriber: let it catch up to the cut first
+        if bus_frame is not None and not ring.wait_for(cut, timeout=1.0):
+            logging.warning("[CLIP] Pre-event buffer lags behind, clip may miss frames before the event")
+
+        pre_start = time.perf_counter()
+        try:
+            oldest = ring.oldest_timestamp()
+            storage = getattr(db, "storage", None)
+            if storage == "jpeg" and start < oldest:
+                for timestamp, data in db.iter_jpegs(start, min(oldest, cut)):
+                    clip.write_jpeg(data, timestamp)
+            elif storage == "raw" and start < oldest:
+                # Streamed: decoded a few frames ahead, written as they arrive
+                for timestamp, thermal in db.iter_thermal(start, min(oldest, cut)):
+                    clip.write(thermal, timestamp)
+            for data, timestamp in ring.iter_window(start, cut):
+                clip.write(data, timestamp)
+            pre_frames = clip.frames
+            logging.debug(f"[CLIP] {pre_frames} pre-event frames in {(time.perf_counter() - pre_start) * 1000:.0f} ms")
+
+            # Post-event length is measured in capture time from the cut, frames that queued
+            # up while the pre-event part was encoded count towards it
+            while True:
+                if bus_frame is not None:
+                    if session.close_at(bus_frame.timestamp):
+                        break
+                    try:
+                        clip.write(bus_frame.image, bus_frame.timestamp)
+                    finally:
+                        bus_frame.release()
+                    bus_frame = None
+                if should_stop() or time.time() >= session.end + 1.0:
+                    break
+                bus_frame = sub.get(timeout=0.5)
+        finally:
+            session.close()
+            if bus_frame is not None:
+                bus_frame.release()
+            clip.release()
+    if ring.overruns > overruns:
+        logging.warning(f"[CLIP] {ring.overruns - overruns} pre-event frame(s) overwritten before they were written")
+    return clip.frames
+
+
+def write_segment_clip(segments, filename, start, end=None, session=None, should_stop=lambda: False,
+                       poll_s=SEGMENT_POLL_S):
+    """
+    Cuts [start, end) out of the continuous recording of a SegmentRecorder:
+    the JPEG data of the segments is copied into the clip, nothing is
+    decoded or encoded again. Returns the number of frames written.
+
+    Blocks until the segment holding end is closed, i.e. up to
+    segment_seconds of capture time after end (plus the DB batch delay when
+    the segments are fed from the DB writer); the calling worker writes no
+    other clip meanwhile. With an EventSession, end is the session's end,
+    and triggers arriving while waiting still extend it. should_stop() (or
+    the recorder stopping) cuts what is there.
+    """
+    while True:
+        covered = segments.covered_until()
+        if session is not None and session.close_at(covered):
+            break
+        if session is None and covered >= end:
+            break
+        if should_stop() or not segments.running():
+            if session is not None:
+                session.close()
+            break
+        time.sleep(poll_s)
+    if session is not None:
+        end = session.end
+
+    writer = None
+    first = last = None
+    try:
+        for timestamp, data in segments.iter_jpegs(start, end):
+            if writer is None:
+                writer = MjpegAviWriter(filename, *jpeg_size(data))
+                first = timestamp
+            writer.write_jpeg(data)
+            last = timestamp
+    finally:
+        if writer is not None:
+            if writer.frames > 1 and last > first:
+                writer.set_fps((writer.frames - 1) / (last - first))
+            writer.close()
+    return writer.frames if writer is not None else 0
@@ -11,6 +11,16 @@ import csv
 from queue import Queue
 import socketio
 from tb_ir import frame_database, camera_control
+from tb_ir.thermal_stats import ThermalStatsEngine, parse_metric
+from tb_ir.zones import GLOBAL_ZONE_ID
+from tb_ir.palette import Colouriser, PALETTES
+from tb_ir.anomaly_clip import write_anomaly_clip, write_segment_clip
+from tb_ir.recorder import BusRecorder
+from tb_ir import event_session
+from tb_ir.event_session import EventSessionManager
+from tb_ir.frame_bus import OVERFLOW_POLICIES
+from tb_ir.mjpeg_avi import MjpegAviWriter
+from tb_ir import radiometric
 from models.tb_dataclasses import QueueMessage, SocketEventsFromBackend, SocketEventsToBackend, QueueMessageHeader
 from tb_ir_process import QueuesMembers
 from collections import deque
@@ -19,12 +29,34 @@ MANUAL_RECORD_LIMIT = 600  # Default maximum duration for manual recording
 
 MIN_RECORD_DURATION = 10  # Minimum record time (seconds)
 PRE_EVENT_DURATION = 10   # Pre-event frames for anomaly video
+# Memory-mapped pre-event ring that survives restarts, "" = RAM only. Relative paths are
+# resolved against save_dir. The file is preallocated to (PRE_EVENT_DURATION + 2 s) x fps
+# raw frames (~84 MB at 382x288 / 32 fps) and every frame is written back continuously,
+# i.e. ~7 MB/s of writes: put it on a disk, not on the SD card / flash of the device
+PRE_EVENT_STORE = ""
 
 START_THRESHOLD = 50.0  # Default start threshold (°C)
 STOP_THRESHOLD = 45.0   # Default stop thre shold (°C)
 
 TEMP_THRESHOLD = 50.0
+DETECTION_METRIC = "max"      # Frame value compared with START/STOP_THRESHOLD: min, max, mean or pNN
+DETECTION_PERCENTILES = [99]  # Percentiles computed for every frame
+ACQUISITION_MODE = "raw"  # "raw": thermal only, palette on demand via LUT; "palette": SDK renders every frame
+PALETTE = "ironbow"        # ironbow, rainbow or grey
+PALETTE_TOLERANCE = 1.0    # °C the auto-range may drift before the LUT is rebuilt
+PALETTE_SPAN = None        # [min, max] in °C for a fixed range, None = auto-range
+DB_STORAGE = "jpeg"        # "jpeg": palette images; "raw": lossless thermal frames (delta + zlib)
+DB_COMPRESSION_LEVEL = 1   # zlib level for raw storage
+DB_ENCODE_WORKERS = frame_database.ENCODE_WORKERS  # encode threads of the DB writer (quad-core: 3)
+RECORD_OVERFLOW = "drop_oldest"  # Recorder queue full: "drop_oldest" or "drop_newest"
+VIDEO_ENCODER = "process"  # "process": MJPG encoding in a separate encoder process; "thread": in the IR process
+CONTINUOUS_RECORDING = False  # Always-on segmented recording in save_dir/segments; clips are cut from it
+SEGMENT_SECONDS = 10          # Capture time per segment; an anomaly clip waits up to this long after its end for the segment to close
+SEGMENT_RETENTION_S = 3600    # Segments older than this are deleted
+RECORD_RADIOMETRIC = False    # Manual recordings also write raw thermal frames (.tbr): ~7 MB/s at 382x288 / 32 fps
+ZONES = []  # Detection zones ({"id", "rect" | "polygon", thresholds, metric}); empty = whole frame
 POST_EVENT_DURATION = 5
+MAX_EVENT_DURATION = event_session.MAX_EVENT_DURATION  # Triggers within the post-event window extend one clip up to this length
 CONFIG_FILE = "config.json"
 LOG_FILE = "system.log"
 FRAME_LOG_FILE = "frame_log.csv"
@@ -51,6 +83,12 @@ class SystemMode:
 # Global Variables 
 cam = None
 db = None
+bus = None  # FrameBus of the IR process, set by Tb_IrProcess
+metrics = None  # AcquisitionMetrics shared with the supervisor, set by Tb_IrProcess
+pre_event_ring = None  # FrameRingBuffer with the last PRE_EVENT_DURATION seconds, set by Tb_IrProcess
+colouriser = None  # Colouriser of the camera, set by Tb_IrProcess
+encoder = None  # EncoderClient of the encoder process, set by Tb_IrProcess
+segment_recorder = None  # SegmentRecorder of the continuous recording, set by Tb_IrProcess
 mode = SystemMode.NORMAL
 frame = None
 temp = None
@@ -59,8 +97,6 @@ anomaly_thread = None
 manual_record_thread = None
 save_dir = Path("Output_data")
 save_dir.mkdir(exist_ok=True)
-camera_lock = threading.Lock()
-db_lock = threading.Lock()
 last_trigger_time = 0
 last_test_time = time.time()
 exit_flag = False
@@ -69,7 +105,10 @@ anomaly_active = False  # To prevent duplicate anomaly videos
 manual_stop_flag = False  # Flag to stop manual recording
 event_recording_enabled = True  # Controls if event-triggered recording is active
 MANUAL_RECORD_LIMIT = 600  # Default manual recording limit (in seconds)
+RECORD_QUEUE_FRAMES = 64  # Frames a recorder subscription may lag behind acquisition
+active_recorder = None  # BusRecorder of the running manual/test recording, for stats
 anomaly_queue = Queue()
+event_sessions = EventSessionManager()  # Coalesces overlapping anomaly triggers into one clip
 anomaly_worker_thread = None
 anomaly_active = False  # tracks ongoing anomaly
 sio = socketio.Client()
@@ -95,8 +134,12 @@ def log_error_to_user(message):
 # Config Load/Save 
 def load_config():
     global START_THRESHOLD, STOP_THRESHOLD, save_dir, POST_EVENT_DURATION
-    global MIN_RECORD_DURATION, PRE_EVENT_DURATION, MANUAL_RECORD_LIMIT
+    global MIN_RECORD_DURATION, PRE_EVENT_DURATION, PRE_EVENT_STORE, MANUAL_RECORD_LIMIT, MAX_EVENT_DURATION
     global event_recording_enabled, mode, recording_type
+    global DETECTION_METRIC, DETECTION_PERCENTILES, ZONES, ACQUISITION_MODE
+    global PALETTE, PALETTE_TOLERANCE, PALETTE_SPAN, DB_STORAGE, DB_COMPRESSION_LEVEL
+    global DB_ENCODE_WORKERS, RECORD_OVERFLOW, VIDEO_ENCODER
+    global CONTINUOUS_RECORDING, SEGMENT_SECONDS, SEGMENT_RETENTION_S, RECORD_RADIOMETRIC
 
     config = {}
     if Path(CONFIG_FILE).exists():
@@ -107,10 +150,45 @@ def load_config():
     STOP_THRESHOLD = config.get("stop_threshold", STOP_THRESHOLD)
     MIN_RECORD_DURATION = config.get("min_record_duration", MIN_RECORD_DURATION)
     PRE_EVENT_DURATION = config.get("pre_event_duration", PRE_EVENT_DURATION)
+    PRE_EVENT_STORE = config.get("pre_event_store", PRE_EVENT_STORE)
     POST_EVENT_DURATION = config.get("duration", POST_EVENT_DURATION)
+    MAX_EVENT_DURATION = config.get("max_event_duration", MAX_EVENT_DURATION)
     MANUAL_RECORD_LIMIT = config.get("manual_record_limit", MANUAL_RECORD_LIMIT)
     save_dir = Path(config.get("save_dir", str(save_dir)))
     save_dir.mkdir(parents=True, exist_ok=True)
+    DETECTION_PERCENTILES = config.get("detection_percentiles", DETECTION_PERCENTILES)
+    DETECTION_METRIC = config.get("detection_metric", DETECTION_METRIC)
+    try:
+        parse_metric(DETECTION_METRIC)
+    except ValueError as e:
+        logging.warning(f"{e}, falling back to 'max'")
+        DETECTION_METRIC = "max"
+    ZONES = config.get("zones", ZONES)
+    ACQUISITION_MODE = config.get("acquisition_mode", ACQUISITION_MODE)
+    if ACQUISITION_MODE not in camera_control.ACQUISITION_MODES:
+        logging.warning(f"Unknown acquisition mode {ACQUISITION_MODE}, falling back to 'raw'")
+        ACQUISITION_MODE = "raw"
+    PALETTE = config.get("palette", PALETTE)
+    if PALETTE not in PALETTES:
+        logging.warning(f"Unknown palette {PALETTE}, falling back to 'ironbow'")
+        PALETTE = "ironbow"
+    PALETTE_TOLERANCE = config.get("palette_tolerance", PALETTE_TOLERANCE)
+    PALETTE_SPAN = config.get("palette_span", PALETTE_SPAN)
+    DB_STORAGE = config.get("db_storage", DB_STORAGE)
+    if DB_STORAGE not in frame_database.STORAGE_MODES:
+        logging.warning(f"Unknown DB storage {DB_STORAGE}, falling back to 'jpeg'")
+        DB_STORAGE = "jpeg"
+    DB_COMPRESSION_LEVEL = config.get("db_compression_level", DB_COMPRESSION_LEVEL)
+    DB_ENCODE_WORKERS = config.get("db_encode_workers", DB_ENCODE_WORKERS)
+    RECORD_OVERFLOW = config.get("record_overflow", RECORD_OVERFLOW)
+    VIDEO_ENCODER = config.get("video_encoder", VIDEO_ENCODER)
+    CONTINUOUS_RECORDING = config.get("continuous_recording", CONTINUOUS_RECORDING)
+    SEGMENT_SECONDS = config.get("segment_seconds", SEGMENT_SECONDS)
+    SEGMENT_RETENTION_S = config.get("segment_retention_s", SEGMENT_RETENTION_S)
+    RECORD_RADIOMETRIC = config.get("record_radiometric", RECORD_RADIOMETRIC)
+    if RECORD_OVERFLOW not in OVERFLOW_POLICIES:
+        logging.warning(f"Unknown record overflow policy {RECORD_OVERFLOW}, falling back to 'drop_oldest'")
+        RECORD_OVERFLOW = "drop_oldest"
 
 
     event_recording_enabled = config.get("event_recording_enabled", True)
@@ -127,17 +205,66 @@ def save_config():
         "stop_threshold": STOP_THRESHOLD,
         "min_record_duration": MIN_RECORD_DURATION,
         "pre_event_duration": PRE_EVENT_DURATION,
+        "pre_event_store": PRE_EVENT_STORE,
         "save_dir": str(save_dir),
         "duration": POST_EVENT_DURATION,
+        "max_event_duration": MAX_EVENT_DURATION,
         "recording_type": recording_type,
         "manual_record_limit": MANUAL_RECORD_LIMIT,
         "event_recording_enabled": event_recording_enabled,
+        "detection_metric": DETECTION_METRIC,
+        "detection_percentiles": DETECTION_PERCENTILES,
+        "zones": ZONES,
+        "acquisition_mode": ACQUISITION_MODE,
+        "palette": PALETTE,
+        "palette_tolerance": PALETTE_TOLERANCE,
+        "palette_span": PALETTE_SPAN,
+        "db_storage": DB_STORAGE,
+        "db_compression_level": DB_COMPRESSION_LEVEL,
+        "db_encode_workers": DB_ENCODE_WORKERS,
+        "record_overflow": RECORD_OVERFLOW,
+        "video_encoder": VIDEO_ENCODER,
+        "continuous_recording": CONTINUOUS_RECORDING,
+        "segment_seconds": SEGMENT_SECONDS,
+        "segment_retention_s": SEGMENT_RETENTION_S,
+        "record_radiometric": RECORD_RADIOMETRIC,
         "mode": mode  # Save current mode
     }
     with open(CONFIG_FILE, "w") as f:
         json.dump(config, f)
         logging.info("Config saved.")
 
+def create_stats_engine():
+    """
+    Stats engine for the acquisition thread, covering the configured
+    percentiles and the detection metric.
+    """
+    percentiles = set(float(q) for q in DETECTION_PERCENTILES)
+    q = parse_metric(DETECTION_METRIC)
+    if q is not None:
+        percentiles.add(q)
+    return ThermalStatsEngine(percentiles=percentiles)
+
+def create_colouriser():
+    """
+    Colouriser shared by live view, screenshots, DB buffer and videos.
+    """
+    return Colouriser(palette=PALETTE, tolerance_c=PALETTE_TOLERANCE, span_c=PALETTE_SPAN)
+
+def video_writer_factory():
+    """
+    Constructor for video writers: the encoder process if it runs, else in-process.
+    """
+    return encoder.writer if encoder is not None else MjpegAviWriter
+
+def detection_value(frame):
+    """
+    Temperature of a Frame that is compared against START/STOP_THRESHOLD.
+    """
+    if frame.stats is None:
+        return frame.temp
+    return frame.stats.value(DETECTION_METRIC)
+
 def log_config_change(setting_name, old_value, new_value, user="server"):
     """
     Logs manual changes to configuration settings persistently.
@@ -234,57 +361,54 @@ def save_frames_as_video(frames, filename, fps=32):
     if not frames:
         return
     height, width, _ = frames[0].shape
-    out = cv2.VideoWriter(str(filename), cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    out = video_writer_factory()(filename, width, height, fps)
     for frame in frames:
         out.write(frame)
     out.release()
 
-def record_video(cam, mode, duration=POST_EVENT_DURATION):
-    global manual_stop_flag
+def record_video(bus, mode, duration=POST_EVENT_DURATION):
+    global manual_stop_flag, active_recorder
     manual_stop_flag = False
     duration = min(duration, MANUAL_RECORD_LIMIT)  # Enforce limit
-    try:
-        with camera_lock:
-            frame, temp = cam.get_frame()
-    except Exception as e:
-        log_error_to_user(f"Failed to start recording: {e}")
-
-        return
-    if frame is None or frame.shape[0] == 0 or frame.shape[1] == 0:
-        log_error_to_user("Invalid frame received.")
-
-        return
-
     filename = save_dir / f"thermal_video_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.avi"
-    height, width = frame.shape[:2]
-    writer = cv2.VideoWriter(str(filename), cv2.VideoWriter_fourcc(*'MJPG'), 32, (width, height))
-    if not writer.isOpened():
-        log_error_to_user("Failed to open video writer.")
+    raw_filename = filename.with_suffix(radiometric.SUFFIX) if RECORD_RADIOMETRIC else None
+    segments = segment_recorder
+    if segments is not None and segments.running():
+        # Continuous recording runs anyway: wait for the stop, then cut the clip from its segments
+        start = time.time()
+        logging.info("Recording started.")
+        if raw_filename is not None:
+            # The segments only hold palette images: the radiometric recording comes from the bus meanwhile
+            recorder = BusRecorder(bus, None, queue_frames=RECORD_QUEUE_FRAMES, policy=RECORD_OVERFLOW,
+                                   name="record_radiometric", raw_filename=raw_filename)
+            active_recorder = recorder
+            try:
+                recorder.record(duration, should_stop=lambda: manual_stop_flag or exit_flag)
+            finally:
+                active_recorder = None
+        while not (manual_stop_flag or exit_flag) and time.time() - start < duration:
+            time.sleep(0.2)
+        count = write_segment_clip(segments, filename, start, end=time.time(), should_stop=lambda: exit_flag)
+        if count == 0:
+            log_error_to_user("Failed to record: no frame in the continuous recording.")
+            return
+        logging.info("Recording finished and saved.")
         return
-
-    start_time = time.time()
+    # Frames with capture timestamps from the bus; container fps = measured capture rate
+    recorder = BusRecorder(bus, filename, queue_frames=RECORD_QUEUE_FRAMES, policy=RECORD_OVERFLOW,
+                           writer_factory=video_writer_factory(), raw_filename=raw_filename)
+    active_recorder = recorder
     logging.info("Recording started.")
-
-    while not manual_stop_flag:
-        with camera_lock:
-            frame, temp = cam.get_frame()
-        if frame is not None:
-            writer.write(frame)
-
-        elapsed = time.time() - start_time
-        if elapsed >= duration:  # Use passed duration
-            logging.info(f"Stopped after {elapsed:.1f}s.")
-            break
-        if exit_flag:
-            break
-        time.sleep(0.01)
-
-
-    writer.release()
+    try:
+        count = recorder.record(duration, should_stop=lambda: manual_stop_flag or exit_flag)
+    finally:
+        active_recorder = None
+    if count == 0:
+        log_error_to_user("Failed to record: no frame from acquisition.")
+        return
     logging.info("Recording finished and saved.")
 
 
-    
 def stop_manual_recording_from_server():
     global manual_stop_flag, recording, manual_record_thread
     if recording and manual_record_thread and manual_record_thread.is_alive():
@@ -296,32 +420,40 @@ def stop_manual_recording_from_server():
     logging.info("No manual recording active to stop")
     return False
 
-def save_anomaly_video(cam, db_path, temp, timestamp, save_dir, duration=5, fps=32):
+def save_anomaly_video(bus, ring, temp, timestamp, save_dir, duration=5, fps=32, zone_id=None, event_time=None,
+                       session=None):
     global exit_flag
     try:
-        with db_lock:
-            db : frame_database.FrameDatabase = frame_database.FrameDatabase(db_path)
-            retrospective_frames = db.get_frames_from_last_n_seconds(seconds=10)
-            db.close()
-
-        post_frames = []
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            if exit_flag:
-                break
-            with camera_lock:
-                frame, _ = cam.get_frame()
-            if frame is not None:
-                post_frames.append(frame)
-            time.sleep(1 / fps)
-
-        all_frames = retrospective_frames + post_frames
-        filename = save_dir / f"merged_anomaly_temp{int(temp)}_{timestamp}.avi"
-        save_frames_as_video(all_frames, filename, fps=fps)
-        logging.info(f"Combined anomaly video saved as {filename}")
+        # Pre-event frames come from the in-memory ring buffer, post-event frames straight from the bus
+        filename = save_dir / anomaly_video_name(temp, timestamp, zone_id)
+        segments = segment_recorder
+        if segments is not None and segments.running():
+            # Cut from the continuous recording: stored JPEGs are copied, nothing is encoded again
+            event_time = event_time if event_time is not None else time.time()
+            count = write_segment_clip(segments, filename, event_time - PRE_EVENT_DURATION,
+                                       end=event_time + duration, session=session, should_stop=lambda: exit_flag)
+        else:
+            # Older pre-event frames than the ring holds are muxed from the stored JPEGs
+            count = write_anomaly_clip(bus, ring, colouriser, filename, event_time,
+                                       pre_seconds=PRE_EVENT_DURATION, post_seconds=duration, fps=fps,
+                                       should_stop=lambda: exit_flag, db=db, session=session,
+                                       writer_factory=video_writer_factory())
+        logging.info(f"Combined anomaly video saved as {filename} ({count} frames)")
+        if session is not None:
+            # Triggers and peak temperatures of all coalesced events next to the clip
+            session.save(filename.with_suffix(".json"))
+            logging.info(f"{len(session.triggers)} trigger(s) in {filename.name}, peaks {session.peaks}")
     except Exception as e:
         log_error_to_user(f"Error in anomaly video thread: {e}")
 
+def anomaly_video_name(temp, timestamp, zone_id=None):
+    """
+    Clip name of an anomaly; events of a configured zone carry the zone id.
+    """
+    if zone_id is None or zone_id == GLOBAL_ZONE_ID:
+        return f"merged_anomaly_temp{int(temp)}_{timestamp}.avi"
+    return f"merged_anomaly_{zone_id}_temp{int(temp)}_{timestamp}.avi"
+
 
 def display(frame, temp, mode, recording):
     annotated = np.ascontiguousarray(frame.copy())
@@ -380,17 +512,23 @@ def get_system_status():
         "stop_threshold": STOP_THRESHOLD,
         "duration": POST_EVENT_DURATION,
         "save_dir": str(save_dir),
+        "detection_metric": DETECTION_METRIC,
         "last_error": last_error
     }
 
 def anomaly_worker():
     global recording
-    while not anomaly_queue.empty():
-        temp, timestamp = anomaly_queue.get()
-        ts_str = timestamp.strftime("%Y%m%d_%H%M%S")
-        logging.info(f"Processing anomaly event at {temp:.2f}°C ({ts_str})")
+    while True:
+        # Queued triggers that fall into the window of the new session join its clip
+        session = event_sessions.next_session(anomaly_queue, POST_EVENT_DURATION, MAX_EVENT_DURATION)
+        if session is None:
+            break
+        timestamp, zone_id, temp = session.triggers[0]
+        ts_str = datetime.datetime.fromtimestamp(timestamp).strftime("%Y%m%d_%H%M%S")
+        logging.info(f"Processing anomaly event in zone {zone_id} at {temp:.2f}°C ({ts_str})")
         recording = True
-        save_anomaly_video(cam, "frame_store.db", temp, ts_str, save_dir, POST_EVENT_DURATION)
+        save_anomaly_video(bus, pre_event_ring, temp, ts_str, save_dir, POST_EVENT_DURATION,
+                           zone_id=zone_id, event_time=timestamp, session=session)
         recording = False
 
 
@@ -421,7 +559,7 @@ def start_manual_recording_from_server():
     if not recording:
         duration = min(POST_EVENT_DURATION, MANUAL_RECORD_LIMIT)
         manual_record_thread = threading.Thread(
-            target=record_video, args=(cam, mode, duration)
+            target=record_video, args=(bus, mode, duration)
         )
         manual_record_thread.start()
         recording = True
@@ -513,9 +651,11 @@ def freeze_relais_from_server():#backend callable
     return False
 
 def take_screenshot_from_server():#backend callable
-    global frame
-    if frame is not None:
-        threading.Thread(target=screenshot, args=(frame.copy(),)).start()
+    latest = bus.latest() if bus is not None else None
+    if latest is not None:
+        frame_copy = latest.image.copy()
+        latest.release()
+        threading.Thread(target=screenshot, args=(frame_copy,)).start()
         return True
     return False
 def retry_io_action(action, action_name="IO Action", retries=3, delay=0.5):
@@ -539,9 +679,9 @@ def retry_io_action(action, action_name="IO Action", retries=3, delay=0.5):
 def safe_insert_frame(frame, retries=3, delay=0.2):
     for attempt in range(1, retries + 1):
         try:
-            if not db is None: 
-                with db_lock:
-                    db.insert_frame(frame)
+            if not db is None:
+                # Only queues the frame for the DB writer, no lock needed
+                db.insert_frame(frame)
                 return True
         except Exception as e:
             logging.warning(f"DB insert error on attempt {attempt}: {e}")
@@ -692,7 +832,7 @@ def manual_start_record(msg_in : QueueMessage) -> QueueMessage:
     else:
         if not recording:
             manual_record_thread = threading.Thread(
-                target=record_video, args=(cam, mode, POST_EVENT_DURATION))
+                target=record_video, args=(bus, mode, POST_EVENT_DURATION))
             manual_record_thread.start()
             recording = True
             msg_out = ack_manual_start_record(id=id, status="success", message="Recording started")
@@ -824,6 +964,39 @@ def ack_history_temperature(id : str, status : str, message : list):
     )
     return msg
 
+def call_acquisition_stats(msg_in : QueueMessage) -> QueueMessage:
+    id : str = msg_in.header.id
+
+    msg_out : QueueMessage
+
+    if metrics is None:
+        msg_out = ack_acquisition_stats(id=id, status="error", message={})
+    else:
+        stats = metrics.snapshot()
+        if db is not None and hasattr(db, "writer_stats"):
+            stats["db_writer"] = db.writer_stats()
+        recorder = active_recorder
+        if recorder is not None:
+            stats["recorder"] = recorder.stats()
+        stats["event_sessions"] = event_sessions.stats()
+        if encoder is not None:
+            stats["encoder"] = encoder.stats()
+        if segment_recorder is not None:
+            stats["segments"] = segment_recorder.stats()
+        msg_out = ack_acquisition_stats(id=id, status="success", message=stats)
+    return msg_out
+
+def ack_acquisition_stats(id : str, status : str, message : dict):
+    msg : QueueMessage = _prepare_backend_msg(
+    event = SocketEventsToBackend.ACK_CALL_ACQUISITION_STATS,
+    payload = {
+            "id": id,
+            "status": status,
+            "stats": message
+        }
+    )
+    return msg
+
 def set_event(msg_in : QueueMessage) -> QueueMessage:
     source : QueuesMembers = msg_in.header.source
     dest : QueuesMembers = msg_in.header.dest
@@ -982,6 +1155,9 @@ def ir_command_handler(msg_in : QueueMessage) -> QueueMessage:
         elif command == SocketEventsFromBackend.REQ_CALL_HISTORY_TEMPRETURE:
             msg_out = call_history_temperature(msg_in=msg_in)
 
+        elif command == SocketEventsFromBackend.REQ_CALL_ACQUISITION_STATS:
+            msg_out = call_acquisition_stats(msg_in=msg_in)
+
         elif command == SocketEventsFromBackend.REQ_SET_EVENT:
             msg_out = set_event(msg_in=msg_in)
 
@@ -4,6 +4,11 @@ import os
 from ctypes.util import find_library
 import cv2
 import random  # For simulated temperature
+from tb_ir.frame import Frame
+from tb_ir.frame_pool import FramePool
+from tb_ir.palette import Colouriser
+
+ACQUISITION_MODES = ("palette", "raw")
 
 # --- Frame metadata structure for thermal SDK ---
 class EvoIRFrameMetadata(ct.Structure):
@@ -19,12 +24,24 @@ class EvoIRFrameMetadata(ct.Structure):
     ]
 
 class CameraController:
-    def __init__(self, use_webcam=False):
+    """
+    acquisition_mode "raw" grabs only the thermal matrix; the palette image is
+    rendered lazily by the lookup-table colouriser when a consumer reads
+    frame.image. "palette" lets the SDK render the false-colour image for
+    every frame instead.
+    """
+    def __init__(self, use_webcam=False, pool_size=16, acquisition_mode="raw", colouriser=None):
+        if acquisition_mode not in ACQUISITION_MODES:
+            raise ValueError(f"Unknown acquisition mode: {acquisition_mode}")
         self.use_webcam = use_webcam
+        self.acquisition_mode = acquisition_mode
+        self.colouriser = colouriser if colouriser is not None else Colouriser()
         self.cap = None
         self.libir = None
         self.pathXml = b''
         self.metadata = EvoIRFrameMetadata()
+        self.pool_size = pool_size
+        self.pool = None
 
         if self.use_webcam:
             self.cap = cv2.VideoCapture(0)
@@ -78,33 +95,56 @@ class CameraController:
         print(f"Palette Image Size: {self.palette_width.value}x{self.palette_height.value}")
         print(f"Thermal Image Size: {self.thermal_width.value}x{self.thermal_height.value}")
 
-        self.np_thermal = np.zeros([self.thermal_height.value, self.thermal_width.value], dtype=np.uint16)
-        self.npThermalPointer = self.np_thermal.ctypes.data_as(ct.POINTER(ct.c_ushort))
-
-        self.np_img = np.zeros([self.palette_height.value, self.palette_width.value, 3], dtype=np.uint8)
-        self.npImagePointer = self.np_img.ctypes.data_as(ct.POINTER(ct.c_ubyte))
+        # SDK buffers come from a rotating pool, pointers are cached per slot
+        thermal_shape = (self.thermal_height.value, self.thermal_width.value)
+        if self.acquisition_mode == "raw":
+            # Palette is rendered from the thermal matrix, so it has the thermal size
+            palette_shape = thermal_shape + (3,)
+        else:
+            palette_shape = (self.palette_height.value, self.palette_width.value, 3)
+        self.pool = FramePool(thermal_shape=thermal_shape, palette_shape=palette_shape, size=self.pool_size)
+        print(f"Acquisition mode: {self.acquisition_mode}")
 
     def get_frame(self):
+        """
+        Grabs one frame into a pooled Frame (palette image, raw thermal matrix
+        and SDK metadata). The caller owns one reference and must call
+        frame.release() when done; the buffers are reused afterwards.
+        In "raw" mode the palette image is only rendered on first access.
+        """
         if self.use_webcam:
-            ret, frame = self.cap.read()
+            ret, image = self.cap.read()
             if not ret:
                 raise RuntimeError("Failed to read from webcam.")
             temp = random.uniform(25.0, 60.0)  # Simulated temperature
-            return frame, temp
+            return Frame(image=image, temp=temp)
 
         # Real thermal camera frame
-        ret = self.libir.evo_irimager_get_thermal_palette_image_metadata(
-            self.thermal_width, self.thermal_height, self.npThermalPointer,
-            self.palette_width, self.palette_height, self.npImagePointer,
-            ct.byref(self.metadata)
-        )
+        frame = self.pool.acquire()
+        if self.acquisition_mode == "raw":
+            ret = self.libir.evo_irimager_get_thermal_image_metadata(
+                ct.byref(self.thermal_width), ct.byref(self.thermal_height), frame.thermal_ptr,
+                ct.byref(self.metadata)
+            )
+        else:
+            ret = self.libir.evo_irimager_get_thermal_palette_image_metadata(
+                self.thermal_width, self.thermal_height, frame.thermal_ptr,
+                self.palette_width, self.palette_height, frame.palette_ptr,
+                ct.byref(self.metadata)
+            )
         if ret != 0:
+            frame.release()
             raise RuntimeError(f"Camera error: {ret}")
 
-        rgb_img = cv2.cvtColor(self.np_img, cv2.COLOR_BGR2RGB)
-        thermal_mean_raw = self.np_thermal.mean()
-        mean_temp = thermal_mean_raw / 10.0 - 100.0
-        return rgb_img, mean_temp
+        frame.set_metadata(self.metadata)
+        if self.acquisition_mode == "raw":
+            frame.defer_image(self.colouriser.render)
+        else:
+            frame.image = cv2.cvtColor(frame.palette, cv2.COLOR_BGR2RGB, dst=frame.image)
+        # Temperatures are derived from frame.thermal by the acquisition thread (thermal_stats)
+        frame.temp = None
+        frame.stats = None
+        return frame
 
     def shutdown(self):
         if self.use_webcam and hasattr(self, 'cap'):
@@ -0,0 +1,254 @@
+import queue
+import logging
+import itertools
+import threading
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from tb_ir.mjpeg_avi import MjpegAviWriter
+
+ENCODER_SLOTS = 32          # frames one job may have in flight in shared memory (~1 s at 32 fps)
+PROGRESS_INTERVAL = 32      # encoded frames between two progress messages
+SLOT_TIMEOUT_S = 0.5
+CLOSE_TIMEOUT_S = 30.0
+
+
+def _close_job(job, fps):
+    shm, _, writer, error = job
+    try:
+        if fps:
+            writer.set_fps(fps)
+        writer.close()
+    except Exception as e:
+        error = error or str(e)
+    shm.close()
+    return writer.frames, error, writer.frame_index()
+
+
+def _encoder_main(jobs, results):
+    """
+    Encoder process: one MjpegAviWriter per open job. Frames are read from
+    the job's shared memory slot and the slot is handed back right after
+    it was encoded.
+    """
+    open_jobs = {}   # job_id -> [shm, slots, writer, error]
+    while True:
+        msg = jobs.get()
+        kind = msg[0]
+        if kind == "stop":
+            break
+        job_id = msg[1]
+        job = open_jobs.get(job_id)
+        if kind == "open":
+            _, _, filename, shm_name, count, shape, dtype, fps = msg
+            try:
+                shm = shared_memory.SharedMemory(name=shm_name)
+                slots = np.ndarray((count,) + shape, dtype=dtype, buffer=shm.buf)
+                open_jobs[job_id] = [shm, slots, MjpegAviWriter(filename, shape[1], shape[0], fps), None]
+            except Exception as e:
+                results.put(("failed", job_id, str(e)))
+        elif kind in ("frame", "jpeg"):
+            if job is not None and job[3] is None:
+                try:
+                    if kind == "frame":
+                        job[2].write(job[1][msg[2]])
+                    else:
+                        job[2].write_jpeg(msg[2])
+                except Exception as e:
+                    job[3] = str(e)
+                if job[2].frames % PROGRESS_INTERVAL == 0:
+                    results.put(("progress", job_id, job[2].frames))
+            if kind == "frame":
+                results.put(("free", job_id, msg[2]))
+        elif kind == "close" and job is not None:
+            del open_jobs[job_id]
+            results.put(("done", job_id) + _close_job(job, msg[2]))
+    for job_id, job in open_jobs.items():
+        results.put(("done", job_id) + _close_job(job, None))
+
+
+class EncoderJob:
+    """
+    Client side of one encoder job, used like an MjpegAviWriter: write(),
+    write_jpeg(), set_fps(), close()/release().
+
+    write() copies the frame into a free shared memory slot and only
+    sends the slot number; it waits for a slot when the encoder is
+    ENCODER_SLOTS frames behind. close() waits for the completion ack.
+    """
+    def __init__(self, client, job_id, filename, shape, dtype, fps, slots):
+        self.client = client
+        self.job_id = job_id
+        self.filename = str(filename)
+        self.fps = fps
+        self.frames = 0       # submitted
+        self.encoded = 0      # reported by the encoder process
+        self.error = None
+        self.index = None     # frame_index() of the file, sent with the completion ack
+        self.done = threading.Event()
+        self._shape = tuple(shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(slots * int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+        self._slots = np.ndarray((slots,) + self._shape, dtype=dtype, buffer=self._shm.buf)
+        self._free = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+        self._closed = False
+
+    def _slot(self):
+        while True:
+            if self.done.is_set():
+                raise RuntimeError(f"Encoder job {self.filename} failed: {self.error}")
+            try:
+                return self._free.get(timeout=SLOT_TIMEOUT_S)
+            except queue.Empty:
+                if not self.client.alive():
+                    raise RuntimeError("Encoder process is not running")
+
+    def write(self, image):
+        if image.shape != self._shape:
+            raise ValueError(f"Frame shape {image.shape} does not match the job's {self._shape}")
+        slot = self._slot()
+        np.copyto(self._slots[slot], image)
+        self.client._send(("frame", self.job_id, slot))
+        self.frames += 1
+
+    def write_jpeg(self, data):
+        self.client._send(("jpeg", self.job_id, bytes(data)))
+        self.frames += 1
+
+    def set_fps(self, fps):
+        if fps > 0:
+            self.fps = fps
+
+    def frame_index(self):
+        """
+        Same as MjpegAviWriter.frame_index(), available once close() returned.
+        """
+        return self.index
+
+    def close(self, timeout=CLOSE_TIMEOUT_S):
+        if self._closed:
+            return
+        self._closed = True
+        self.client._send(("close", self.job_id, self.fps))
+        if not self.done.wait(timeout):
+            logging.warning(f"[ENC] No completion ack for {self.filename} after {timeout:.0f}s")
+        self.client._forget(self.job_id)
+        self._slots = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def release(self):
+        # cv2.VideoWriter naming
+        self.close()
+
+
+class EncoderClient:
+    """
+    Runs MJPG encoding in a separate process so that long recordings
+    never take CPU time or the GIL from acquisition and alarm handling.
+
+    Jobs share one job queue; every job has its own shared memory slot
+    ring that is sized by its frame shape. A dispatcher thread receives
+    slot releases, progress and completion acks from the encoder.
+
+    writer() is a drop-in for the MjpegAviWriter constructor and falls
+    back to an in-process writer when the encoder is not running.
+    """
+    def __init__(self, slots=ENCODER_SLOTS):
+        self.slots = slots
+        self.process = None
+        self.completed = 0
+        self.failed = 0
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ctx = multiprocessing.get_context()
+        self._job_queue = None
+        self._results = None
+        self._dispatcher = None
+
+    def start(self):
+        # Tracker shared with the child, so attaching there does not register the segments a second time
+        resource_tracker.ensure_running()
+        self._job_queue = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self.process = self._ctx.Process(target=_encoder_main, args=(self._job_queue, self._results),
+                                         name="video_encoder", daemon=True)
+        self.process.start()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="encoder_acks", daemon=True)
+        self._dispatcher.start()
+        logging.info(f"[ENC] Encoder process started (pid {self.process.pid})")
+
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def _send(self, msg):
+        self._job_queue.put(msg)
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _dispatch(self):
+        while True:
+            msg = self._results.get()
+            if msg is None:
+                break
+            kind, job_id = msg[0], msg[1]
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            if kind == "free":
+                job._free.put(msg[2])
+            elif kind == "progress":
+                job.encoded = msg[2]
+            elif kind in ("done", "failed"):
+                if kind == "done":
+                    job.encoded, job.error, job.index = msg[2], msg[3], msg[4]
+                else:
+                    job.error = msg[2]
+                with self._lock:
+                    self.completed += 1
+                    self.failed += job.error is not None
+                if job.error is not None:
+                    logging.error(f"[ENC] {job.filename}: {job.error}")
+                else:
+                    logging.info(f"[ENC] {job.filename}: {job.encoded} frames encoded")
+                job.done.set()
+
+    def open(self, filename, shape, dtype=np.uint8, fps=32):
+        job = EncoderJob(self, next(self._ids), filename, shape, dtype, fps, self.slots)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._send(("open", job.job_id, job.filename, job._shm.name, self.slots, job._shape, np.dtype(dtype).str, fps))
+        return job
+
+    def writer(self, filename, width, height, fps=32):
+        if not self.alive():
+            logging.warning("[ENC] Encoder process not running, encoding in-process")
+            return MjpegAviWriter(filename, width, height, fps)
+        return self.open(filename, (int(height), int(width), 3), np.uint8, fps)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+            return {
+                "alive": self.alive(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "jobs": {job.filename: {"submitted": job.frames, "encoded": job.encoded} for job in jobs},
+            }
+
+    def stop(self, timeout=5.0):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self._send(("stop",))
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        self._results.put(None)
+        self._dispatcher.join(timeout=1.0)
+        self.process = None
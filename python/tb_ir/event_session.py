@@ -0,0 +1,185 @@
+import json
+import datetime
+import threading
+from queue import Empty
+
+MAX_EVENT_DURATION = 120  # s after the first trigger; a flickering hot spot cannot keep one clip open forever
+
+# check_zone() results
+TRIGGER_NEW = "new"            # queued, starts (or joins the start of) a new session
+TRIGGER_EXTENDED = "extended"  # absorbed into the open session, no new event
+
+
+class EventSession:
+    """
+    One anomaly clip covering one or more triggers.
+
+    The first trigger opens the session; every trigger that arrives while
+    its post-event window is still open extends the window to post_seconds
+    after that trigger (at most max_seconds after the start). All triggers
+    and the peak temperature per zone are recorded for the clip's sidecar.
+
+    The clip writer checks close_at() for every post-event frame, so a
+    trigger is either part of this clip or rejected by add() and starts
+    the next session; it is never lost in between.
+    """
+    def __init__(self, post_seconds, max_seconds=MAX_EVENT_DURATION):
+        self.post_seconds = post_seconds
+        self.max_seconds = max(max_seconds, post_seconds)
+        self.start = None
+        self.end = None
+        self.limit = None
+        self.triggers = []    # (timestamp, zone_id, temp)
+        self.peaks = {}       # zone_id -> highest temperature seen while the session was open
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def _peak(self, zone_id, temp):
+        if temp is not None and (zone_id not in self.peaks or temp > self.peaks[zone_id]):
+            self.peaks[zone_id] = temp
+
+    def add(self, temp, timestamp, zone_id=None):
+        """
+        Adds a trigger; returns False if the session is already past it.
+        """
+        with self._lock:
+            if self.closed or (self.end is not None and timestamp > self.end):
+                return False
+            if self.start is None:
+                self.start = timestamp
+                self.limit = timestamp + self.max_seconds
+            elif timestamp >= self.limit:
+                return False
+            self.triggers.append((timestamp, zone_id, temp))
+            self._peak(zone_id, temp)
+            self.end = min(max(self.end or timestamp, timestamp + self.post_seconds), self.limit)
+            return True
+
+    def observe(self, zone_id, temp):
+        with self._lock:
+            if not self.closed:
+                self._peak(zone_id, temp)
+
+    def begin(self, cut):
+        """
+        Anchors the window to the clip cut: a trigger that waited in the
+        queue still gets post_seconds of frames after the cut.
+        """
+        with self._lock:
+            if self.start is None:
+                self.start = cut
+            self.limit = max(self.start, cut) + self.max_seconds
+            self.end = min(max(self.end or cut, cut + self.post_seconds), self.limit)
+
+    def close_at(self, timestamp):
+        """
+        Closes the session once timestamp has reached the end of the
+        window; returns True if it is closed.
+        """
+        with self._lock:
+            if self.end is not None and timestamp >= self.end:
+                self.closed = True
+            return self.closed
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+
+    def summary(self):
+        with self._lock:
+            return {
+                "start": self.start,
+                "end": self.end,
+                "triggers": [{"timestamp": ts, "zone": zone_id, "temp": temp} for ts, zone_id, temp in self.triggers],
+                "peaks": dict(self.peaks),
+            }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class EventSessionManager:
+    """
+    Coalesces anomaly triggers into sessions.
+
+    trigger() is called by the detection loop: a trigger inside the open
+    session's window extends it and returns True, otherwise the caller
+    queues it as before. next_session() is called by the anomaly worker:
+    it opens a session for the next queued trigger and lets the triggers
+    queued behind it join (e.g. several zones crossing in the same frame).
+    """
+    def __init__(self):
+        self.current = None
+        self.sessions = 0
+        self.coalesced = 0
+        self._pending = None
+
+    def trigger(self, temp, timestamp, zone_id=None):
+        session = self.current
+        if session is not None and session.add(temp, timestamp, zone_id):
+            self.coalesced += 1
+            return True
+        return False
+
+    def observe(self, zone_id, temp):
+        session = self.current
+        if session is not None:
+            session.observe(zone_id, temp)
+
+    def check_zone(self, zone, temp, queue, arm=True, now=None):
+        """
+        Hysteresis step of one zone in the detection loop. A zone triggers
+        when temp rises above its start threshold and re-arms once it falls
+        below its stop threshold, also while a clip is being written, so it
+        can extend that clip. arm=False only re-arms (e.g. test mode without
+        event recording).
+
+        Returns TRIGGER_NEW for a queued trigger, TRIGGER_EXTENDED for one
+        the open session absorbed (the same event, no new alarm), else None.
+        """
+        if arm and temp > zone.start_threshold and not zone.active:
+            now = now or datetime.datetime.now()
+            zone.active = True
+            if self.trigger(temp, now.timestamp(), zone.id):
+                return TRIGGER_EXTENDED
+            queue.put((temp, now, zone.id))
+            return TRIGGER_NEW
+        if temp < zone.stop_threshold:
+            zone.active = False
+        return None
+
+    def next_session(self, queue, post_seconds, max_seconds=MAX_EVENT_DURATION):
+        """
+        queue holds (temp, datetime, zone_id) entries. Returns the new
+        EventSession, or None if nothing is queued.
+        """
+        entry, self._pending = self._pending, None
+        if entry is None:
+            try:
+                entry = queue.get_nowait()
+            except Empty:
+                return None
+        session = EventSession(post_seconds, max_seconds)
+        temp, timestamp, zone_id = entry
+        session.add(temp, timestamp.timestamp(), zone_id)
+        while True:
+            try:
+                entry = queue.get_nowait()
+            except Empty:
+                break
+            temp, timestamp, zone_id = entry
+            if not session.add(temp, timestamp.timestamp(), zone_id):
+                self._pending = entry
+                break
+            self.coalesced += 1
+        self.current = session
+        self.sessions += 1
+        return session
+
+    def has_pending(self):
+        return self._pending is not None
+
+    def stats(self):
+        return {"sessions": self.sessions, "coalesced": self.coalesced}
+
@@ -0,0 +1,140 @@
+import ctypes as ct
+import threading
+import numpy as np
+
+
+class Frame:
+    """
+    One acquired camera frame.
+
+    image        palette image as delivered to viewers / recorders (H, W, 3) uint8,
+                 rendered on first access when the frame was grabbed raw-only
+    thermal      raw radiometric matrix (H, W) uint16, None for webcam input
+    temp         mean temperature in °C
+    stats        ThermalStats of the raw matrix, filled by the acquisition thread
+    seq          sequence number assigned by the FrameBus
+    timestamp    host capture time (time.time())
+    counter, counter_hw, hw_timestamp, flag_state,
+    temp_chip, temp_flag, temp_box
+                 copied from EvoIRFrameMetadata
+
+    Pooled frames are reference counted: whoever receives a frame from the
+    camera or the bus owns one reference and must call release(). Use
+    detach() to keep a frame beyond that.
+
+    Raw-only frames carry a renderer(frame, out) instead of an image; the
+    first consumer reading .image pays for the palette, frames nobody looks
+    at are never coloured.
+    """
+    __slots__ = ("_image", "renderer", "thermal", "temp", "stats", "seq", "timestamp",
+                 "counter", "counter_hw", "hw_timestamp", "flag_state",
+                 "temp_chip", "temp_flag", "temp_box",
+                 "palette", "thermal_ptr", "palette_ptr", "pool", "index", "_refs", "_render_lock")
+
+    def __init__(self, image=None, thermal=None, temp=None, timestamp=None):
+        self._image = image
+        self.renderer = None
+        self.thermal = thermal
+        self.temp = temp
+        self.stats = None
+        self.seq = 0
+        self.timestamp = timestamp
+        self.counter = None
+        self.counter_hw = None
+        self.hw_timestamp = None
+        self.flag_state = None
+        self.temp_chip = None
+        self.temp_flag = None
+        self.temp_box = None
+        self.palette = None
+        self.thermal_ptr = None
+        self.palette_ptr = None
+        self.pool = None
+        self.index = -1
+        self._refs = 1
+        # Only consumers of this frame wait for its render, other frames render in parallel
+        self._render_lock = threading.Lock()
+
+    @classmethod
+    def allocate(cls, pool, index, thermal_shape, palette_shape):
+        """
+        Frame with its own preallocated SDK buffers and cached ctypes pointers.
+        """
+        frame = cls(image=np.zeros(palette_shape, dtype=np.uint8),
+                    thermal=np.zeros(thermal_shape, dtype=np.uint16))
+        frame.palette = np.zeros(palette_shape, dtype=np.uint8)
+        frame.thermal_ptr = frame.thermal.ctypes.data_as(ct.POINTER(ct.c_ushort))
+        frame.palette_ptr = frame.palette.ctypes.data_as(ct.POINTER(ct.c_ubyte))
+        frame.pool = pool
+        frame.index = index
+        frame._refs = 0
+        return frame
+
+    @property
+    def image(self):
+        if self.renderer is not None:
+            with self._render_lock:
+                if self.renderer is not None:
+                    self._image = self.renderer(self, self._image)
+                    self.renderer = None
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self._image = value
+        self.renderer = None
+
+    def defer_image(self, renderer):
+        """
+        Marks the image as not yet rendered; renderer(frame, out) fills the
+        preallocated buffer (or returns a new one) on first access.
+        """
+        self.renderer = renderer
+
+    @property
+    def rendered(self):
+        return self.renderer is None
+
+    def set_metadata(self, metadata):
+        self.counter = metadata.counter
+        self.counter_hw = metadata.counterHW
+        self.hw_timestamp = metadata.timestamp
+        self.flag_state = metadata.flagState
+        self.temp_chip = metadata.tempChip
+        self.temp_flag = metadata.tempFlag
+        self.temp_box = metadata.tempBox
+
+    def retain(self):
+        if self.pool is not None:
+            with self.pool._lock:
+                self._refs += 1
+        return self
+
+    def release(self):
+        if self.pool is not None:
+            self.pool._release(self)
+
+    def detach(self):
+        """
+        Returns an unpooled copy that stays valid after release().
+        """
+        frame = Frame(
+            thermal=None if self.thermal is None else self.thermal.copy(),
+            temp=self.temp,
+            timestamp=self.timestamp)
+        renderer = self.renderer
+        if renderer is None:
+            frame.image = None if self._image is None else self._image.copy()
+        else:
+            # Still raw: the copy renders on its own when needed
+            frame.defer_image(renderer)
+        frame.stats = self.stats
+        frame.seq = self.seq
+        frame.counter = self.counter
+        frame.counter_hw = self.counter_hw
+        frame.hw_timestamp = self.hw_timestamp
+        frame.flag_state = self.flag_state
+        frame.temp_chip = self.temp_chip
+        frame.temp_flag = self.temp_flag
+        frame.temp_box = self.temp_box
+        return frame
@@ -0,0 +1,135 @@
+import threading
+import time
+import logging
+from collections import deque
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+
+class FrameSubscription:
+    """
+    Consumer side of the FrameBus. Every subscriber has its own bounded deque,
+    a slow consumer only loses its own frames and never blocks the producer:
+    its oldest ("drop_oldest") or the arriving ones ("drop_newest").
+    """
+    def __init__(self, bus, name, maxlen, overflow="drop_oldest"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.bus = bus
+        self.name = name
+        self.overflow = overflow
+        self._frames = deque(maxlen=maxlen)
+        self.dropped = 0
+        self.closed = False
+
+    def _push(self, frame):
+        # Called by the bus with its condition held
+        if len(self._frames) == self._frames.maxlen:
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self._frames.popleft().release()
+        self._frames.append(frame.retain())
+
+    def get(self, timeout=None):
+        """
+        Returns the next frame for this subscriber or None on timeout / close.
+        """
+        with self.bus._cond:
+            if not self._frames and not self.closed:
+                self.bus._cond.wait_for(lambda: self._frames or self.closed or self.bus.closed, timeout=timeout)
+            if self._frames:
+                return self._frames.popleft()
+            return None
+
+    def pending(self):
+        return len(self._frames)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameBus:
+    """
+    Single-producer/multi-consumer frame bus.
+    The acquisition thread publishes, detection, DB buffering, recording and
+    screenshots subscribe or read the latest frame.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._subscribers = []
+        self._latest = None
+        self._seq = 0
+        self._dropped_removed = 0
+        self.closed = False
+
+    def publish(self, frame, timestamp=None):
+        """
+        Stamps seq and capture timestamp on the Frame and hands it to all
+        subscribers. The bus takes its own references, the producer keeps its one.
+        """
+        with self._cond:
+            self._seq += 1
+            frame.seq = self._seq
+            frame.timestamp = time.time() if timestamp is None else timestamp
+            if self._latest is not None:
+                self._latest.release()
+            self._latest = frame.retain()
+            for sub in self._subscribers:
+                sub._push(frame)
+            self._cond.notify_all()
+        return frame
+
+    def latest(self):
+        """
+        Returns the newest frame with a reference taken for the caller (or None).
+        """
+        with self._cond:
+            if self._latest is None:
+                return None
+            return self._latest.retain()
+
+    def dropped(self):
+        """
+        Frames dropped by overflowing subscribers since the bus was created.
+        """
+        with self._cond:
+            return self._dropped_removed + sum(sub.dropped for sub in self._subscribers)
+
+    def subscribe(self, name="", maxlen=1, overflow="drop_oldest"):
+        """
+        maxlen=1 gives latest-frame semantics (control loop, screenshots),
+        larger values let consumers like recorders see every frame.
+        """
+        sub = FrameSubscription(self, name, maxlen, overflow)
+        with self._cond:
+            self._subscribers.append(sub)
+        logging.debug(f"[BUS] Subscriber '{name}' added (maxlen={maxlen})")
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._cond:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+                self._dropped_removed += sub.dropped
+            sub.closed = True
+            while sub._frames:
+                sub._frames.popleft().release()
+            self._cond.notify_all()
+        logging.debug(f"[BUS] Subscriber '{sub.name}' removed")
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            for sub in self._subscribers:
+                sub.closed = True
+            if self._latest is not None:
+                self._latest.release()
+                self._latest = None
+            self._cond.notify_all()
@@ -1,13 +1,88 @@
 import sqlite3
 import cv2
 import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 import numpy as np
 import logging
+from contextlib import contextmanager
+from pathlib import Path
+from config import MAX_ROWS, MAX_DB_BYTES, MAX_FRAME_AGE_S
+from tb_ir.thermal_codec import (ThermalEncoder, KEYFRAME_INTERVAL, ZLIB_LEVEL,
+                                 decode_keyframe, decode_delta)
+from tb_ir.palette import Colouriser
+from tb_ir.frame import Frame
+
+# "jpeg": palette image per frame in `frames`; "raw": lossless uint16 thermal
+# matrix in `thermal_frames` (zlib, delta to the last keyframe)
+STORAGE_MODES = ("jpeg", "raw")
+
+# Group commit: one transaction per WRITER_BATCH_FRAMES frames or WRITER_BATCH_MS, whichever comes first
+WRITER_BATCH_FRAMES = 32
+WRITER_BATCH_MS = 250
+WRITER_QUEUE_FRAMES = 64   # ~2 s at 32 fps, beyond that new frames are dropped
+WRITER_CLOSE_TIMEOUT_S = 5.0
+SQLITE_MMAP_BYTES = 64 * 1024 * 1024
+# Encode stage of the writer: JPEG/zlib run on ENCODE_WORKERS threads (both release the GIL),
+# at most ENCODE_WINDOW frames in flight, results are committed in queue order
+ENCODE_WORKERS = 3
+ENCODE_WINDOW = 8
+
+# Retention: the writer prunes the oldest rows every PRUNE_INTERVAL_S, in transactions of
+# PRUNE_BATCH_ROWS so inserts are never blocked for long, then returns free pages to the OS
+PRUNE_INTERVAL_S = 10.0
+PRUNE_BATCH_ROWS = 500
+PRUNE_BUDGET_S = 0.5
+VACUUM_PAGES = 2048
+
+# Streaming reads: READ_CHUNK_ROWS rows per query, decoded up to DECODE_AHEAD frames
+# ahead of the consumer on DECODE_WORKERS threads
+READ_CHUNK_ROWS = 32
+DECODE_WORKERS = 2
+DECODE_AHEAD = 8
+READ_IN_CHUNK = 500   # ids per "WHERE id IN (...)" query, below SQLite's parameter limit
 
 class FrameDatabase:
-    def __init__(self, db_path="frame_store.db"):
+    def __init__(self, db_path="frame_store.db", batch_frames=WRITER_BATCH_FRAMES, batch_ms=WRITER_BATCH_MS,
+                 queue_frames=WRITER_QUEUE_FRAMES, max_rows=MAX_ROWS, max_bytes=MAX_DB_BYTES,
+                 max_age_s=MAX_FRAME_AGE_S, prune_interval_s=PRUNE_INTERVAL_S, storage="jpeg",
+                 keyframe_interval=KEYFRAME_INTERVAL, compression_level=ZLIB_LEVEL, colouriser=None,
+                 encode_workers=ENCODE_WORKERS, encode_window=ENCODE_WINDOW):
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode: {storage}")
+        self.db_path = db_path
+        self.storage = storage
+        self.table = "thermal_frames" if storage == "raw" else "frames"
+        self.colouriser = colouriser
+        self._encoder = ThermalEncoder(keyframe_interval, compression_level)
+        self._next_id = None
+        self._key_id = None
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.prune_interval_s = prune_interval_s
+        self.batch_frames = batch_frames
+        self.encode_workers = max(int(encode_workers), 1)
+        self.encode_window = max(int(encode_window), 1)
+        self.batch_s = batch_ms / 1000.0
+        self._queue = queue.Queue(maxsize=queue_frames)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._readers = queue.LifoQueue()
+        self._stats_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.lag_ms_last = 0.0
+        self.lag_ms_max = 0.0
+        self.pruned = 0
+        self.vacuumed_pages = 0
+        self._jpeg_listeners = []
         try:
-            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn = self._connect()
+            self._enable_incremental_vacuum()
             self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS frames (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -16,38 +91,591 @@ class FrameDatabase:
                 )
             ''')
             self.conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON frames (timestamp)')
+            # key_id: id of the keyframe a delta row refers to, NULL for keyframes
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS thermal_frames (
+                    id INTEGER PRIMARY KEY,
+                    timestamp REAL,
+                    key_id INTEGER,
+                    height INTEGER,
+                    width INTEGER,
+                    data BLOB
+                )
+            ''')
+            # (timestamp, key_id) + implicit rowid: range, nearest and sampling lookups are
+            # answered from the index alone, BLOB pages are only read for the chosen rows
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_thermal_timestamp_key ON thermal_frames (timestamp, key_id)')
             self.conn.commit()
             logging.info(f"[DB] Connected to {db_path}")
         except Exception as e:
             logging.error(f"[DB] Failed to initialize database: {e}")
             raise
 
+    def _connect(self):
+        """
+        WAL lets readers run next to the writer; synchronous=NORMAL only
+        fsyncs at checkpoints instead of on every commit.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={SQLITE_MMAP_BYTES}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def _connect_reader(self):
+        # Read-only URI: a reader can never take the write lock, query_only guards the rest
+        uri = Path(self.db_path).absolute().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA query_only=ON')
+        conn.execute(f'PRAGMA mmap_size={SQLITE_MMAP_BYTES}')
+        return conn
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Read transaction on a pooled read-only connection. All queries in the
+        block see one WAL snapshot; they neither wait for nor block the
+        writer. Connections are reused across calls and threads.
+        """
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect_reader()
+        try:
+            conn.execute('BEGIN')
+            try:
+                yield conn
+            finally:
+                conn.execute('COMMIT')
+        finally:
+            self._readers.put(conn)
+
+    def _enable_incremental_vacuum(self):
+        # auto_vacuum only takes effect on an empty file or after a full VACUUM. New files
+        # are switched here (VACUUM of an empty schema is instant); converting an existing
+        # database would block startup and need twice its size, so that is left to the user
+        if self.conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            return
+        if self.conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()[0] == 0:
+            self.conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            self.conn.execute('VACUUM')
+            return
+        logging.warning(f"[DB] {self.db_path} has no incremental vacuum, pruned pages stay in the file. "
+                        f"Convert it offline: sqlite3 {self.db_path} 'PRAGMA auto_vacuum=INCREMENTAL; VACUUM;'")
+
+    def add_jpeg_listener(self, callback):
+        """
+        callback(timestamp, jpeg bytes) gets every frame the writer encoded
+        (storage "jpeg"), in queue order, before its batch is committed, so
+        other stages can reuse the JPEG instead of encoding the frame again.
+        It runs on the writer thread and must not block.
+        """
+        if self.storage != "jpeg":
+            raise ValueError("JPEG listeners need storage='jpeg'")
+        self._jpeg_listeners.append(callback)
+
+    def remove_jpeg_listener(self, callback):
+        if callback in self._jpeg_listeners:
+            self._jpeg_listeners.remove(callback)
+
+    def _notify_jpegs(self, rows):
+        for callback in list(self._jpeg_listeners):
+            try:
+                for timestamp, data in rows:
+                    callback(timestamp, data)
+            except Exception as e:
+                logging.error(f"[DB] JPEG listener failed: {e}")
+
+    def _start_writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="db_writer", daemon=True)
+                self._writer.start()
+
     def insert_frame(self, frame):
+        """
+        Queues a Frame for the background writer and returns immediately.
+        The writer holds its own reference until the frame is encoded; if
+        the queue is full the frame is dropped and counted.
+        """
+        if self._writer is None:
+            self._start_writer()
+        if frame.timestamp is None:
+            frame.timestamp = time.time()
+        try:
+            self._queue.put_nowait((frame.retain(), time.perf_counter()))
+        except queue.Full:
+            frame.release()
+            with self._stats_lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 100 == 0:
+                logging.warning(f"[DB] Writer queue full, {dropped} frame(s) dropped so far")
+
+    def _submit_encode(self, pool, frame):
+        """
+        Starts encoding one frame and returns a Future of its row (None if
+        the frame cannot be stored). Raw rows get their id and keyframe
+        reference here, in queue order; only the compression runs in the pool.
+        """
+        if self.storage == "raw":
+            task = self._prepare_raw(frame)
+        else:
+            task = lambda: self._encode_jpeg(frame)
+        if pool is None:
+            future = Future()
+            future.set_result(task())
+            return future
+        return pool.submit(task)
+
+    def _encode_jpeg(self, frame):
         try:
-            timestamp = time.time()
-            success, buffer = cv2.imencode('.jpg', frame)
+            success, buffer = cv2.imencode('.jpg', frame.image)
             if success:
-                self.conn.execute(
-                    "INSERT INTO frames (timestamp, image) VALUES (?, ?)",
-                    (timestamp, buffer.tobytes())
-                )
-                self.conn.commit()
-                logging.debug(f"[DB] Frame inserted at {timestamp}")
+                return (frame.timestamp, buffer.tobytes())
+            logging.warning("[DB] Frame encoding failed.")
+        except Exception as e:
+            logging.error(f"[DB] Error encoding frame: {e}")
+        finally:
+            frame.release()
+        return None
+
+    def _prepare_raw(self, frame):
+        # Ids are assigned here so delta rows can name their keyframe before the batch is committed
+        if frame.thermal is None:
+            logging.warning("[DB] Raw storage needs thermal frames, frame skipped")
+            frame.release()
+            return lambda: None
+        is_key, compress = self._encoder.prepare(frame.thermal)
+        row_id = self._next_id
+        self._next_id += 1
+        if is_key:
+            self._key_id = row_id
+        key_id = None if is_key else self._key_id
+        height, width = frame.thermal.shape
+        timestamp = frame.timestamp
+
+        def task():
+            try:
+                return (row_id, timestamp, key_id, height, width, compress())
+            except Exception as e:
+                logging.error(f"[DB] Error encoding thermal frame: {e}")
+                return None
+            finally:
+                frame.release()
+        return task
+
+    @staticmethod
+    def _collect(entry, rows, queued_at):
+        future, enqueued = entry
+        row = future.result()
+        if row is not None:
+            rows.append(row)
+            queued_at.append(enqueued)
+
+    def _sync_ids(self, conn):
+        # Start a new keyframe after (re)start or a failed batch: its rows may be missing
+        self._next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM thermal_frames").fetchone()[0]
+        self._encoder.force_keyframe()
+
+    def _writer_loop(self):
+        conn = self._connect()
+        if self.storage == "raw":
+            self._sync_ids(conn)
+        pool = None
+        if self.encode_workers > 1:
+            pool = ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix="db_encode")
+        next_prune = time.monotonic()
+        running = True
+        while running:
+            # The queue timeout doubles as the prune timer while no frames arrive
+            try:
+                item = self._queue.get(timeout=self.prune_interval_s)
+            except queue.Empty:
+                item = None
             else:
-                logging.warning("[DB] Frame encoding failed.")
+                if item is None:
+                    break
+            rows, queued_at = [], []
+            pending = deque()
+            deadline = time.perf_counter() + self.batch_s
+            while item is not None:
+                frame, enqueued = item
+                pending.append((self._submit_encode(pool, frame), enqueued))
+                # Bounded in-flight window: wait for the oldest encode before taking more frames
+                while len(pending) > self.encode_window:
+                    self._collect(pending.popleft(), rows, queued_at)
+                if len(rows) + len(pending) >= self.batch_frames:
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+            while pending:
+                self._collect(pending.popleft(), rows, queued_at)
+            if rows:
+                if self._jpeg_listeners:
+                    self._notify_jpegs(rows)
+                self._write_batch(conn, rows, queued_at)
+            if time.monotonic() >= next_prune:
+                self._prune(conn)
+                next_prune = time.monotonic() + self.prune_interval_s
+        if pool is not None:
+            pool.shutdown()
+        conn.close()
+
+    def _write_batch(self, conn, rows, queued_at):
+        try:
+            with conn:
+                if self.storage == "raw":
+                    conn.executemany("INSERT INTO thermal_frames (id, timestamp, key_id, height, width, data) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", rows)
+                else:
+                    conn.executemany("INSERT INTO frames (timestamp, image) VALUES (?, ?)", rows)
         except Exception as e:
-            logging.error(f"[DB] Error inserting frame: {e}")
+            logging.error(f"[DB] Error inserting {len(rows)} frames: {e}")
+            if self.storage == "raw":
+                self._sync_ids(conn)
+            return
+        lag_ms = (time.perf_counter() - queued_at[0]) * 1000.0
+        with self._stats_lock:
+            self.written += len(rows)
+            self.batches += 1
+            self.lag_ms_last = lag_ms
+            self.lag_ms_max = max(self.lag_ms_max, lag_ms)
+        logging.debug(f"[DB] {len(rows)} frames committed, lag {lag_ms:.0f} ms")
+
+    def _excess_rows(self, conn):
+        """
+        Number of oldest rows that violate the retention policy. Ids are only
+        ever deleted from the low end, so MAX(id) - MIN(id) + 1 is the row
+        count without a COUNT(*) scan; bytes are the pages in use.
+        """
+        lo, hi = conn.execute(f"SELECT MIN(id), MAX(id) FROM {self.table}").fetchone()
+        if lo is None:
+            return 0
+        excess = 0
+        if self.max_rows:
+            excess = max(excess, hi - lo + 1 - self.max_rows)
+        if self.max_age_s:
+            cutoff = time.time() - self.max_age_s
+            expired = conn.execute(f"SELECT MAX(id) FROM {self.table} WHERE timestamp < ?", (cutoff,)).fetchone()[0]
+            if expired is not None:
+                excess = max(excess, expired - lo + 1)
+        if self.max_bytes:
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            used = (conn.execute('PRAGMA page_count').fetchone()[0]
+                    - conn.execute('PRAGMA freelist_count').fetchone()[0]) * page_size
+            if used > self.max_bytes:
+                rows = hi - lo + 1
+                excess = max(excess, -(-(used - self.max_bytes) * rows // used))
+        return excess
+
+    def _prune(self, conn):
+        """
+        Deletes the oldest rows in PRUNE_BATCH_ROWS transactions until the
+        policy holds or PRUNE_BUDGET_S is spent (the rest follows next round),
+        then releases up to VACUUM_PAGES free pages.
+        """
+        deadline = time.monotonic() + PRUNE_BUDGET_S
+        pruned = 0
+        try:
+            while time.monotonic() < deadline:
+                excess = self._excess_rows(conn)
+                if excess <= 0:
+                    break
+                with conn:
+                    deleted = conn.execute(
+                        f"DELETE FROM {self.table} WHERE id IN (SELECT id FROM {self.table} ORDER BY id LIMIT ?)",
+                        (min(excess, PRUNE_BATCH_ROWS),)).rowcount
+                    if self.storage == "raw":
+                        # Delta rows whose keyframe is gone can no longer be decoded
+                        deleted += conn.execute(
+                            "DELETE FROM thermal_frames WHERE id < "
+                            "(SELECT MIN(id) FROM thermal_frames WHERE key_id IS NULL)").rowcount
+                pruned += deleted
+                if not deleted:
+                    break
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if free_pages:
+                conn.execute(f'PRAGMA incremental_vacuum({VACUUM_PAGES})').fetchall()
+        except Exception as e:
+            logging.error(f"[DB] Error pruning frames: {e}")
+            return
+        with self._stats_lock:
+            self.pruned += pruned
+            self.vacuumed_pages += min(free_pages, VACUUM_PAGES)
+        if pruned:
+            logging.debug(f"[DB] Pruned {pruned} frames, released {min(free_pages, VACUUM_PAGES)} pages")
+
+    def writer_stats(self):
+        """
+        Writer counters: frames written/dropped, batches, queue depth, the
+        lag (enqueue -> commit of the oldest frame in a batch) and retention
+        (rows pruned, pages released).
+        """
+        with self._stats_lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "queued": self._queue.qsize(),
+                "lag_ms_last": self.lag_ms_last,
+                "lag_ms_max": self.lag_ms_max,
+                "pruned": self.pruned,
+                "vacuumed_pages": self.vacuumed_pages,
+                "storage": self.storage,
+                "encode_workers": self.encode_workers,
+                "compression_ratio": (self._encoder.raw_bytes / self._encoder.encoded_bytes
+                                      if self._encoder.encoded_bytes else None),
+            }
+
+    def _iter_rows(self, table, columns, start, end, chunk_rows):
+        """
+        Rows of table with start <= timestamp < end, oldest first, fetched
+        chunk_rows at a time. The id range is looked up once on the timestamp
+        index; every chunk is then a rowid range scan in its own short
+        snapshot, so a slow consumer never holds a read transaction open.
+        """
+        with self.snapshot() as conn:
+            first, last = conn.execute(
+                f"SELECT MIN(id), MAX(id) FROM {table} WHERE timestamp >= ? AND timestamp < ?",
+                (start, end)).fetchone()
+        if first is None:
+            return
+        next_id = first
+        while next_id <= last:
+            with self.snapshot() as conn:
+                rows = conn.execute(
+                    f"SELECT id, {columns} FROM {table} WHERE id >= ? AND id <= ? ORDER BY id LIMIT ?",
+                    (next_id, last, chunk_rows)).fetchall()
+            if not rows:
+                return
+            yield from rows
+            next_id = rows[-1][0] + 1
+
+    def _iter_decoded(self, tasks, workers):
+        """
+        Runs the (timestamp, callable) tasks on a small thread pool and
+        yields (timestamp, result) in task order. At most DECODE_AHEAD
+        results are pending, so memory stays bounded however long the range.
+        cv2.imdecode, zlib and NumPy release the GIL while they work.
+        """
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db_decode") as pool:
+            try:
+                for timestamp, task in tasks:
+                    pending.append((timestamp, pool.submit(task)))
+                    if len(pending) >= DECODE_AHEAD:
+                        timestamp, future = pending.popleft()
+                        yield timestamp, future.result()
+                while pending:
+                    timestamp, future = pending.popleft()
+                    yield timestamp, future.result()
+            finally:
+                # Consumer stopped early: drop what has not started yet
+                for _, future in pending:
+                    future.cancel()
+
+    def _thermal_tasks(self, start, end, chunk_rows):
+        # Keyframes are decoded here (one per keyframe_interval), delta rows in the pool
+        key_id, key = None, None
+        for row_id, timestamp, ref_id, height, width, data in self._iter_rows(
+                "thermal_frames", "timestamp, key_id, height, width, data", start, end, chunk_rows):
+            shape = (height, width)
+            if ref_id is None:
+                key_id, key = row_id, decode_keyframe(data, shape)
+                yield timestamp, (lambda key=key: key)
+                continue
+            if ref_id != key_id:
+                # Range starts inside a group: fetch its keyframe once
+                with self.snapshot() as conn:
+                    key_row = conn.execute("SELECT data FROM thermal_frames WHERE id = ?", (ref_id,)).fetchone()
+                if key_row is None:
+                    continue
+                key_id, key = ref_id, decode_keyframe(key_row[0], shape)
+            yield timestamp, (lambda data=data, shape=shape, key=key: decode_delta(data, shape, key))
+
+    def iter_thermal(self, start, end=float("inf"), chunk_rows=READ_CHUNK_ROWS, workers=DECODE_WORKERS):
+        """
+        Yields (timestamp, thermal) for start <= timestamp < end, oldest
+        first, decoding ahead on a thread pool. Needs storage="raw".
+        """
+        return self._iter_decoded(self._thermal_tasks(start, end, chunk_rows), workers)
+
+    def iter_frames(self, start, end=float("inf"), chunk_rows=READ_CHUNK_ROWS, workers=DECODE_WORKERS):
+        """
+        Yields (timestamp, BGR image) for start <= timestamp < end, oldest
+        first. JPEG rows are decoded, raw rows decoded and coloured, both
+        ahead of the consumer on a thread pool while keeping the order.
+        """
+        if self.storage == "raw":
+            if self.colouriser is None:
+                self.colouriser = Colouriser()
+            render = self.colouriser.render
+            tasks = ((timestamp, (lambda task=task: render(Frame(thermal=task()))))
+                     for timestamp, task in self._thermal_tasks(start, end, chunk_rows))
+        else:
+            tasks = ((timestamp, (lambda image=image: cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)))
+                     for _, timestamp, image in self._iter_rows("frames", "timestamp, image", start, end, chunk_rows))
+        return self._iter_decoded(tasks, workers)
+
+    def iter_jpegs(self, start, end=float("inf"), chunk_rows=READ_CHUNK_ROWS):
+        """
+        Yields (timestamp, JPEG bytes) of the stored frames, oldest first,
+        for muxing without a decode.
+        """
+        for _, timestamp, image in self._iter_rows("frames", "timestamp, image", start, end, chunk_rows):
+            yield timestamp, image
+
+    def _index_rows(self, conn, where, params, order="ASC", limit=-1):
+        # Covering-index scan: (id, timestamp[, key_id]) without touching the BLOB pages
+        columns = "id, timestamp, key_id" if self.storage == "raw" else "id, timestamp"
+        return conn.execute(
+            f"SELECT {columns} FROM {self.table} WHERE {where} ORDER BY timestamp {order} LIMIT ?",
+            params + (limit,)).fetchall()
+
+    def _load(self, index_rows, thermal=False, workers=DECODE_WORKERS):
+        """
+        Fetches and decodes the rows picked from an index scan. Raw rows also
+        fetch the keyframes they refer to, each keyframe only once.
+        Returns [(timestamp, image or thermal)] in the given order.
+        """
+        ids = [row[0] for row in index_rows]
+        if not ids:
+            return []
+        blobs, keys = {}, {}
+        with self.snapshot() as conn:
+            for i in range(0, len(ids), READ_IN_CHUNK):
+                chunk = ids[i:i + READ_IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                if self.storage == "raw":
+                    query = f"SELECT id, height, width, data FROM thermal_frames WHERE id IN ({marks})"
+                else:
+                    query = f"SELECT id, image FROM frames WHERE id IN ({marks})"
+                blobs.update((row[0], row[1:]) for row in conn.execute(query, chunk))
+            if self.storage == "raw":
+                key_ids = sorted({row[2] for row in index_rows if row[2] is not None})
+                for i in range(0, len(key_ids), READ_IN_CHUNK):
+                    chunk = key_ids[i:i + READ_IN_CHUNK]
+                    marks = ",".join("?" * len(chunk))
+                    keys.update((row[0], row[1:]) for row in conn.execute(
+                        f"SELECT id, height, width, data FROM thermal_frames WHERE id IN ({marks})", chunk))
+
+        if self.storage == "raw":
+            decoded_keys = {key_id: decode_keyframe(data, (height, width))
+                            for key_id, (height, width, data) in keys.items()}
+            render = None
+            if not thermal:
+                if self.colouriser is None:
+                    self.colouriser = Colouriser()
+                render = lambda matrix: self.colouriser.render(Frame(thermal=matrix))
+
+            def task(row_id, key_id):
+                height, width, data = blobs[row_id]
+                if key_id is None:
+                    matrix = decode_keyframe(data, (height, width))
+                else:
+                    matrix = decode_delta(data, (height, width), decoded_keys[key_id])
+                return matrix if render is None else render(matrix)
+            tasks = ((timestamp, (lambda row_id=row_id, key_id=key_id: task(row_id, key_id)))
+                     for row_id, timestamp, key_id in index_rows
+                     if row_id in blobs and (key_id is None or key_id in decoded_keys))
+        else:
+            if thermal:
+                raise ValueError("Thermal data needs storage='raw'")
+            tasks = ((timestamp, (lambda image=blobs[row_id][0]:
+                                  cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)))
+                     for row_id, timestamp in index_rows if row_id in blobs)
+        return list(self._iter_decoded(tasks, workers))
+
+    def get_timestamps_between(self, start, end):
+        """
+        Timestamps of the stored frames in [start, end), from the index only.
+        """
+        with self.snapshot() as conn:
+            return [row[1] for row in self._index_rows(conn, "timestamp >= ? AND timestamp < ?", (start, end))]
+
+    def get_frames_between(self, start, end, thermal=False):
+        """
+        [(timestamp, image)] for start <= timestamp < end, oldest first;
+        thermal=True returns the raw matrices instead (storage="raw").
+        Use iter_frames()/iter_thermal() for long ranges.
+        """
+        if thermal:
+            return list(self.iter_thermal(start, end))
+        return list(self.iter_frames(start, end))
+
+    def get_nearest_frame(self, timestamp, max_distance_s=None, thermal=False):
+        """
+        (timestamp, image) of the frame closest to timestamp, None if the
+        store is empty or the closest frame is further than max_distance_s.
+        Two index seeks, one BLOB read.
+        """
+        with self.snapshot() as conn:
+            candidates = (self._index_rows(conn, "timestamp <= ?", (timestamp,), order="DESC", limit=1)
+                          + self._index_rows(conn, "timestamp > ?", (timestamp,), limit=1))
+        if not candidates:
+            return None
+        nearest = min(candidates, key=lambda row: abs(row[1] - timestamp))
+        if max_distance_s is not None and abs(nearest[1] - timestamp) > max_distance_s:
+            return None
+        frames = self._load([nearest], thermal)
+        return frames[0] if frames else None
+
+    def get_frames_sampled(self, start, end, every=None, interval_s=None, thermal=False):
+        """
+        Strided sample of [start, end): every k-th frame (every=k) or the
+        first frame of each interval_s bucket (interval_s=1.0: one per
+        second). The selection runs on the index, only the sampled frames
+        (plus their keyframes) are read and decoded.
+        """
+        if (every is None) == (interval_s is None):
+            raise ValueError("Pass either every or interval_s")
+        columns = "id, timestamp, key_id" if self.storage == "raw" else "id, timestamp"
+        if every is not None:
+            # Row numbers over the timestamp index (window functions need SQLite >= 3.25)
+            query = (f"SELECT {columns} FROM (SELECT {columns}, ROW_NUMBER() OVER (ORDER BY timestamp) - 1 AS n "
+                     f"FROM {self.table} WHERE timestamp >= ? AND timestamp < ?) "
+                     f"WHERE n % ? = 0 ORDER BY timestamp")
+            params = (start, end, max(int(every), 1))
+        else:
+            # With MIN() the bare columns come from the first row of each bucket
+            query = (f"SELECT {columns.replace('timestamp', 'MIN(timestamp)')} FROM {self.table} "
+                     f"WHERE timestamp >= ? AND timestamp < ? "
+                     f"GROUP BY CAST((timestamp - ?) / ? AS INTEGER) ORDER BY 2")
+            params = (start, end, start, float(interval_s))
+        with self.snapshot() as conn:
+            picked = conn.execute(query, params).fetchall()
+        return self._load(picked, thermal)
+
+    def get_thermal_from_last_n_seconds(self, seconds=10):
+        """
+        Raw thermal matrices (uint16, as from the SDK) of the last seconds as
+        a list of (timestamp, thermal), oldest first. Needs storage="raw".
+        Prefer iter_thermal() for long ranges.
+        """
+        try:
+            frames = list(self.iter_thermal(time.time() - seconds))
+            logging.debug(f"[DB] Retrieved {len(frames)} thermal frames from last {seconds} seconds.")
+            return frames
+        except Exception as e:
+            logging.error(f"[DB] Error retrieving thermal frames: {e}")
+            return []
 
     def get_frames_from_last_n_seconds(self, seconds=10):
+        """
+        List of BGR images of the last seconds. Prefer iter_frames(), which
+        keeps only a few decoded frames in memory.
+        """
         try:
-            now = time.time()
-            start_time = now - seconds
-            cursor = self.conn.execute(
-                "SELECT image FROM frames WHERE timestamp >= ? ORDER BY timestamp ASC",
-                (start_time,)
-            )
-            frames = [cv2.imdecode(np.frombuffer(row[0], np.uint8), cv2.IMREAD_COLOR)
-                      for row in cursor.fetchall()]
+            frames = [image for _, image in self.iter_frames(time.time() - seconds)]
             logging.debug(f"[DB] Retrieved {len(frames)} frames from last {seconds} seconds.")
             return frames
         except Exception as e:
@@ -56,6 +684,17 @@ class FrameDatabase:
 
     def close(self):
         try:
+            if self._writer is not None:
+                # Sentinel after the queued frames: the writer commits what is left, then exits
+                try:
+                    self._queue.put(None, timeout=WRITER_CLOSE_TIMEOUT_S)
+                except queue.Full:
+                    logging.warning(f"[DB] Writer queue still full after {WRITER_CLOSE_TIMEOUT_S:.0f}s, "
+                                    f"dropping {self._queue.qsize()} queued frames")
+                self._writer.join(timeout=WRITER_CLOSE_TIMEOUT_S)
+                self._writer = None
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
             self.conn.close()
             logging.info("[DB] Connection closed.")
         except Exception as e:
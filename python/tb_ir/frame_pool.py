@@ -0,0 +1,47 @@
+import threading
+import logging
+from collections import deque
+from tb_ir.frame import Frame
+
+
+class FramePool:
+    """
+    Rotating pool of preallocated Frames. Released frames are queued at the end
+    and acquire() takes from the front, so a buffer is reused as late as possible.
+    If every frame is still held by a consumer, the pool grows up to max_size;
+    beyond that an unpooled frame is handed out and left to the GC.
+    """
+    def __init__(self, thermal_shape, palette_shape, size=16, max_size=160):
+        self.thermal_shape = tuple(thermal_shape)
+        self.palette_shape = tuple(palette_shape)
+        self.max_size = max(size, max_size)
+        self._lock = threading.Lock()
+        self._free = deque(Frame.allocate(self, i, self.thermal_shape, self.palette_shape) for i in range(size))
+        self.size = size
+        self.misses = 0
+
+    def acquire(self):
+        with self._lock:
+            if self._free:
+                frame = self._free.popleft()
+            elif self.size < self.max_size:
+                frame = Frame.allocate(self, self.size, self.thermal_shape, self.palette_shape)
+                self.size += 1
+                logging.debug(f"[POOL] Grew to {self.size} frames")
+            else:
+                self.misses += 1
+                frame = Frame.allocate(None, -1, self.thermal_shape, self.palette_shape)
+            frame._refs = 1
+            return frame
+
+    def _release(self, frame):
+        with self._lock:
+            frame._refs -= 1
+            if frame._refs == 0:
+                self._free.append(frame)
+            elif frame._refs < 0:
+                frame._refs = 0
+                logging.warning(f"[POOL] Frame {frame.index} released more often than retained")
+
+    def available(self):
+        return len(self._free)
@@ -0,0 +1,131 @@
+import struct
+from array import array
+import cv2
+import numpy as np
+
+AVIF_HASINDEX = 0x10
+AVIIF_KEYFRAME = 0x10
+JPEG_QUALITY = 95            # same default as cv2.imencode / the OpenCV MJPG writer
+RIFF_LIMIT = (1 << 30) - 1   # plain AVI 1.0 (no OpenDML): clips must stay below 1 GiB
+
+
+def jpeg_size(data):
+    """
+    (width, height) from the SOF marker of a JPEG, without decoding it.
+    """
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            raise ValueError("Invalid JPEG marker")
+        marker = data[i + 1]
+        if marker in (0xC0, 0xC1, 0xC2, 0xC3):
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    raise ValueError("No SOF marker in JPEG")
+
+
+class MjpegAviWriter:
+    """
+    Minimal AVI muxer for MJPG: every frame is one JPEG stored as it is.
+
+    write_jpeg() takes already encoded frames (e.g. the JPEG rows of the
+    FrameDatabase) and copies them into the container, write() encodes a
+    BGR image once with cv2.imencode. Frame count, index, chunk sizes and
+    the frame rate (set_fps(), e.g. once the real rate is known) are
+    patched in by close().
+    """
+    def __init__(self, filename, width, height, fps=32, quality=JPEG_QUALITY):
+        self.filename = str(filename)
+        self.width, self.height = int(width), int(height)
+        self.fps = fps
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self.frames = 0
+        self._index = array("I")   # (offset, size) pairs relative to the 'movi' fourcc
+        self._max_chunk = 0
+        self._file = open(self.filename, "wb")
+        self._write_headers()
+
+    def _rate(self):
+        return int(round(1e6 / self.fps)), 1000, max(int(round(self.fps * 1000)), 1)
+
+    def _write_headers(self):
+        usec, scale, rate = self._rate()
+        avih = struct.pack("<14I", usec, 0, 0, AVIF_HASINDEX, 0, 0, 1, 0,
+                           self.width, self.height, 0, 0, 0, 0)
+        strh = struct.pack("<4s4sIHHIIIIIIIIhhhh", b"vids", b"MJPG", 0, 0, 0, 0, scale, rate, 0, 0, 0,
+                           0xFFFFFFFF, 0, 0, 0, self.width, self.height)
+        strf = struct.pack("<IiiHH4sIiiII", 40, self.width, self.height, 1, 24, b"MJPG",
+                           self.width * self.height * 3, 0, 0, 0, 0)
+        strl = b"strl" + self._chunk(b"strh", strh) + self._chunk(b"strf", strf)
+        hdrl = b"hdrl" + self._chunk(b"avih", avih) + self._chunk(b"LIST", strl)
+        f = self._file
+        f.write(b"RIFF" + b"\0\0\0\0" + b"AVI ")
+        f.write(self._chunk(b"LIST", hdrl))
+        # Offsets of the fields close() has to fill in
+        self._avih_frames = 12 + 8 + 4 + 8 + 16
+        self._strh_length = 12 + 8 + 4 + 8 + 56 + 8 + 4 + 8 + 32
+        self._avih_buffer = self._avih_frames + 12
+        self._strh_buffer = self._strh_length + 4
+        self._avih_usec = self._avih_frames - 16
+        self._strh_scale = self._strh_length - 12
+        self._movi = f.tell()
+        f.write(b"LIST" + b"\0\0\0\0" + b"movi")
+
+    @staticmethod
+    def _chunk(fourcc, payload):
+        return fourcc + struct.pack("<I", len(payload)) + payload + (b"\0" if len(payload) % 2 else b"")
+
+    def set_fps(self, fps):
+        if fps > 0:
+            self.fps = fps
+
+    def write_jpeg(self, data):
+        """
+        Appends one JPEG as a frame, without decoding or re-encoding it.
+        """
+        if self._file.tell() + len(data) + 8 > RIFF_LIMIT:
+            raise OverflowError(f"{self.filename} would exceed the AVI 1.0 size limit")
+        self._index.extend((self._file.tell() - self._movi - 8, len(data)))
+        self._file.write(self._chunk(b"00dc", bytes(data)))
+        self._max_chunk = max(self._max_chunk, len(data))
+        self.frames += 1
+
+    def write(self, image):
+        success, buffer = cv2.imencode(".jpg", image, self.params)
+        if not success:
+            raise RuntimeError("JPEG encoding failed")
+        self.write_jpeg(buffer)
+
+    def close(self):
+        if self._file is None:
+            return
+        f = self._file
+        movi_end = f.tell()
+        entries = bytearray()
+        for i in range(0, len(self._index), 2):
+            entries += struct.pack("<4sIII", b"00dc", AVIIF_KEYFRAME, self._index[i], self._index[i + 1])
+        f.write(b"idx1" + struct.pack("<I", len(entries)) + entries)
+        end = f.tell()
+        usec, scale, rate = self._rate()
+        for offset, value in ((self._avih_usec, usec), (self._strh_scale, scale), (self._strh_scale + 4, rate),
+                              (4, end - 8), (self._movi + 4, movi_end - self._movi - 8),
+                              (self._avih_frames, self.frames), (self._strh_length, self.frames),
+                              (self._avih_buffer, self._max_chunk), (self._strh_buffer, self._max_chunk)):
+            f.seek(offset)
+            f.write(struct.pack("<I", value))
+        f.close()
+        self._file = None
+
+    def frame_index(self):
+        """
+        (file offset, size) of the JPEG data of every frame written so far,
+        so frames can be read back without parsing the file.
+        """
+        index = np.frombuffer(self._index, dtype=np.uint32).reshape(-1, 2).astype(np.uint64)
+        index[:, 0] += self._movi + 16
+        return index
+
+    def release(self):
+        # cv2.VideoWriter naming
+        self.close()
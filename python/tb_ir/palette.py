@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+from tb_ir.thermal_stats import RAW_SCALE, celsius_to_raw
+
+PALETTES = ("ironbow", "rainbow", "grey")
+
+LUT_SIZE = 1 << 16  # one entry per raw uint16 value
+
+# Ironbow stops as (position, (R, G, B))
+_IRONBOW_STOPS = (
+    (0.00, (0, 0, 0)),
+    (0.15, (30, 0, 110)),
+    (0.35, (150, 0, 150)),
+    (0.55, (225, 60, 20)),
+    (0.75, (250, 160, 0)),
+    (0.90, (255, 225, 60)),
+    (1.00, (255, 255, 255)),
+)
+
+
+def palette_colors(name):
+    """
+    256 BGR colours of a palette as (256, 3) uint8.
+    """
+    ramp = np.arange(256, dtype=np.uint8)
+    if name == "grey":
+        return np.repeat(ramp[:, None], 3, axis=1)
+    if name == "rainbow":
+        return cv2.applyColorMap(ramp.reshape(-1, 1), cv2.COLORMAP_RAINBOW).reshape(256, 3)
+    if name == "ironbow":
+        positions = np.array([p for p, _ in _IRONBOW_STOPS]) * 255.0
+        rgb = np.array([c for _, c in _IRONBOW_STOPS], dtype=np.float64)
+        channels = [np.interp(ramp, positions, rgb[:, i]) for i in (2, 1, 0)]
+        return np.round(np.stack(channels, axis=1)).astype(np.uint8)
+    raise ValueError(f"Unknown palette: {name}")
+
+
+class Colouriser:
+    """
+    Turns a raw uint16 thermal matrix into a BGR image with one table lookup
+    per pixel. The table maps every raw value to its colour for a given
+    span, so rendering needs no float temperature image and no cvtColor.
+
+    Tables are cached per (lo, hi) span. With auto-range the span follows
+    the frame min/max but is only moved when either end drifts by more than
+    tolerance_c, so consecutive frames reuse the same table and colours stay
+    stable between live view, screenshots and videos. A fixed span_c=(lo, hi)
+    in °C disables auto-range.
+    """
+    def __init__(self, palette="ironbow", tolerance_c=1.0, span_c=None, cache_size=8):
+        self.palette = palette
+        self.colors = palette_colors(palette)
+        self.tolerance_raw = int(round(tolerance_c * RAW_SCALE))
+        self.fixed_span = None
+        if span_c is not None:
+            self.fixed_span = (celsius_to_raw(span_c[0]), celsius_to_raw(span_c[1]))
+        self.cache_size = cache_size
+        self._luts = OrderedDict()
+        self._span = self.fixed_span
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def _frame_span(self, frame):
+        if frame.stats is not None:
+            return celsius_to_raw(frame.stats.min), celsius_to_raw(frame.stats.max)
+        lo, hi, _, _ = cv2.minMaxLoc(frame.thermal)
+        return int(lo), int(hi)
+
+    def _select_span(self, frame):
+        if self.fixed_span is not None:
+            return self.fixed_span
+        lo, hi = self._frame_span(frame)
+        if self._span is not None:
+            cur_lo, cur_hi = self._span
+            if abs(lo - cur_lo) <= self.tolerance_raw and abs(hi - cur_hi) <= self.tolerance_raw:
+                return self._span
+        self._span = (lo, hi)
+        return self._span
+
+    def _build_lut(self, lo, hi):
+        index = np.arange(LUT_SIZE, dtype=np.float32)
+        index -= lo
+        index *= 255.0 / max(hi - lo, 1)
+        np.clip(index, 0, 255, out=index)
+        self.rebuilds += 1
+        return self.colors[index.astype(np.uint8)]
+
+    def lut(self, span):
+        """
+        (65536, 3) BGR table for a raw span, built once and kept in a small LRU.
+        """
+        lut = self._luts.get(span)
+        if lut is None:
+            lut = self._build_lut(*span)
+            self._luts[span] = lut
+            if len(self._luts) > self.cache_size:
+                self._luts.popitem(last=False)
+        else:
+            self._luts.move_to_end(span)
+        return lut
+
+    def render(self, frame, out=None):
+        """
+        Renderer for Frame.defer_image(): colours frame.thermal into out
+        ((H, W, 3) uint8, allocated if None) and returns it.
+        """
+        with self._lock:
+            lut = self.lut(self._select_span(frame))
+        if out is None or out.shape[:2] != frame.thermal.shape:
+            out = np.empty(frame.thermal.shape + (3,), dtype=np.uint8)
+        np.take(lut, frame.thermal, axis=0, out=out)
+        return out
@@ -0,0 +1,102 @@
+import logging
+from pathlib import Path
+import numpy as np
+from tb_ir.ring_buffer import FrameRingBuffer
+
+# File layout: [header, 1 page][timestamps, capacity x float64, page aligned][frame slots]
+MAGIC = b"TBRING01"
+PAGE = 4096
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("capacity", "<u8"),
+    ("written", "<u8"),       # write cursor, updated after each slot is complete
+    ("dtype", "S8"),
+    ("ndim", "<u4"),
+    ("shape", "<u4", (3,)),
+])
+
+
+def _aligned(n):
+    return -(-n // PAGE) * PAGE
+
+
+class PersistentFrameRing(FrameRingBuffer):
+    """
+    FrameRingBuffer backed by one preallocated file through np.memmap.
+
+    Slots, timestamps and the write cursor live in the file, so appends are
+    still a single copy and window() still returns views; the OS writes the
+    pages back. After a crash or restart the ring is reopened with its
+    content, and the first anomaly clip already has its pre-event frames.
+
+    The file is recreated when capacity, shape or dtype no longer match.
+    """
+    def __init__(self, path, capacity, shape=None, dtype=np.uint16):
+        self.path = Path(path)
+        self._header = None
+        super().__init__(capacity)
+        if not self._reopen() and shape is not None:
+            self._allocate(tuple(shape), np.dtype(dtype))
+
+    @property
+    def written(self):
+        return self._written
+
+    @written.setter
+    def written(self, value):
+        self._written = value
+        if self._header is not None:
+            self._header["written"][0] = value
+
+    def _map(self, shape, dtype, mode):
+        ts_offset = PAGE
+        data_offset = ts_offset + _aligned(self.capacity * 8)
+        self._header = np.memmap(self.path, dtype=HEADER_DTYPE, mode=mode, offset=0, shape=(1,))
+        self.timestamps = np.memmap(self.path, dtype=np.float64, mode=mode, offset=ts_offset, shape=(self.capacity,))
+        self.data = np.memmap(self.path, dtype=dtype, mode=mode, offset=data_offset, shape=(self.capacity,) + shape)
+
+    def _reopen(self):
+        if not self.path.exists() or self.path.stat().st_size < PAGE:
+            return False
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)[0]
+        if header["magic"] != MAGIC or int(header["capacity"]) != self.capacity:
+            logging.info(f"[RING] {self.path} has another layout, starting empty")
+            return False
+        ndim = int(header["ndim"])
+        shape = tuple(int(n) for n in header["shape"][:ndim])
+        try:
+            self._map(shape, np.dtype(header["dtype"].decode()), "r+")
+        except (ValueError, OSError) as e:
+            logging.warning(f"[RING] Cannot map {self.path}: {e}")
+            self._header = None
+            return False
+        self._written = int(header["written"])
+        logging.info(f"[RING] Reopened {self.path} with {len(self)} frame(s)")
+        return True
+
+    def _allocate(self, shape, dtype):
+        if len(shape) > 3:
+            raise ValueError(f"Unsupported frame shape {shape}")
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = PAGE + _aligned(self.capacity * 8) + self.capacity * int(np.prod(shape)) * dtype.itemsize
+        # Sparse file of the final size, the slots are only filled by append()
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        self._map(shape, dtype, "r+")
+        self._header[0] = (MAGIC, self.capacity, 0, dtype.str.encode(), len(shape), tuple(shape) + (0,) * (3 - len(shape)))
+        self.timestamps.fill(-np.inf)
+        self.written = 0
+
+    def flush(self):
+        for array in (self.data, self.timestamps, self._header):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._header = None
+            self.data = None
+            self.timestamps = np.full(self.capacity, -np.inf, dtype=np.float64)
+            self._written = 0
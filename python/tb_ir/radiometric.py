@@ -0,0 +1,167 @@
+import time
+from pathlib import Path
+import numpy as np
+from tb_ir.thermal_stats import RAW_SCALE, RAW_OFFSET
+
+# File layout: [header, HEADER_SIZE bytes][frame 0][frame 1]...[frame N-1][metadata table]
+# frames = one contiguous block of (H, W) little-endian uint16 raw frames, the table
+# holds one METADATA_DTYPE record per frame and is written by close()
+MAGIC = b"TBRAD002"
+HEADER_SIZE = 512
+SUFFIX = ".tbr"
+METADATA_CHUNK = 1024   # records the in-memory table grows by
+
+METADATA_DTYPE = np.dtype([
+    ("timestamp", "<f8"),     # host capture time (time.time())
+    ("counter", "<u4"),
+    ("counter_hw", "<u4"),
+    ("hw_timestamp", "<i8"),
+    ("flag_state", "<i4"),
+    ("temp_chip", "<f4"),
+    ("temp_flag", "<f4"),
+    ("temp_box", "<f4"),
+])
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("fps", "<f8"),
+    ("frames", "<u8"),        # written by close(); readers count complete frames instead
+    ("raw_scale", "<f8"),     # T[°C] = raw / raw_scale - raw_offset
+    ("raw_offset", "<f8"),
+    ("created", "<f8"),
+    ("metadata_offset", "<u8"),  # start of the metadata table, 0 until close()
+])
+
+
+def frame_metadata(frame, out):
+    out["timestamp"] = frame.timestamp if frame.timestamp is not None else time.time()
+    out["counter"] = frame.counter or 0
+    out["counter_hw"] = frame.counter_hw or 0
+    out["hw_timestamp"] = frame.hw_timestamp or 0
+    out["flag_state"] = frame.flag_state or 0
+    out["temp_chip"] = frame.temp_chip or 0.0
+    out["temp_flag"] = frame.temp_flag or 0.0
+    out["temp_box"] = frame.temp_box or 0.0
+
+
+class RadiometricWriter:
+    """
+    Writes raw thermal frames into a radiometric recording (.tbr): a fixed
+    header with resolution, fps and the raw -> °C calibration, the frames
+    as one contiguous block and, on close(), the metadata table behind it.
+
+    append() is one buffer write and no conversion; the metadata (40 bytes
+    per frame) is kept in memory until close(). The frames stay readable
+    after a crash: readers count the complete frames and reconstruct the
+    timestamps from fps.
+    """
+    def __init__(self, filename, width, height, fps=32, raw_scale=RAW_SCALE, raw_offset=RAW_OFFSET):
+        self.filename = Path(filename)
+        self.width, self.height = int(width), int(height)
+        self.fps = fps
+        self.frames = 0
+        self._header = np.zeros(1, dtype=HEADER_DTYPE)
+        self._header[0] = (MAGIC, self.width, self.height, fps, 0, raw_scale, raw_offset, time.time(), 0)
+        self._metadata = np.zeros(METADATA_CHUNK, dtype=METADATA_DTYPE)
+        self._file = open(self.filename, "wb")
+        self._file.write(self._header.tobytes().ljust(HEADER_SIZE, b"\0"))
+
+    def _check(self, thermal):
+        if thermal.shape != (self.height, self.width) or thermal.dtype != np.uint16:
+            raise ValueError(f"Frame {thermal.dtype} {thermal.shape} does not match {self.height}x{self.width} uint16")
+
+    def _next_metadata(self):
+        if self.frames == len(self._metadata):
+            grown = np.zeros(len(self._metadata) + METADATA_CHUNK, dtype=METADATA_DTYPE)
+            grown[:self.frames] = self._metadata
+            self._metadata = grown
+        return self._metadata[self.frames]
+
+    def _write_thermal(self, thermal):
+        self._file.write(np.ascontiguousarray(thermal, dtype="<u2"))
+        self.frames += 1
+
+    def append(self, thermal, metadata=None):
+        """
+        thermal: (H, W) uint16; metadata: METADATA_DTYPE record or None.
+        """
+        self._check(thermal)
+        record = self._next_metadata()
+        if metadata is None:
+            record["timestamp"] = time.time()
+        else:
+            self._metadata[self.frames] = metadata
+        self._write_thermal(thermal)
+
+    def write_frame(self, frame):
+        self._check(frame.thermal)
+        frame_metadata(frame, self._next_metadata())
+        self._write_thermal(frame.thermal)
+
+    def set_fps(self, fps):
+        if fps > 0:
+            self.fps = fps
+
+    def close(self):
+        if self._file is None:
+            return
+        # The file position is right behind the last frame
+        self._header["metadata_offset"] = self._file.tell()
+        self._file.write(self._metadata[:self.frames].tobytes())
+        self._header["frames"] = self.frames
+        self._header["fps"] = self.fps
+        self._file.seek(0)
+        self._file.write(self._header.tobytes())
+        self._file.close()
+        self._file = None
+
+    def release(self):
+        self.close()
+
+
+class RadiometricRecording:
+    """
+    Read-only view of a .tbr recording through np.memmap, nothing is copied:
+    thermal is the contiguous (N, H, W) uint16 frame array, metadata the
+    (N,) array of METADATA_DTYPE records. celsius() converts with the stored
+    calibration.
+
+    A recording that was never closed has no metadata table: its complete
+    frames are mapped, complete is False and the metadata only holds
+    timestamps reconstructed from created and fps.
+    """
+    def __init__(self, filename):
+        self.filename = Path(filename)
+        header = np.fromfile(self.filename, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header[0]["magic"] != MAGIC:
+            raise ValueError(f"{self.filename} is not a radiometric recording")
+        self.header = header[0]
+        self.width, self.height = int(self.header["width"]), int(self.header["height"])
+        self.fps = float(self.header["fps"])
+        self.raw_scale, self.raw_offset = float(self.header["raw_scale"]), float(self.header["raw_offset"])
+        metadata_offset = int(self.header["metadata_offset"])
+        self.complete = metadata_offset > 0
+        if self.complete:
+            count = int(self.header["frames"])
+        else:
+            frame_bytes = self.width * self.height * 2
+            count = max(self.filename.stat().st_size - HEADER_SIZE, 0) // frame_bytes
+        if count > 0:
+            self.thermal = np.memmap(self.filename, dtype="<u2", mode="r", offset=HEADER_SIZE,
+                                     shape=(count, self.height, self.width))
+        else:
+            self.thermal = np.zeros((0, self.height, self.width), dtype="<u2")
+        if self.complete and count > 0:
+            self.metadata = np.memmap(self.filename, dtype=METADATA_DTYPE, mode="r", offset=metadata_offset,
+                                      shape=(count,))
+        else:
+            self.metadata = np.zeros(count, dtype=METADATA_DTYPE)
+            self.metadata["timestamp"] = float(self.header["created"]) + np.arange(count) / (self.fps or 1.0)
+
+    def __len__(self):
+        return len(self.thermal)
+
+    def celsius(self, index):
+        return self.thermal[index] / self.raw_scale - self.raw_offset
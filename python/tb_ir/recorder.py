@@ -0,0 +1,158 @@
+import time
+import logging
+import threading
+from tb_ir.mjpeg_avi import MjpegAviWriter
+from tb_ir.radiometric import RadiometricWriter
+
+RECORD_QUEUE_FRAMES = 64   # ~2 s at 32 fps the recorder may fall behind before frames are dropped
+REPORT_INTERVAL_S = 5.0
+NOMINAL_FPS = 32           # container rate when too few frames were recorded to measure one
+
+
+class BusRecorder:
+    """
+    Records frames from a FrameBus subscription into an MJPG AVI.
+
+    The subscription is the recorder's bounded queue (queue_frames). When
+    encoding falls behind, policy decides which frames are lost: the oldest
+    queued ones ("drop_oldest") or the newly arriving ones ("drop_newest");
+    acquisition itself is never blocked. Frames the SDK delivered twice
+    (same counter) are skipped.
+
+    The container frame rate is the capture rate measured from the frame
+    timestamps, so playback runs at real speed whatever rate the camera
+    actually delivered. stats() can be polled while recording runs.
+
+    writer_factory is called like the MjpegAviWriter constructor, e.g.
+    EncoderClient.writer to encode in the encoder process. With
+    raw_filename, frames that carry raw thermal data are also appended to
+    a radiometric recording (.tbr) for measuring temperatures afterwards.
+    With filename None only the radiometric recording is written and no
+    palette image is rendered (e.g. while the AVI is cut from segments).
+    """
+    def __init__(self, bus, filename, queue_frames=RECORD_QUEUE_FRAMES, policy="drop_oldest",
+                 name="record_video", report_interval_s=REPORT_INTERVAL_S, writer_factory=MjpegAviWriter,
+                 raw_filename=None):
+        self.bus = bus
+        self.filename = filename
+        self.queue_frames = queue_frames
+        self.policy = policy
+        self.name = name
+        self.report_interval_s = report_interval_s
+        self.writer_factory = writer_factory
+        self.raw_filename = raw_filename
+        self.writer = None
+        self.raw_writer = None
+        self.written = 0
+        self.duplicates = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.encoded_fps = 0.0
+        self._sub = None
+        self._dropped = 0
+        self._last_counter = None
+        self._lock = threading.Lock()
+        self._report_at = None
+        self._report_written = 0
+
+    def capture_fps(self):
+        if self.written < 2 or self.last_ts <= self.first_ts:
+            return None
+        return (self.written - 1) / (self.last_ts - self.first_ts)
+
+    def stats(self):
+        with self._lock:
+            sub = self._sub
+            return {
+                "frames": self.written,
+                "duplicates": self.duplicates,
+                "dropped": sub.dropped if sub is not None else self._dropped,
+                "queued": sub.pending() if sub is not None else 0,
+                "encoded_fps": self.encoded_fps,
+                "capture_fps": self.capture_fps(),
+                "seconds": (self.last_ts - self.first_ts) if self.written else 0.0,
+            }
+
+    def _write(self, frame):
+        if frame.counter is not None and frame.counter == self._last_counter:
+            self.duplicates += 1
+            return
+        if self.filename is not None:
+            image = frame.image
+            if image is None:
+                return
+            if self.writer is None:
+                height, width = image.shape[:2]
+                self.writer = self.writer_factory(self.filename, width, height, NOMINAL_FPS)
+            self.writer.write(image)
+        elif frame.thermal is None:
+            return
+        if self.raw_filename is not None and frame.thermal is not None:
+            if self.raw_writer is None:
+                height, width = frame.thermal.shape
+                self.raw_writer = RadiometricWriter(self.raw_filename, width, height, NOMINAL_FPS)
+            self.raw_writer.write_frame(frame)
+        with self._lock:
+            self._last_counter = frame.counter
+            if self.first_ts is None:
+                self.first_ts = frame.timestamp
+            self.last_ts = frame.timestamp
+            self.written += 1
+
+    def _report(self, now):
+        if self._report_at is None:
+            self._report_at, self._report_written = now, self.written
+            return
+        elapsed = now - self._report_at
+        if elapsed < self.report_interval_s:
+            return
+        with self._lock:
+            self.encoded_fps = (self.written - self._report_written) / elapsed
+        self._report_at, self._report_written = now, self.written
+        stats = self.stats()
+        logging.info(f"[REC] {stats['frames']} frames, {stats['encoded_fps']:.1f} fps encoded, "
+                     f"queue {stats['queued']}/{self.queue_frames}, {stats['dropped']} dropped")
+
+    def record(self, duration, should_stop=lambda: False):
+        """
+        Records duration seconds of capture time (or until should_stop()
+        returns True) and returns the number of frames written.
+        """
+        start = time.time()
+        with self.bus.subscribe(name=self.name, maxlen=self.queue_frames, overflow=self.policy) as sub:
+            self._sub = sub
+            try:
+                while not should_stop():
+                    now = time.time()
+                    # Wall-clock guard in case acquisition stalls
+                    if now - start >= duration + 1.0 or self.bus.closed:
+                        break
+                    bus_frame = sub.get(timeout=0.5)
+                    if bus_frame is None:
+                        continue
+                    try:
+                        if self.first_ts is not None and bus_frame.timestamp - self.first_ts >= duration:
+                            break
+                        self._write(bus_frame)
+                    finally:
+                        bus_frame.release()
+                    self._report(now)
+            finally:
+                self._finish(sub)
+        return self.written
+
+    def _finish(self, sub):
+        with self._lock:
+            self._sub = None
+            self._dropped = sub.dropped
+        if self.writer is None and self.raw_writer is None:
+            return
+        fps = self.capture_fps()
+        for writer in (self.writer, self.raw_writer):
+            if writer is None:
+                continue
+            if fps is not None:
+                writer.set_fps(fps)
+            writer.close()
+        logging.info(f"[REC] {self.filename or self.raw_filename}: {self.written} frames at {fps or NOMINAL_FPS:.2f} fps, "
+                     f"{sub.dropped} dropped, {self.duplicates} duplicates")
@@ -0,0 +1,132 @@
+import threading
+import numpy as np
+
+
+class FrameRingBuffer:
+    """
+    Preallocated in-memory buffer of the most recent frames: one (N, H, W[, C])
+    array plus a parallel float64 timestamp array.
+
+    append() copies into the next slot (O(1), no allocation). Timestamps are
+    ascending within the two halves of the ring, so window() finds a time
+    range with searchsorted and returns views, not copies.
+
+    Views stay valid until the writer comes round again; capacity should
+    leave some margin beyond the longest window that is read. iter_window()
+    checks every frame before yielding it and skips (and counts) frames that
+    were already overwritten.
+    """
+    def __init__(self, capacity, shape=None, dtype=np.uint16):
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        self.data = None
+        self.timestamps = np.full(self.capacity, -np.inf, dtype=np.float64)
+        self.written = 0
+        self.overruns = 0
+        self._lock = threading.Condition()
+        if shape is not None:
+            self._allocate(tuple(shape), np.dtype(dtype))
+
+    def _allocate(self, shape, dtype):
+        self.data = np.empty((self.capacity,) + shape, dtype=dtype)
+        self.timestamps.fill(-np.inf)
+        self.written = 0
+
+    def append(self, array, timestamp):
+        """
+        Copies one frame into the ring. A frame of another shape/dtype
+        (e.g. after a camera restart) reallocates and clears the buffer.
+        """
+        with self._lock:
+            if self.data is None or self.data.shape[1:] != array.shape or self.data.dtype != array.dtype:
+                self._allocate(array.shape, array.dtype)
+            slot = self.written % self.capacity
+            self.data[slot] = array
+            self.timestamps[slot] = timestamp
+            self.written += 1
+            self._lock.notify_all()
+
+    def latest_timestamp(self):
+        if not self.written:
+            return -np.inf
+        return float(self.timestamps[(self.written - 1) % self.capacity])
+
+    def oldest_timestamp(self):
+        if not self.written:
+            return np.inf
+        return float(self.timestamps[self.written % self.capacity if self.written > self.capacity else 0])
+
+    def frame_rate(self):
+        """
+        Capture rate of the buffered frames in fps, None with fewer than two.
+        """
+        with self._lock:
+            count = len(self)
+            if count < 2:
+                return None
+            span = self.latest_timestamp() - self.oldest_timestamp()
+            return (count - 1) / span if span > 0 else None
+
+    def wait_for(self, timestamp, timeout=1.0):
+        """
+        Blocks until a frame with timestamp >= timestamp has been appended
+        (the writer may lag behind other bus subscribers). Returns False on timeout.
+        """
+        with self._lock:
+            return self._lock.wait_for(lambda: self.latest_timestamp() >= timestamp, timeout=timeout)
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def _segments(self):
+        # Oldest first: [head, capacity) then [0, head) once the ring has wrapped
+        head = self.written % self.capacity
+        if self.written <= self.capacity:
+            return [(0, self.written)] if self.written else []
+        return [(head, self.capacity), (0, head)]
+
+    def _serial(self, slot):
+        # Running number (0-based write count) of the frame currently in slot
+        head = self.written % self.capacity
+        wraps = self.written // self.capacity
+        return (wraps - 1) * self.capacity + slot if slot >= head else wraps * self.capacity + slot
+
+    def window(self, start, end=np.inf):
+        """
+        Frames with start <= timestamp < end, oldest first, as a list of up to
+        two (frames_view, timestamps_view, first_serial) segments.
+        """
+        segments = []
+        with self._lock:
+            if self.data is None:
+                return segments
+            for lo, hi in self._segments():
+                ts = self.timestamps[lo:hi]
+                i = lo + int(np.searchsorted(ts, start, side="left"))
+                j = lo + int(np.searchsorted(ts, end, side="left"))
+                if j > i:
+                    segments.append((self.data[i:j], self.timestamps[i:j], self._serial(i)))
+        return segments
+
+    def iter_window(self, start, end=np.inf):
+        """
+        Yields (frame_view, timestamp) for the window, skipping frames the
+        writer has overwritten in the meantime.
+        """
+        for frames, timestamps, first_serial in self.window(start, end):
+            for k in range(len(frames)):
+                if self.written - (first_serial + k) > self.capacity:
+                    self.overruns += 1
+                    continue
+                yield frames[k], float(timestamps[k])
+
+    def clear(self):
+        with self._lock:
+            self.timestamps.fill(-np.inf)
+            self.written = 0
+
+    def close(self):
+        """
+        Nothing to release for the in-memory ring (see PersistentFrameRing).
+        """
@@ -0,0 +1,270 @@
+import os
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+import numpy as np
+from tb_ir.mjpeg_avi import MjpegAviWriter, jpeg_size
+
+SEGMENT_SECONDS = 10
+SEGMENT_RETENTION_S = 3600   # must cover PRE_EVENT_DURATION + the longest event session
+SEGMENT_QUEUE_FRAMES = 64
+NOMINAL_FPS = 32
+INDEX_DTYPE = np.dtype([("timestamp", "<f8"), ("offset", "<u8"), ("size", "<u4")])
+
+
+class SegmentIndex:
+    """
+    SQLite index of the closed segments: start/end timestamp and, per
+    frame, the capture timestamp and byte offset/size of its JPEG data in
+    the segment file (one blob per segment).
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT,
+                start REAL,
+                end REAL,
+                frames INTEGER,
+                bytes INTEGER,
+                frame_index BLOB
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_segments_end ON segments(end)")
+        self.conn.commit()
+
+    def add(self, path, index):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO segments (path, start, end, frames, bytes, frame_index) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(path), float(index["timestamp"][0]), float(index["timestamp"][-1]), len(index),
+                 os.path.getsize(path), index.tobytes()))
+
+    def segments_between(self, start, end):
+        """
+        (path, frame index) of the segments overlapping [start, end), oldest first.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path, frame_index FROM segments WHERE end >= ? AND start < ? ORDER BY start",
+                (start, end)).fetchall()
+        return [(path, np.frombuffer(blob, dtype=INDEX_DTYPE)) for path, blob in rows]
+
+    def covered_until(self):
+        with self._lock:
+            return self.conn.execute("SELECT MAX(end) FROM segments").fetchone()[0] or 0.0
+
+    def remove_before(self, timestamp):
+        """
+        Drops the segments that end before timestamp, returns their paths.
+        """
+        with self._lock, self.conn:
+            paths = [row[0] for row in self.conn.execute("SELECT path FROM segments WHERE end < ?", (timestamp,))]
+            self.conn.execute("DELETE FROM segments WHERE end < ?", (timestamp,))
+        return paths
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SegmentRecorder:
+    """
+    Always-on recording: frames from a FrameBus subscription are written to
+    MJPG segments of segment_seconds capture time in directory, each
+    closed segment is entered into the SegmentIndex.
+
+    Anomaly and manual clips are cut from the segments with iter_jpegs():
+    the JPEG data is read at the indexed offsets and muxed as it is, so a
+    clip costs no decoding or encoding. Segments older than retention_s
+    are deleted on rollover.
+
+    writer_factory is called like the MjpegAviWriter constructor (e.g.
+    EncoderClient.writer) and must provide frame_index() after close().
+
+    With jpeg_source (a FrameDatabase with storage "jpeg") the recorder
+    does not subscribe to the bus: it muxes the JPEGs the DB writer
+    encodes anyway, so every frame is rendered and encoded only once.
+    Frames the DB drops are missing from the segments as well.
+    """
+    def __init__(self, bus, directory, segment_seconds=SEGMENT_SECONDS, retention_s=SEGMENT_RETENTION_S,
+                 queue_frames=SEGMENT_QUEUE_FRAMES, writer_factory=MjpegAviWriter, jpeg_source=None):
+        self.bus = bus
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_seconds = segment_seconds
+        self.retention_s = retention_s
+        self.queue_frames = queue_frames
+        self.writer_factory = writer_factory
+        self.jpeg_source = jpeg_source
+        self.index = SegmentIndex(self.directory / "segments.db")
+        self.segments = 0
+        self.errors = 0
+        self._writer = None
+        self._path = None
+        self._timestamps = []
+        self._sub = None
+        self._jpegs = None
+        self._jpegs_dropped = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.jpeg_source is not None:
+            self._jpegs = queue.Queue(maxsize=self.queue_frames)
+            self.jpeg_source.add_jpeg_listener(self._feed)
+        else:
+            self._sub = self.bus.subscribe(name="segments", maxlen=self.queue_frames)
+        self._thread = threading.Thread(target=self._run, name="segment_recorder", daemon=True)
+        self._thread.start()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _feed(self, timestamp, data):
+        # Called on the DB writer thread: never block it
+        try:
+            self._jpegs.put_nowait((timestamp, data))
+        except queue.Full:
+            self._jpegs_dropped += 1
+
+    def _open(self, width, height, timestamp, factory):
+        self._path = self.directory / f"segment_{time.strftime('%Y%m%d_%H%M%S', time.localtime(timestamp))}_{int(timestamp * 1000) % 1000:03d}.avi"
+        self._writer = factory(self._path, width, height, NOMINAL_FPS)
+        self._timestamps = []
+
+    def _close(self):
+        writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        try:
+            if len(self._timestamps) > 1:
+                writer.set_fps((len(self._timestamps) - 1) / (self._timestamps[-1] - self._timestamps[0]))
+            writer.close()
+            offsets = writer.frame_index()
+            if offsets is None or len(offsets) != len(self._timestamps):
+                raise RuntimeError("frame index does not match the frames written")
+            index = np.empty(len(offsets), dtype=INDEX_DTYPE)
+            index["timestamp"] = self._timestamps
+            index["offset"] = offsets[:, 0]
+            index["size"] = offsets[:, 1]
+            if len(index):
+                self.index.add(self._path, index)
+                self.segments += 1
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"[SEG] Segment {self._path} lost: {e}")
+        self._prune()
+
+    def _prune(self):
+        for path in self.index.remove_before(time.time() - self.retention_s):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f"[SEG] Cannot remove {path}: {e}")
+
+    def _write(self, timestamp, image=None, jpeg=None):
+        if self._writer is not None and timestamp - self._timestamps[0] >= self.segment_seconds:
+            self._close()
+        try:
+            if jpeg is not None:
+                if self._writer is None:
+                    # Only muxing left to do, no reason to hand the bytes to the encoder process
+                    self._open(*jpeg_size(jpeg), timestamp, MjpegAviWriter)
+                self._writer.write_jpeg(jpeg)
+            else:
+                if self._writer is None:
+                    height, width = image.shape[:2]
+                    self._open(width, height, timestamp, self.writer_factory)
+                self._writer.write(image)
+            self._timestamps.append(timestamp)
+        except Exception as e:
+            # Segment is dropped, the next frame starts a new one
+            self.errors += 1
+            logging.error(f"[SEG] Writing {self._path} failed: {e}")
+            self._writer, self._timestamps = None, []
+
+    def _run_bus(self):
+        while not self.bus.closed:
+            bus_frame = self._sub.get(timeout=0.5)
+            if bus_frame is None:
+                # stop() lets the queued frames go into the last segment first
+                if self._stop.is_set():
+                    break
+                continue
+            try:
+                image = bus_frame.image
+                if image is not None:
+                    self._write(bus_frame.timestamp, image=image)
+            finally:
+                bus_frame.release()
+
+    def _run_jpegs(self):
+        while True:
+            try:
+                timestamp, data = self._jpegs.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    break
+                continue
+            self._write(timestamp, jpeg=data)
+
+    def _run(self):
+        try:
+            if self._jpegs is not None:
+                self._run_jpegs()
+            else:
+                self._run_bus()
+        finally:
+            self._close()
+            if self._sub is not None:
+                self._sub.close()
+
+    def stop(self, timeout=5.0):
+        if self.jpeg_source is not None:
+            self.jpeg_source.remove_jpeg_listener(self._feed)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def close(self):
+        # Clips can still be cut after stop(), close() ends that too
+        self.stop()
+        self.index.close()
+
+    def covered_until(self):
+        """
+        Capture timestamp of the last frame in a closed segment.
+        """
+        return self.index.covered_until()
+
+    def iter_jpegs(self, start, end):
+        """
+        Yields (timestamp, jpeg bytes) of the closed segments for start <= timestamp < end.
+        """
+        for path, index in self.index.segments_between(start, end):
+            rows = index[(index["timestamp"] >= start) & (index["timestamp"] < end)]
+            if not len(rows):
+                continue
+            try:
+                with open(path, "rb") as f:
+                    for timestamp, offset, size in rows:
+                        f.seek(int(offset))
+                        yield float(timestamp), f.read(int(size))
+            except OSError as e:
+                logging.warning(f"[SEG] Cannot read {path}: {e}")
+
+    def stats(self):
+        return {
+            "segments": self.segments,
+            "errors": self.errors,
+            "queued": self._sub.pending() if self._sub is not None else (self._jpegs.qsize() if self._jpegs is not None else 0),
+            "dropped": self._sub.dropped if self._sub is not None else self._jpegs_dropped,
+            "covered_until": self.covered_until(),
+        }
@@ -0,0 +1,110 @@
+import zlib
+import threading
+import numpy as np
+
+KEYFRAME_INTERVAL = 32  # one keyframe per second at 32 fps bounds the decode work for random access
+ZLIB_LEVEL = 1
+# Z_RLE: the high byte plane is long runs of zeros; on thermal deltas it is both
+# faster and smaller than the default (LZ77) strategy
+ZLIB_STRATEGY = zlib.Z_RLE
+
+
+def _compress(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, ZLIB_STRATEGY)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _shuffle(values):
+    # Low bytes, then high bytes: the high plane of small values is almost all zeros
+    return np.ascontiguousarray(values.astype("<u2", copy=False).view(np.uint8).reshape(-1, 2).T).tobytes()
+
+
+def _unshuffle(data, shape):
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(2, -1)
+    return np.ascontiguousarray(planes.T).view("<u2").reshape(shape).astype(np.uint16, copy=False)
+
+
+def _zigzag(delta):
+    # int16 -> uint16 with small magnitudes first: 0, -1, 1, -2, 2 ... -> 0, 1, 2, 3, 4 ...
+    return ((delta << 1) ^ (delta >> 15)).view(np.uint16)
+
+
+def _unzigzag(values):
+    return ((values >> 1) ^ (-(values & 1)).astype(np.uint16)).view(np.int16)
+
+
+def encode_keyframe(thermal, level=ZLIB_LEVEL):
+    return _compress(_shuffle(thermal), level)
+
+
+def encode_delta(thermal, key, level=ZLIB_LEVEL):
+    """
+    Lossless: uint16 subtraction wraps, so key + delta restores every value
+    exactly. Consecutive thermal frames differ by a few raw counts, which
+    zig-zag maps to small numbers that zlib packs tightly.
+    """
+    delta = np.subtract(thermal, key, dtype=np.uint16).view(np.int16)
+    return _compress(_shuffle(_zigzag(delta)), level)
+
+
+def decode_keyframe(blob, shape):
+    return _unshuffle(zlib.decompress(blob), shape)
+
+
+def decode_delta(blob, shape, key):
+    delta = _unzigzag(_unshuffle(zlib.decompress(blob), shape))
+    return np.add(key, delta.view(np.uint16), dtype=np.uint16)
+
+
+class ThermalEncoder:
+    """
+    Stateful encoder for a stream of raw uint16 frames: every
+    keyframe_interval-th frame (and every frame after a shape change or
+    force_keyframe()) is stored on its own, the frames in between as delta
+    to that keyframe. encode() returns (is_keyframe, blob).
+
+    prepare() splits this for parallel encoding: the keyframe decision is
+    made in stream order, the returned task does the compression and may
+    run on any thread.
+    """
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL, level=ZLIB_LEVEL):
+        self.keyframe_interval = max(int(keyframe_interval), 1)
+        self.level = level
+        self._key = None
+        self._since_key = 0
+        self._lock = threading.Lock()
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+
+    def force_keyframe(self):
+        self._key = None
+
+    def prepare(self, thermal):
+        """
+        Returns (is_keyframe, task); task() compresses thermal and returns
+        the blob. thermal must stay unchanged until task() has run.
+        """
+        is_key = (self._key is None or self._key.shape != thermal.shape
+                  or self._since_key >= self.keyframe_interval)
+        if is_key:
+            # Own copy: the caller's buffer goes back to the frame pool
+            self._key = np.array(thermal, dtype=np.uint16)
+            self._since_key = 1
+            key = self._key
+            compress = lambda: encode_keyframe(key, self.level)
+        else:
+            self._since_key += 1
+            key = self._key
+            compress = lambda: encode_delta(thermal, key, self.level)
+        self.raw_bytes += thermal.nbytes
+
+        def task():
+            blob = compress()
+            with self._lock:
+                self.encoded_bytes += len(blob)
+            return blob
+        return is_key, task
+
+    def encode(self, thermal):
+        is_key, task = self.prepare(thermal)
+        return is_key, task()
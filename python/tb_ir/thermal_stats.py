@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+
+# Raw format of the thermal matrix: raw = (T[°C] + RAW_OFFSET) * RAW_SCALE
+RAW_SCALE = 10.0
+RAW_OFFSET = 100.0
+
+METRICS = ("min", "max", "mean")
+
+
+def raw_to_celsius(raw):
+    return raw / RAW_SCALE - RAW_OFFSET
+
+
+def celsius_to_raw(temp):
+    return int(round((temp + RAW_OFFSET) * RAW_SCALE))
+
+
+def parse_metric(metric):
+    """
+    Validates a detection metric: "min", "max", "mean" or a percentile "pNN" / "pNN.N".
+    Returns the percentile as float for "pNN", otherwise None.
+    """
+    metric = str(metric).lower()
+    if metric in METRICS:
+        return None
+    if metric.startswith("p"):
+        q = float(metric[1:])
+        if 0.0 <= q <= 100.0:
+            return q
+    raise ValueError(f"Unknown detection metric: {metric}")
+
+
+class ThermalStats:
+    """
+    Scalar statistics of one thermal frame, all in °C.
+    argmax is the (row, col) of the hottest pixel.
+    """
+    __slots__ = ("min", "max", "mean", "percentiles", "argmax", "count")
+
+    def __init__(self, min, max, mean, percentiles, argmax, count):
+        self.min = min
+        self.max = max
+        self.mean = mean
+        self.percentiles = percentiles
+        self.argmax = argmax
+        self.count = count
+
+    def value(self, metric):
+        metric = str(metric).lower()
+        if metric in METRICS:
+            return getattr(self, metric)
+        return self.percentiles[parse_metric(metric)]
+
+    def as_dict(self):
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "percentiles": {f"p{q:g}": v for q, v in self.percentiles.items()},
+            "argmax": self.argmax,
+        }
+
+
+class ThermalStatsEngine:
+    """
+    Computes min, max, mean, percentiles and the hottest pixel of a raw uint16
+    thermal matrix without materialising a float temperature image.
+
+    cv2.minMaxLoc yields min/max and the argmax location, one integer histogram
+    over [min, max] yields mean and all percentiles. Only the resulting scalars
+    are converted to °C.
+
+    These are two reads of the frame, but minMaxLoc is a vectorised scan that
+    costs a few percent of the histogram, and bounding the histogram to
+    [min, max] keeps it small: one histogram over the whole uint16 range is
+    several times slower than both calls together.
+    """
+    def __init__(self, percentiles=(99.0,)):
+        self.percentiles = tuple(sorted(float(q) for q in percentiles))
+        self._quantiles = np.array(self.percentiles) / 100.0
+        self._bin_index = np.arange(0, dtype=np.float64)
+
+    def compute(self, thermal, mask=None):
+        """
+        mask: optional uint8 mask (same shape as thermal), only non-zero pixels count.
+        Returns None if the mask selects no pixel.
+        """
+        lo_raw, hi_raw, _, max_loc = cv2.minMaxLoc(thermal, mask)
+        lo, hi = int(lo_raw), int(hi_raw)
+        hist = cv2.calcHist([thermal], [0], mask, [hi - lo + 1], [lo, hi + 1]).ravel()
+        cumulative = np.cumsum(hist)
+        count = int(cumulative[-1])
+        if count == 0:
+            return None
+
+        # hist[i] counts raw value lo + i, so the mean needs only the bin sums
+        if self._bin_index.size < hist.size:
+            self._bin_index = np.arange(hist.size, dtype=np.float64)
+        mean_raw = lo + float(np.dot(hist, self._bin_index[:hist.size])) / count
+
+        percentiles = {}
+        if self.percentiles:
+            # Nearest-rank percentile: smallest raw value with rank >= q * count
+            ranks = np.maximum(np.ceil(self._quantiles * count), 1)
+            idx = np.searchsorted(cumulative, ranks)
+            for q, i in zip(self.percentiles, idx):
+                percentiles[q] = raw_to_celsius(lo + int(i))
+
+        return ThermalStats(
+            min=raw_to_celsius(lo),
+            max=raw_to_celsius(hi),
+            mean=raw_to_celsius(mean_raw),
+            percentiles=percentiles,
+            argmax=(max_loc[1], max_loc[0]),
+            count=count)
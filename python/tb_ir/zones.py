@@ -0,0 +1,194 @@
+import logging
+import cv2
+import numpy as np
+from tb_ir.thermal_stats import raw_to_celsius
+
+GLOBAL_ZONE_ID = "global"
+
+
+class Zone:
+    """
+    Monitored region of the thermal image with its own thresholds.
+
+    kind "frame" uses the frame statistics (whole image), "rect" and "polygon"
+    are evaluated on the raw matrix. metric "mean" is answered from the
+    summed-area table in O(1) per rectangle / O(rows) per polygon, "max"
+    scans only the zone's own pixels.
+    """
+    def __init__(self, zone_id, kind, start_threshold, stop_threshold, metric="mean"):
+        self.id = zone_id
+        self.kind = kind
+        self.start_threshold = float(start_threshold)
+        self.stop_threshold = float(stop_threshold)
+        self.metric = metric
+        self.active = False
+        self.last_value = None
+        self.config = {}
+        # Precomputed lookups (built once per frame shape)
+        self.bbox = None        # (y0, y1, x0, x1)
+        self.mask = None        # uint8 mask cropped to bbox (polygon)
+        self.run_rows = None    # polygon row runs for the summed-area table
+        self.run_x0 = None
+        self.run_x1 = None
+        self.pixel_count = 0
+
+    @staticmethod
+    def thresholds(cfg, default_start, default_stop):
+        """
+        (start, stop) of a zone config; missing values come from the global defaults.
+        """
+        start = float(cfg.get("start_threshold", default_start))
+        if "stop_threshold" in cfg:
+            stop = float(cfg["stop_threshold"])
+        else:
+            stop = start - float(cfg.get("hysteresis", default_start - default_stop))
+        if stop > start:
+            raise ValueError(f"Zone {cfg.get('id')}: stop threshold above start threshold")
+        return start, stop
+
+    @classmethod
+    def from_config(cls, cfg, default_start, default_stop):
+        zone_id = str(cfg["id"])
+        start, stop = cls.thresholds(cfg, default_start, default_stop)
+        metric = cfg.get("metric", "mean")
+        if metric not in ("mean", "max"):
+            raise ValueError(f"Zone {zone_id}: unknown metric {metric}")
+        if "rect" in cfg:
+            kind = "rect"
+        elif "polygon" in cfg:
+            kind = "polygon"
+        else:
+            raise ValueError(f"Zone {zone_id}: needs 'rect' or 'polygon'")
+        zone = cls(zone_id, kind, start, stop, metric)
+        zone.config = cfg
+        return zone
+
+    def build(self, shape):
+        """
+        Precomputes bounding box, mask and summed-area runs for a frame shape.
+        """
+        height, width = shape
+        if self.kind == "rect":
+            x, y, w, h = (int(v) for v in self.config["rect"])
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(width, x + w), min(height, y + h)
+            if x1 <= x0 or y1 <= y0:
+                raise ValueError(f"Zone {self.id}: rect outside of {width}x{height}")
+            self.bbox = (y0, y1, x0, x1)
+            self.pixel_count = (y1 - y0) * (x1 - x0)
+        elif self.kind == "polygon":
+            points = np.array(self.config["polygon"], dtype=np.int32).reshape(-1, 2)
+            full = np.zeros((height, width), dtype=np.uint8)
+            cv2.fillPoly(full, [points], 1)
+            ys, xs = np.nonzero(full)
+            if ys.size == 0:
+                raise ValueError(f"Zone {self.id}: polygon outside of {width}x{height}")
+            y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+            self.bbox = (int(y0), int(y1), int(x0), int(x1))
+            self.mask = np.ascontiguousarray(full[y0:y1, x0:x1])
+            self.pixel_count = int(ys.size)
+            # Horizontal runs of the mask: [x0, x1) per row, found via the row-wise edges
+            padded = np.zeros((height, width + 2), dtype=np.int8)
+            padded[:, 1:-1] = full
+            edges = np.diff(padded, axis=1)
+            starts = np.argwhere(edges == 1)
+            ends = np.argwhere(edges == -1)
+            self.run_rows = starts[:, 0]
+            self.run_x0 = starts[:, 1]
+            self.run_x1 = ends[:, 1]
+
+    def evaluate(self, frame, sat):
+        """
+        Zone value in °C (None if unavailable). sat is the (H+1, W+1) summed-area table of frame.thermal.
+        """
+        if self.kind == "frame":
+            return frame.temp if frame.stats is None else frame.stats.value(self.metric)
+        y0, y1, x0, x1 = self.bbox
+        if self.metric == "max":
+            roi = frame.thermal[y0:y1, x0:x1]
+            if self.mask is None:
+                return raw_to_celsius(int(roi.max()))
+            _, hi, _, _ = cv2.minMaxLoc(roi, self.mask)
+            return raw_to_celsius(int(hi))
+        if self.kind == "rect":
+            total = sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+        else:
+            r, a, b = self.run_rows, self.run_x0, self.run_x1
+            total = float(np.sum(sat[r + 1, b] - sat[r, b] - sat[r + 1, a] + sat[r, a]))
+        return raw_to_celsius(total / self.pixel_count)
+
+
+class ZoneSet:
+    """
+    All configured zones of one frame shape. Without configured zones the set
+    holds one "global" zone on the frame statistics, which reproduces the
+    single START/STOP_THRESHOLD check.
+    """
+    def __init__(self, zones, shape):
+        self.zones = zones
+        self.shape = None if shape is None else tuple(shape)
+        self.defaults = None    # (start, stop, global_metric) the thresholds were derived from
+        self._needs_sat = any(z.kind != "frame" and z.metric == "mean" for z in zones)
+        self._sat = None
+        if self._needs_sat:
+            self._sat = np.zeros((self.shape[0] + 1, self.shape[1] + 1), dtype=np.float64)
+
+    @classmethod
+    def from_config(cls, zone_configs, shape, start_threshold, stop_threshold, global_metric="max"):
+        zones = []
+        if zone_configs and shape is None:
+            logging.warning("[ZONES] No thermal data (webcam input), zones disabled")
+            zone_configs = []
+        for cfg in zone_configs or []:
+            try:
+                zone = Zone.from_config(cfg, start_threshold, stop_threshold)
+                zone.build(shape)
+                zones.append(zone)
+            except (KeyError, ValueError, TypeError) as e:
+                logging.error(f"[ZONES] Ignoring zone config {cfg}: {e}")
+        if not zones:
+            zones.append(Zone(GLOBAL_ZONE_ID, "frame", start_threshold, stop_threshold, global_metric))
+        logging.info(f"[ZONES] {len(zones)} zone(s) active: {[z.id for z in zones]}")
+        zone_set = cls(zones, shape)
+        zone_set.defaults = (start_threshold, stop_threshold, global_metric)
+        return zone_set
+
+    def apply_defaults(self, start_threshold, stop_threshold, global_metric="max"):
+        """
+        Re-derives the thresholds after the global START/STOP_THRESHOLD (or the
+        detection metric) changed. Masks and the active state of the zones are kept.
+        """
+        defaults = (start_threshold, stop_threshold, global_metric)
+        if defaults == self.defaults:
+            return
+        self.defaults = defaults
+        for zone in self.zones:
+            if zone.kind == "frame":
+                zone.start_threshold, zone.stop_threshold = float(start_threshold), float(stop_threshold)
+                zone.metric = global_metric
+                continue
+            try:
+                zone.start_threshold, zone.stop_threshold = Zone.thresholds(zone.config, start_threshold, stop_threshold)
+            except ValueError as e:
+                logging.error(f"[ZONES] Keeping thresholds of zone {zone.id}: {e}")
+
+    def evaluate(self, frame):
+        """
+        Returns [(zone, value_in_celsius), ...]; the summed-area table is built
+        once per frame and shared by all mean zones.
+        """
+        sat = None
+        if self._needs_sat and frame.thermal is not None:
+            sat = cv2.integral(frame.thermal, self._sat, cv2.CV_64F)
+        results = []
+        for zone in self.zones:
+            if zone.kind != "frame" and (frame.thermal is None or frame.thermal.shape != self.shape):
+                continue
+            value = zone.evaluate(frame, sat)
+            zone.last_value = value
+            if value is not None:
+                results.append((zone, value))
+        return results
+
+    def any_active(self):
+        return any(zone.active for zone in self.zones)
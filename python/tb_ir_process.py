@@ -36,9 +36,7 @@ from pathlib import Path
 import logging
 import cv2
 import numpy as np
-import datetime
 import threading
-from queue import Queue
 import os
 
 from models.tb_dataclasses import QueueMessage, QueueTestEvents, QueuesMembers, SocketEventsToBackend, QueueMessageHeader
@@ -47,6 +45,15 @@ from tb_events import IrEvents
 from tb_queues import MainQueues, SocketQueues
 #from tb_ir import app_ir, camera_control, frame_database (just for testing the system without camera)
 from tb_ir import app_ir, frame_database
+from tb_ir.frame_bus import FrameBus
+from tb_ir.acquisition import AcquisitionThread
+from tb_ir.zones import ZoneSet
+from tb_ir.event_session import TRIGGER_NEW
+from tb_ir.acquisition_metrics import AcquisitionMetrics
+from tb_ir.ring_buffer import FrameRingBuffer
+from tb_ir.persistent_ring import PersistentFrameRing
+from tb_ir.segment_recorder import SegmentRecorder
+from tb_ir.encoder_process import EncoderClient
 
 # Minimale Zustands/Hilfsobjekte, die von den Funktionen genutzt werden
 
@@ -69,10 +76,21 @@ mode = SystemMode.NORMAL
 save_dir = Path("Output_data")
 save_dir.mkdir(parents=True, exist_ok=True)
 
-# Locks/Queues/Flags
-camera_lock = threading.Lock()
-db_lock = threading.Lock()
-anomaly_queue = Queue()
+# Frame-Bus: der Akquisitions-Thread ist der einzige Aufrufer von cam.get_frame()
+bus = None
+acquisition_thread = None
+buffer_thread = None
+
+# Encoder-Prozess für MJPG-Videos (Aufnahmen, Ereignisclips), Frames über Shared Memory
+encoder = None
+# Daueraufzeichnung in Segmenten (app_ir.CONTINUOUS_RECORDING), Clips werden daraus geschnitten
+segment_recorder = None
+
+# Pre-Event-Ringpuffer (ersetzt das Zurücklesen der JPEGs aus SQLite für Ereignisvideos)
+pre_event_ring = None
+colouriser = None
+CAMERA_FPS = 32
+PRE_EVENT_RING_MARGIN_S = 2
 
 anomaly_worker_thread = None
 frame = None
@@ -92,6 +110,17 @@ if USE_MOCK_CAMERA:
 else:
     from tb_ir.camera_control import CameraController
 
+# Aufgezeichnete Rohdaten statt Kamera abspielen (Verzeichnis mit frames.npy/metadata.npy oder .tbr-Datei, siehe mocks/replay_camera.py)
+IR_REPLAY_PATH = os.getenv("IR_REPLAY_PATH", "")
+IR_REPLAY_SPEED = float(os.getenv("IR_REPLAY_SPEED", "1.0"))  # 1 = Echtzeit, 4 = vierfach, 0 = so schnell wie möglich
+if IR_REPLAY_PATH:
+    from mocks.replay_camera import ReplayCameraController
+
+# Synthetischer Lastgenerator statt Kamera: "1" = Standardwerte, sonst Pfad zu einer JSON-Konfiguration
+IR_SYNTHETIC = os.getenv("IR_SYNTHETIC", "")
+if IR_SYNTHETIC:
+    from mocks.synthetic_camera import SyntheticCameraController
+
 # Kamera, Speicherung & Aufzeichnung 
 
 def generate_error_image(width=160, height=120):
@@ -101,105 +130,47 @@ def generate_error_image(width=160, height=120):
     return img
 
 
-def save_frames_as_video(frames, filename, fps=32):
-    if not frames:
-        return
-    height, width, _ = frames[0].shape
-    out = cv2.VideoWriter(str(filename), cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
-    for frame in frames:
-        out.write(frame)
-    out.release()
-
-def record_video(cam, mode, duration=POST_EVENT_DURATION):
-    global manual_stop_flag
-    manual_stop_flag = False
-    duration = min(duration, MANUAL_RECORD_LIMIT)  # Enforce limit
-    try:
-        with camera_lock:
-            frame, temp = cam.get_frame()
-    except Exception as e:
-        logging.error(f"Failed to start recording: {e}")
-        return
-    if frame is None or frame.shape[0] == 0 or frame.shape[1] == 0:
-        logging.error("Invalid frame received.")
-        return
-
-    filename = save_dir / f"thermal_video_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.avi"
-    height, width = frame.shape[:2]
-    writer = cv2.VideoWriter(str(filename), cv2.VideoWriter_fourcc(*'MJPG'), 32, (width, height))
-    if not writer.isOpened():
-        logging.error("Failed to open video writer.")
-        return
-
-    start_time = time.time()
-    logging.info("Recording started.")
-
-    while not manual_stop_flag:
-        with camera_lock:
-            frame, temp = cam.get_frame()
-        if frame is not None:
-            writer.write(frame)
-
-        elapsed = time.time() - start_time
-        if elapsed >= duration:  # Use passed duration
-            logging.info(f"Stopped after {elapsed:.1f}s.")
-            break
-        if exit_flag:
-            break
-        time.sleep(0.01)
-
-    writer.release()
-    logging.info("Recording finished and saved.")
-
-def stop_manual_recording_from_server():
-    global manual_stop_flag, recording, manual_record_thread
-    if recording and manual_record_thread and manual_record_thread.is_alive():
-        manual_stop_flag = True
-        manual_record_thread.join(timeout=2)
-        recording = False
-        logging.info("Manual recording stopped by server")
-        return True
-    logging.info("No manual recording active to stop")
-    return False
-
-def save_anomaly_video(cam, db_path, temp, timestamp, save_dir, duration=5, fps=32):
-    global exit_flag
-    try:
-        # Retro-Frames holen
-        with db_lock:
-            db = frame_database.FrameDatabase(db_path)
-            retrospective_frames = db.get_frames_from_last_n_seconds(seconds=10)
-            db.close()
+def ring_data(bus_frame):
+    """
+    Im Raw-Modus puffert der Ring die Rohmatrix (2 Byte/Pixel, Palette erst beim Schreiben des Clips),
+    sonst das fertige Palettenbild.
+    """
+    if app_ir.ACQUISITION_MODE == "raw" and bus_frame.thermal is not None:
+        return bus_frame.thermal
+    return bus_frame.image
+
+def create_pre_event_ring(cam):
+    # Kapazität = (PRE_EVENT_DURATION + Reserve) x Bildrate, die Reserve deckt das Kodieren des Pre-Event-Teils ab
+    fps = getattr(cam, "fps", None) or CAMERA_FPS
+    capacity = int((app_ir.PRE_EVENT_DURATION + PRE_EVENT_RING_MARGIN_S) * fps)
+    if app_ir.PRE_EVENT_STORE:
+        # Datei-gestützt: Vorlauf bleibt über Absturz/Neustart des Prozesses erhalten
+        store = Path(app_ir.PRE_EVENT_STORE)
+        if not store.is_absolute():
+            store = Path(app_ir.save_dir) / store
+        try:
+            return PersistentFrameRing(store, capacity=capacity)
+        except Exception as e:
+            logging.error(f"Pre-event store {store} unavailable, using RAM ring: {e}")
+    return FrameRingBuffer(capacity=capacity)
 
-        # Post-Event-Frames sammeln
-        post_frames = []
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            if exit_flag:
-                break
-            with camera_lock:
-                frame, _ = cam.get_frame()
-            if frame is not None:
-                post_frames.append(frame)
-            time.sleep(1 / fps)
-
-        # Zusammenführen & speichern
-        all_frames = retrospective_frames + post_frames
-        filename = save_dir / f"merged_anomaly_temp{int(temp)}_{timestamp}.avi"
-        save_frames_as_video(all_frames, filename, fps=fps)
-        logging.info(f"Combined anomaly video saved as {filename}")
-    except Exception as e:
-        logging.error(f"Error in anomaly video thread: {e}")
-
-def anomaly_worker():
-    global recording
-    while not anomaly_queue.empty():
-        temp, timestamp = anomaly_queue.get()
-        ts_str = timestamp.strftime("%Y%m%d_%H%M%S")
-        logging.info(f"Processing anomaly event at {temp:.2f}°C ({ts_str})")
-        recording = True
-        save_anomaly_video(cam, "prozess.db", temp, ts_str, save_dir, POST_EVENT_DURATION)
-        recording = False
+def buffer_frames(sub, db, ring):
+    """
+    Frame-Bus-Abonnent: kopiert jeden Frame in den Pre-Event-Ringpuffer und puffert ihn in der DB.
+    insert_frame() reiht nur in die Queue des DB-Writers ein (Group-Commit im Hintergrund), daher ohne Sperre.
+    Lesezugriffe (Clips) laufen über eigene Read-only-Verbindungen und bremsen den Writer nicht.
+    """
+    while not exit_flag:
+        bus_frame = sub.get(timeout=1.0)
+        if bus_frame is None:
+            continue
+        try:
+            ring.append(ring_data(bus_frame), bus_frame.timestamp)
+            db.insert_frame(bus_frame)
+        except Exception as e:
+            logging.warning(f"DB insert error: {e}")
+        finally:
+            bus_frame.release()
 
 # IR-Prozess
 
@@ -207,7 +178,7 @@ class Tb_IrProcess(multiprocessing.Process):
     """
     Basisklasse für alle Prozesse im System, die mit dem Server kommunizieren.
     """
-    def __init__(self, name: str, logger: Logger, events: IrEvents, main_queues : MainQueues, socket_queues : SocketQueues) -> None:
+    def __init__(self, name: str, logger: Logger, events: IrEvents, main_queues : MainQueues, socket_queues : SocketQueues, metrics : AcquisitionMetrics | None = None) -> None:
         """
         Initialisiert den ServerProcess.
 
@@ -216,6 +187,7 @@ class Tb_IrProcess(multiprocessing.Process):
             name (str): Name des Prozesses.
             url (str): Server-URL.
             events (ServerEvents): Events zur Steuerung.
+            metrics (AcquisitionMetrics): Gemeinsame Akquisitions-Zähler (Shared Memory), vom Supervisor lesbar.
 
         Raises:
             ValueError: Bei ungültigen Parametern.
@@ -229,6 +201,7 @@ class Tb_IrProcess(multiprocessing.Process):
         
         self.main_queues : MainQueues = main_queues
         self.socket_queues : SocketQueues = socket_queues
+        self.metrics : AcquisitionMetrics = metrics if metrics is not None else AcquisitionMetrics()
         self.logger.debug(f"{self.__class__.__name__} - {self.name} init")
 
     def shutdown(self):
@@ -245,6 +218,7 @@ class Tb_IrProcess(multiprocessing.Process):
         global anomaly_thread, manual_record_thread
         global last_trigger_time, last_test_time, exit_flag, event_recording_enabled
         global cam, db  # anomaly_worker auf dieselbe Instanz zugreift
+        global bus, acquisition_thread, buffer_thread, pre_event_ring, colouriser, encoder, segment_recorder
 
         self.logger.debug(f"{self.__class__.__name__} - {self.name} running")
 
@@ -258,18 +232,65 @@ class Tb_IrProcess(multiprocessing.Process):
         init : bool = False
         cam = None
         db = None
+        detection_sub = None
+        zone_set = None
+
+        # Encoder-Prozess vor allen Threads starten (fork); Videos werden dann nicht mehr im IR-Prozess kodiert
+        if app_ir.VIDEO_ENCODER == "process":
+            try:
+                encoder = EncoderClient()
+                encoder.start()
+                app_ir.encoder = encoder
+            except Exception as e:
+                self.logger.error(f"Encoder process unavailable, encoding in-process: {e}")
+                encoder = None
         
         while not self.events.shutdown.is_set():
             if not init :
                 try:
-                    cam = CameraController()
-                    db = frame_database.FrameDatabase("prozess.db")
+                    if IR_REPLAY_PATH:
+                        cam = ReplayCameraController(IR_REPLAY_PATH, speed=IR_REPLAY_SPEED, colouriser=app_ir.create_colouriser())
+                    elif IR_SYNTHETIC:
+                        cam = SyntheticCameraController.from_config(IR_SYNTHETIC, colouriser=app_ir.create_colouriser())
+                    else:
+                        cam = CameraController(acquisition_mode=app_ir.ACQUISITION_MODE, colouriser=app_ir.create_colouriser())
+                    colouriser = getattr(cam, "colouriser", None) or app_ir.create_colouriser()
+                    db = frame_database.FrameDatabase("prozess.db", storage=app_ir.DB_STORAGE,
+                                                      compression_level=app_ir.DB_COMPRESSION_LEVEL,
+                                                      encode_workers=app_ir.DB_ENCODE_WORKERS,
+                                                      colouriser=colouriser)
+                    bus = FrameBus()
+                    pre_event_ring = create_pre_event_ring(cam)
+                    detection_sub = bus.subscribe(name="detection", maxlen=1)
+                    buffer_thread = threading.Thread(
+                        target=buffer_frames,
+                        args=(bus.subscribe(name="db_buffer", maxlen=app_ir.RECORD_QUEUE_FRAMES), db, pre_event_ring),
+                        daemon=True)
+                    buffer_thread.start()
+                    if app_ir.CONTINUOUS_RECORDING:
+                        segment_recorder = SegmentRecorder(bus, save_dir / "segments",
+                                                           segment_seconds=app_ir.SEGMENT_SECONDS,
+                                                           retention_s=app_ir.SEGMENT_RETENTION_S,
+                                                           writer_factory=app_ir.video_writer_factory(),
+                                                           # JPEG-Speicherung: Segmente aus den JPEGs der DB muxen statt erneut zu kodieren
+                                                           jpeg_source=db if db.storage == "jpeg" else None)
+                        segment_recorder.start()
+                        app_ir.segment_recorder = segment_recorder
+                    acquisition_thread = AcquisitionThread(cam, bus, stats_engine=app_ir.create_stats_engine(),
+                                                           metrics=self.metrics)
+                    acquisition_thread.start()
+                    app_ir.bus = bus
+                    app_ir.pre_event_ring = pre_event_ring
+                    app_ir.colouriser = colouriser
+                    app_ir.metrics = self.metrics
+                    app_ir.db = db
                     init = True
                 except Exception as e: 
                     self.logger.error(f"Failed to initialize camera or DB: {e}")
                     event_recording_enabled = False
                     cam = None 
                     init = False
+                    time.sleep(1)
             else:    
                 msg_in = self.main_queues.ir.get()
                 if not msg_in is None: 
@@ -282,71 +303,81 @@ class Tb_IrProcess(multiprocessing.Process):
                             self.events.error.set()
                 ### Kamera hier einfügen
                 
-                #  Frame und Temperatur holen
-                try:
-                    with camera_lock:
-                        frame, temp = cam.get_frame()
-                    if frame is None:
-                        # Kamera lieferte nichts -> Platzhalterbild und Temp ungültig
-                        frame = generate_error_image()
-                        temp = None
-                except Exception as e:
-                    self.logger.error(f"Camera error: {e}")
+                #  Neuesten Frame vom Bus holen (wartet höchstens 1 s, ersetzt das feste sleep)
+                bus_frame = detection_sub.get(timeout=1.0)
+                zone_results = []
+                if bus_frame is None:
+                    # Akquisition lieferte nichts -> Platzhalterbild und Temp ungültig
                     frame = generate_error_image()
                     temp = None
+                else:
+                    # frame.image hier nicht anfassen: im Raw-Modus würde das die Palette für jeden Frame rendern
+                    # Latenz Aufnahme -> Verarbeitung und Bus-Verluste für den Supervisor
+                    self.metrics.record_consume(time.time() - bus_frame.timestamp, bus_dropped=bus.dropped())
+                    # Max/Perzentil statt Mittelwert, damit kleine Hotspots nicht untergehen
+                    temp = app_ir.detection_value(bus_frame)
+                    # Zonen (Masken/Summed-Area-Lookups) nur beim ersten Frame bzw. neuer Auflösung aufbauen
+                    shape = None if bus_frame.thermal is None else bus_frame.thermal.shape
+                    if zone_set is None or zone_set.shape != shape:
+                        zone_set = ZoneSet.from_config(app_ir.ZONES, shape, app_ir.START_THRESHOLD, app_ir.STOP_THRESHOLD,
+                                                       global_metric=app_ir.DETECTION_METRIC)
+                    else:
+                        # Schwellen/Metrik über Config oder UI geändert -> Defaults neu anwenden (Masken bleiben)
+                        zone_set.apply_defaults(app_ir.START_THRESHOLD, app_ir.STOP_THRESHOLD, app_ir.DETECTION_METRIC)
+                    zone_results = zone_set.evaluate(bus_frame)
+                    # Nur Temperaturen werden weiterverwendet -> Pool-Slot sofort freigeben
+                    bus_frame.release()
 
-                # Frame in DB puffern (für retrospektive Ereignisvideos)
-                if frame is not None and db is not None:
-                    try:
-                        with db_lock:
-                            db.insert_frame(frame)
-                    except Exception as e:
-                        self.logger.warning(f"DB insert error: {e}")
+                # Frames werden vom buffer_frames-Thread direkt vom Bus in die DB gepuffert
 
                 # Testmodus-Timeout (180 s) -> zurück in Normal
                 if mode == SystemMode.TEST and (time.time() - last_test_time) > TEST_TIMEOUT:
                     self.logger.info("Test mode timeout -> NORMAL")
                     mode = SystemMode.NORMAL
 
-                #  Ereignislogik im NORMAL-Modus (IO automatisch)
-                if mode == SystemMode.NORMAL and temp is not None:
-                    if temp > START_THRESHOLD and not anomaly_active:
-                        #  Ereignis in Queue (startet Video-Worker)
-                        anomaly_queue.put((temp, datetime.datetime.now()))
-
-                        #  IO ansteuern (falls in app_ir vorhanden; sonst auskommentieren)
-                        try:
-                            app_ir.retry_io_action(app_ir.trigger_hupe, "HUPE Trigger")
-                        except Exception:
-                            pass
-                        try:
-                            app_ir.retry_io_action(app_ir.trigger_blitz, "BLITZ Trigger")
-                        except Exception:
-                            pass
-                        try:
-                            app_ir.retry_io_action(lambda: app_ir.set_relais_state(True), "Set RELAIS ON")
-                        except Exception:
-                            pass
-
-                        anomaly_active = True
-                        last_trigger_time = time.time()
-
-                    elif temp < STOP_THRESHOLD and not recording:
-                        # Anomalie „entschärfen“, sobald wieder unter Stop-Schwelle
-                        anomaly_active = False
-
-                #  Ereignislogik im TEST-Modus (freigestellte Aufzeichnungsart)
-                if mode == SystemMode.TEST and temp is not None:
-                    if (recording_type == "EVENT" and temp > START_THRESHOLD and not anomaly_active):
-                        anomaly_queue.put((temp, datetime.datetime.now()))
-                        anomaly_active = True
-                    elif temp < STOP_THRESHOLD and not recording:
-                        anomaly_active = False
+                #  Ereignislogik je Zone (ohne konfigurierte Zonen: eine globale Zone)
+                trigger_io = False
+                for zone, zone_temp in zone_results:
+                    if zone.active:
+                        # Spitzentemperatur für die laufende Ereignis-Session
+                        app_ir.event_sessions.observe(zone.id, zone_temp)
+                    #  NORMAL-Modus (IO automatisch)
+                    #  Ereignis mit Zonen-ID in Queue (startet Video-Worker), innerhalb des Nachlauf-Fensters
+                    #  eines laufenden Clips verlängert es stattdessen diesen. Unter der Stop-Schwelle wird die
+                    #  Zone wieder scharf (Hysterese je Zone), auch während ein Clip geschrieben wird.
+                    #  IO nur für neue Ereignisse, eine Verlängerung gehört zum bereits gemeldeten
+                    if mode == SystemMode.NORMAL:
+                        if app_ir.event_sessions.check_zone(zone, zone_temp, app_ir.anomaly_queue) == TRIGGER_NEW:
+                            trigger_io = True
+                            last_trigger_time = time.time()
+
+                    #  TEST-Modus (freigestellte Aufzeichnungsart)
+                    elif mode == SystemMode.TEST:
+                        app_ir.event_sessions.check_zone(zone, zone_temp, app_ir.anomaly_queue,
+                                                         arm=recording_type == "EVENT")
+
+                if trigger_io:
+                    #  IO einmal je Frame ansteuern, auch wenn mehrere Zonen gleichzeitig auslösen
+                    try:
+                        app_ir.retry_io_action(app_ir.trigger_hupe, "HUPE Trigger")
+                    except Exception:
+                        pass
+                    try:
+                        app_ir.retry_io_action(app_ir.trigger_blitz, "BLITZ Trigger")
+                    except Exception:
+                        pass
+                    try:
+                        app_ir.retry_io_action(lambda: app_ir.set_relais_state(True), "Set RELAIS ON")
+                    except Exception:
+                        pass
+                if zone_set is not None:
+                    anomaly_active = zone_set.any_active()
 
                 #  Anomalie-Worker starten (holt Retro-Frames + sammelt Post-Frames)
-                if (not recording) and (not anomaly_queue.empty()) and \
+                #  (eine Implementierung in app_ir: Clip-Namen, Segment-/Ring-Schnitt, Session-Sidecar)
+                if (not app_ir.recording) and (not app_ir.anomaly_queue.empty() or app_ir.event_sessions.has_pending()) and \
                    (anomaly_worker_thread is None or not anomaly_worker_thread.is_alive()):
-                    anomaly_worker_thread = threading.Thread(target=anomaly_worker, daemon=True)
+                    anomaly_worker_thread = threading.Thread(target=app_ir.anomaly_worker, daemon=True)
                     anomaly_worker_thread.start()
 
                 #  Aufnahme-Ende housekeeping (Relais zurücksetzen falls nötig)
@@ -363,15 +394,32 @@ class Tb_IrProcess(multiprocessing.Process):
                     manual_record_thread = None
                 ###
                 self.events.heartbeat.set()
-            time.sleep(1)
 
         if self.events.shutdown.is_set():
             self.events.shutdown.clear()
-        
+
+        exit_flag = True
+        app_ir.exit_flag = True
+        if acquisition_thread:
+            acquisition_thread.stop()
+        if bus:
+            bus.close()
+        if buffer_thread:
+            buffer_thread.join(timeout=2)
+        if segment_recorder is not None:
+            segment_recorder.stop()
+        if pre_event_ring is not None:
+            pre_event_ring.close()
         if cam and hasattr(cam, "shutdown"):
             cam.shutdown()
         if db:
             db.close()
+        if segment_recorder is not None:
+            segment_recorder.close()
+            app_ir.segment_recorder = None
+        if encoder is not None:
+            encoder.stop()
+            app_ir.encoder = None
         time.sleep(1)
 
     def _prepare_server_msg(self, event : SocketEventsToBackend, payload : dict = {}) -> QueueMessage:
@@ -8,6 +8,7 @@ from tb_queues import MainQueues, SocketQueues, Tb_Queue
 from tb_events import ServerEvents, IrEvents, UserInputsEvents, Tb_Event
 from tb_server_process import Tb_ServerProcess
 from tb_ir_process import Tb_IrProcess
+from tb_ir.acquisition_metrics import AcquisitionMetrics
 from tb_user_input import Tb_UserInput
 from tb_heartbeat import Tb_Heartbeat
 import os
@@ -47,7 +48,8 @@ class AppContext:
             self.socket_queues = self._init_socket_queues()
             
             self.server_process = self._init_server_process(main_queues=self.main_queues,socket_queues=self.socket_queues, events= self.events_server)
-            self.ir_process = self._init_ir_process(main_queues=self.main_queues,socket_queues=self.socket_queues, events= self.events_ir)
+            self.ir_metrics = self._init_ir_metrics()
+            self.ir_process = self._init_ir_process(main_queues=self.main_queues,socket_queues=self.socket_queues, events= self.events_ir, metrics=self.ir_metrics)
             self.thread_user_input = self._init_user_input(events=self.events_user_input)
             self.relays = self._init_relais()
 
@@ -151,10 +153,16 @@ class AppContext:
         except Exception as e:
             raise ValueError("Fehler beim Initialisieren des Server-Prozesses") from e
 
-    def _init_ir_process(self, main_queues: MainQueues, socket_queues : SocketQueues, events: IrEvents) -> Tb_IrProcess:
+    def _init_ir_metrics(self) -> AcquisitionMetrics:
+        try:
+            return AcquisitionMetrics()
+        except Exception as e:
+            raise ValueError("Fehler beim Initialisieren der IR-Akquisitionsmetriken") from e
+
+    def _init_ir_process(self, main_queues: MainQueues, socket_queues : SocketQueues, events: IrEvents, metrics: AcquisitionMetrics) -> Tb_IrProcess:
         try:
             logger_ir = TbLogger.get_logger("logger_ir_process")
-            return Tb_IrProcess(name="ir_process", logger=logger_ir, events=events, main_queues=main_queues, socket_queues = socket_queues)
+            return Tb_IrProcess(name="ir_process", logger=logger_ir, events=events, main_queues=main_queues, socket_queues = socket_queues, metrics=metrics)
         except Exception as e:
             raise ValueError("Fehler beim Initialisieren des Ir-Prozesses") from e
 
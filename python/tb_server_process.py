@@ -68,6 +68,7 @@ class Tb_ServerProcess(multiprocessing.Process):
         self.sio.register_event_handler(SocketEventsFromBackend.REQ_MANUAL_CALL_RECORD, self.manual_call_record_handler)
         self.sio.register_event_handler(SocketEventsFromBackend.REQ_CALL_LIVE_TEMPRETURE, self.call_live_tempreture_handler)
         self.sio.register_event_handler(SocketEventsFromBackend.REQ_CALL_HISTORY_TEMPRETURE, self.call_history_tempreture_handler)
+        self.sio.register_event_handler(SocketEventsFromBackend.REQ_CALL_ACQUISITION_STATS, self.call_acquisition_stats_handler)
 
         self.logger.debug(f"{self.__class__.__name__} - {self.name} init")
     # ------------------- Hilfsfunktion -------------------
@@ -131,6 +132,10 @@ class Tb_ServerProcess(multiprocessing.Process):
     def call_history_tempreture_handler(self,payload) -> None:
         self._send_backend_msg_to_ir(event=SocketEventsFromBackend.REQ_CALL_HISTORY_TEMPRETURE,payload=payload)
         self.logger.debug("Received form backend: REQ_CALL_HISTORY_TEMPRETURE")
+
+    def call_acquisition_stats_handler(self,payload) -> None:
+        self._send_backend_msg_to_ir(event=SocketEventsFromBackend.REQ_CALL_ACQUISITION_STATS,payload=payload)
+        self.logger.debug("Received form backend: REQ_CALL_ACQUISITION_STATS")
     
     # Backend-Sende-Methoden
     def _prepare_backend_msg(self, event : SocketEventsToBackend, payload : dict = {}) -> QueueMessage:
@@ -180,6 +185,10 @@ class Tb_ServerProcess(multiprocessing.Process):
         msg : QueueMessage = self._prepare_backend_msg(event = SocketEventsToBackend.ACK_CALL_LIVE_TEMPRETURE, payload=data) 
         self.sio.send_event(msg=msg,callback=self.send_backend_ack_call_live_tempreture_callback)
 
+    def send_backend_ack_call_acquisition_stats(self,data:dict) -> None:
+        msg : QueueMessage = self._prepare_backend_msg(event = SocketEventsToBackend.ACK_CALL_ACQUISITION_STATS, payload=data) 
+        self.sio.send_event(msg=msg,callback=self.send_backend_ack_call_acquisition_stats_callback)
+
     def send_backend_test(self) -> None:
         msg : QueueMessage = self._prepare_backend_msg(event = SocketEventsToBackend.REQ_TEST, payload={"test":"test"}) 
         self.sio.send_event(msg=msg,callback=self.send_backend_send_test_callback)
@@ -196,6 +205,9 @@ class Tb_ServerProcess(multiprocessing.Process):
     def send_backend_ack_call_live_tempreture_callback(self, response: Any = None) -> None:
         self.logger.debug(f"Callback ack_call_live_tempreture empfangen mit response: {response}")
 
+    def send_backend_ack_call_acquisition_stats_callback(self, response: Any = None) -> None:
+        self.logger.debug(f"Callback ack_call_acquisition_stats empfangen mit response: {response}")
+
     def send_backend_ack_send_live_tempreture_callback(self, response: Any = None) -> None:
         self.logger.debug(f"Callback ack_send_live_tempreture empfangen mit response: {response}")
 
@@ -267,6 +279,8 @@ class Tb_ServerProcess(multiprocessing.Process):
                             self.send_backend_timeout_stop_record(data=msg_from_internal.payload)
                         if msg_from_internal.header.event == SocketEventsToBackend.ACK_CALL_HISTORY_TEMPRETURE:
                             self.send_backend_ack_call_live_tempreture(data=msg_from_internal.payload)
+                        if msg_from_internal.header.event == SocketEventsToBackend.ACK_CALL_ACQUISITION_STATS:
+                            self.send_backend_ack_call_acquisition_stats(data=msg_from_internal.payload)
 
             if abs(self.tick_counter - self.tick_test_pre_counter) > 50:
                 self.tick_test_pre_counter = self.tick_counter
@@ -0,0 +1,50 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import cv2
+import numpy as np
+from tb_ir.frame import Frame
+from tb_ir.frame_bus import FrameBus
+from tb_ir.ring_buffer import FrameRingBuffer
+from tb_ir.anomaly_clip import write_anomaly_clip
+
+
+class Test_AnomalyClip(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, "clip.avi")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_container_rate_is_measured_capture_rate(self):
+        # Camera delivers 10 fps, not the nominal 32
+        base = time.time()
+        ring = FrameRingBuffer(capacity=30)
+        for i in range(10):
+            ring.append(np.full((8, 8, 3), i, dtype=np.uint8), base - 1.0 + i * 0.1)
+        bus = FrameBus()
+        result = []
+        t = threading.Thread(target=lambda: result.append(
+            write_anomaly_clip(bus, ring, None, self.filename, base, pre_seconds=1.0, post_seconds=0.45)))
+        t.start()
+        time.sleep(0.1)
+        for i in range(8):
+            timestamp = base + i * 0.1
+            image = np.full((8, 8, 3), 10 + i, dtype=np.uint8)
+            ring.append(image, timestamp)
+            bus.publish(Frame(image=image), timestamp=timestamp)
+            time.sleep(0.02)
+        t.join(timeout=5.0)
+
+        self.assertEqual(result, [15])    # 10 pre-event frames, cut + 4 post-event frames
+        cap = cv2.VideoCapture(self.filename)
+        self.assertAlmostEqual(cap.get(cv2.CAP_PROP_FPS), 10.0, places=2)
+        cap.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from tb_ir.encoder_process import EncoderClient
+
+
+class Test_EncoderProcess(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.client = EncoderClient(slots=4)
+        self.client.start()
+
+    def tearDown(self):
+        self.client.stop()
+        shutil.rmtree(self.dir)
+
+    def test_job_round_trip_through_shared_memory(self):
+        filename = os.path.join(self.dir, "clip.avi")
+        job = self.client.writer(filename, 32, 24, fps=32)
+        # More frames than slots: write() waits for slots the encoder hands back
+        for i in range(20):
+            job.write(np.full((24, 32, 3), i * 10, dtype=np.uint8))
+        job.set_fps(10)
+        job.close()
+
+        self.assertTrue(job.done.is_set())
+        self.assertIsNone(job.error)
+        self.assertEqual(job.encoded, 20)
+        cap = cv2.VideoCapture(filename)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 20)
+        self.assertAlmostEqual(cap.get(cv2.CAP_PROP_FPS), 10.0, places=2)
+        ok, image = cap.read()
+        cap.release()
+        self.assertTrue(ok)
+        self.assertEqual(image.shape, (24, 32, 3))
+        self.assertEqual(self.client.stats()["completed"], 1)
+
+    def test_failed_job_is_acked_with_error(self):
+        job = self.client.writer(os.path.join(self.dir, "missing", "clip.avi"), 32, 24)
+        job.close()
+        self.assertIsNotNone(job.error)
+        self.assertEqual(self.client.stats()["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
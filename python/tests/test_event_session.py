@@ -0,0 +1,88 @@
+import datetime
+import unittest
+from queue import Queue
+from tb_ir.event_session import EventSession, EventSessionManager, TRIGGER_NEW, TRIGGER_EXTENDED
+from tb_ir.zones import Zone
+
+
+def _at(ts):
+    return datetime.datetime.fromtimestamp(ts)
+
+
+class Test_EventSession(unittest.TestCase):
+    def test_trigger_inside_window_extends_session(self):
+        session = EventSession(post_seconds=5, max_seconds=12)
+        self.assertTrue(session.add(60.0, 1000.0, "a"))
+        self.assertTrue(session.add(70.0, 1004.0, "b"))
+        self.assertEqual(session.end, 1009.0)
+        self.assertTrue(session.add(65.0, 1008.0, "a"))
+        self.assertEqual(session.end, 1012.0)    # capped at max_seconds
+        self.assertFalse(session.close_at(1011.9))
+        self.assertTrue(session.close_at(1012.0))
+        self.assertFalse(session.add(80.0, 1011.0, "a"))
+        self.assertEqual(session.peaks, {"a": 65.0, "b": 70.0})
+
+    def test_queued_triggers_join_the_next_session(self):
+        manager = EventSessionManager()
+        queue = Queue()
+        for temp, ts, zone in [(60.0, 1000.0, "a"), (61.0, 1000.0, "b"), (62.0, 1003.0, "a"), (63.0, 1020.0, "a")]:
+            queue.put((temp, _at(ts), zone))
+
+        first = manager.next_session(queue, post_seconds=5)
+        self.assertEqual([ts for ts, _, _ in first.triggers], [1000.0, 1000.0, 1003.0])
+        self.assertTrue(manager.has_pending())
+        # Detection loop while the clip is written
+        self.assertTrue(manager.trigger(64.0, 1007.0, "b"))
+        first.close_at(1012.0)
+        self.assertFalse(manager.trigger(64.0, 1013.0, "b"))
+
+        second = manager.next_session(queue, post_seconds=5)
+        self.assertEqual([ts for ts, _, _ in second.triggers], [1020.0])
+        self.assertIsNone(manager.next_session(queue, post_seconds=5))
+        self.assertEqual(manager.stats(), {"sessions": 2, "coalesced": 3})
+
+    def test_zone_rearms_and_extends_its_own_clip(self):
+        manager = EventSessionManager()
+        queue = Queue()
+        zone = Zone("global", "frame", 50.0, 45.0)
+        # Detection loop: (timestamp, zone temperature) per frame
+        self.assertEqual(manager.check_zone(zone, 55.0, queue, now=_at(1000.0)), TRIGGER_NEW)
+        self.assertIsNone(manager.check_zone(zone, 56.0, queue, now=_at(1000.5)))
+        session = manager.next_session(queue, post_seconds=5)    # anomaly worker starts the clip
+
+        # Cools down and crosses again while the clip is still written
+        self.assertIsNone(manager.check_zone(zone, 44.0, queue, now=_at(1002.0)))
+        self.assertFalse(zone.active)
+        self.assertEqual(manager.check_zone(zone, 58.0, queue, now=_at(1003.0)), TRIGGER_EXTENDED)
+        self.assertTrue(queue.empty())
+        self.assertEqual([ts for ts, _, _ in session.triggers], [1000.0, 1003.0])
+        self.assertEqual(session.end, 1008.0)
+
+        # Test mode without event recording only re-arms
+        manager.check_zone(zone, 40.0, queue, now=_at(1004.0))
+        self.assertIsNone(manager.check_zone(zone, 60.0, queue, arm=False, now=_at(1005.0)))
+        self.assertFalse(zone.active)
+
+    def test_only_new_sessions_drive_io(self):
+        manager = EventSessionManager()
+        queue = Queue()
+        zone = Zone("global", "frame", 50.0, 45.0)
+        # Zone flickers around the thresholds: one clip, so the alarm IO fires once
+        frames = [(1000.0, 55.0), (1001.0, 40.0), (1002.0, 55.0), (1003.0, 40.0), (1004.0, 55.0)]
+        io = []
+        for i, (ts, temp) in enumerate(frames):
+            if manager.check_zone(zone, temp, queue, now=_at(ts)) == TRIGGER_NEW:
+                io.append(ts)
+            if i == 0:
+                manager.next_session(queue, post_seconds=5)
+        self.assertEqual(io, [1000.0])
+        self.assertEqual(len(manager.current.triggers), 3)
+
+        # After the clip closed, the next crossing is a new event again
+        manager.current.close_at(1010.0)
+        manager.check_zone(zone, 40.0, queue, now=_at(1011.0))
+        self.assertEqual(manager.check_zone(zone, 55.0, queue, now=_at(1012.0)), TRIGGER_NEW)
+
+
+if __name__ == "__main__":
+    unittest.main()
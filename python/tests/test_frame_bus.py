@@ -0,0 +1,104 @@
+import unittest
+import threading
+import time
+from tb_ir.frame import Frame
+from tb_ir.frame_bus import FrameBus
+from tb_ir.frame_pool import FramePool
+from tb_ir.acquisition import AcquisitionThread
+from tb_ir.acquisition_metrics import AcquisitionMetrics
+
+
+class _CountingCamera:
+    def __init__(self):
+        self.calls = 0
+
+    def get_frame(self):
+        self.calls += 1
+        time.sleep(0.005)
+        return Frame(image=f"img{self.calls}", temp=20.0 + self.calls)
+
+
+class Test_FrameBus(unittest.TestCase):
+    def test_every_subscriber_sees_each_frame_once(self):
+        bus = FrameBus()
+        sub_a = bus.subscribe(name="a", maxlen=10)
+        sub_b = bus.subscribe(name="b", maxlen=10)
+        for i in range(3):
+            bus.publish(Frame(image=f"img{i}", temp=float(i)))
+
+        seqs_a = [sub_a.get(timeout=0).seq for _ in range(3)]
+        seqs_b = [sub_b.get(timeout=0).seq for _ in range(3)]
+        self.assertEqual(seqs_a, [1, 2, 3])
+        self.assertEqual(seqs_b, [1, 2, 3])
+        self.assertIsNone(sub_a.get(timeout=0))
+
+    def test_latest_frame_subscriber_drops_old_frames(self):
+        bus = FrameBus()
+        sub = bus.subscribe(name="latest", maxlen=1)
+        for i in range(5):
+            bus.publish(Frame(image=f"img{i}", temp=float(i)))
+        self.assertEqual(sub.get(timeout=0).seq, 5)
+        self.assertEqual(sub.dropped, 4)
+        self.assertEqual(bus.latest().seq, 5)
+
+    def test_drop_newest_keeps_queued_frames(self):
+        bus = FrameBus()
+        sub = bus.subscribe(name="recorder", maxlen=2, overflow="drop_newest")
+        for i in range(5):
+            bus.publish(Frame(image=f"img{i}", temp=float(i)))
+        self.assertEqual([sub.get(timeout=0).seq for _ in range(2)], [1, 2])
+        self.assertEqual(sub.dropped, 3)
+
+    def test_get_wakes_up_on_publish(self):
+        bus = FrameBus()
+        sub = bus.subscribe(name="waiter")
+        received = []
+        t = threading.Thread(target=lambda: received.append(sub.get(timeout=2.0)))
+        t.start()
+        time.sleep(0.05)
+        bus.publish(Frame(image="img", temp=1.0))
+        t.join(timeout=2.0)
+        self.assertEqual(received[0].image, "img")
+
+    def test_acquisition_calls_camera_once_per_frame(self):
+        cam = _CountingCamera()
+        bus = FrameBus()
+        subs = [bus.subscribe(name=f"s{i}", maxlen=1000) for i in range(3)]
+        acq = AcquisitionThread(cam, bus)
+        acq.start()
+        time.sleep(0.1)
+        acq.stop()
+
+        self.assertEqual(acq.frames, cam.calls)
+        for sub in subs:
+            self.assertEqual(sub.pending(), cam.calls)
+
+    def test_pooled_frames_return_to_pool(self):
+        pool = FramePool((4, 4), (4, 4, 3), size=2)
+        bus = FrameBus()
+        sub = bus.subscribe(name="s", maxlen=1)
+        for _ in range(5):
+            frame = pool.acquire()
+            bus.publish(frame)
+            frame.release()
+        received = sub.get(timeout=0)
+        self.assertEqual(received.seq, 5)
+        received.release()
+        sub.close()
+        bus.close()
+        self.assertEqual(pool.available(), pool.size)
+        self.assertEqual(pool.misses, 0)
+
+    def test_metrics_classify_counter_gaps(self):
+        metrics = AcquisitionMetrics()
+        for counter, counter_hw in [(1, 1), (2, 2), (4, 5), (4, 5), (5, 6)]:
+            frame = Frame(image="img")
+            frame.counter, frame.counter_hw = counter, counter_hw
+            metrics.record_frame(frame, 0.003)
+        stats = metrics.snapshot()
+        self.assertEqual(stats["frames"], 5)
+        self.assertEqual(stats["duplicates"], 1)
+        self.assertEqual(stats["sensor_dropped"], 2)
+        self.assertEqual(stats["loop_dropped"], 1)
+        self.assertEqual(stats["link_dropped"], 1)
+        self.assertEqual(stats["sdk_call"]["count"], 5)
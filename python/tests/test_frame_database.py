@@ -0,0 +1,129 @@
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+from tb_ir.frame import Frame
+from tb_ir.frame_database import FrameDatabase
+
+
+class Test_FrameDatabaseRetention(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.db = FrameDatabase(os.path.join(self.dir, "frames.db"), max_rows=50, max_bytes=0, max_age_s=60)
+        now = time.time()
+        rows = [(now - 120 if i < 20 else now, b"\0" * 1024) for i in range(100)]
+        with self.db.conn:
+            self.db.conn.executemany("INSERT INTO frames (timestamp, image) VALUES (?, ?)", rows)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.dir)
+
+    def test_prune_keeps_newest_rows_within_limits(self):
+        self.db._prune(self.db.conn)
+        count, first = self.db.conn.execute("SELECT COUNT(*), MIN(id) FROM frames").fetchone()
+        self.assertEqual(count, 50)
+        self.assertEqual(first, 51)
+        self.assertEqual(self.db.writer_stats()["pruned"], 50)
+        self.assertEqual(self.db.conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+
+    def test_existing_database_is_not_vacuumed_on_open(self):
+        path = os.path.join(self.dir, "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE frames (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL, image BLOB)")
+        conn.execute("INSERT INTO frames (timestamp, image) VALUES (?, ?)", (time.time(), b""))
+        conn.commit()
+        conn.close()
+        db = FrameDatabase(path)
+        try:
+            self.assertEqual(db.conn.execute("PRAGMA auto_vacuum").fetchone()[0], 0)
+            self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM frames").fetchone()[0], 1)
+        finally:
+            db.close()
+
+    def test_snapshot_is_isolated_from_writer(self):
+        with self.db.snapshot() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM frames").fetchone()[0]
+            with self.db.conn:
+                self.db.conn.execute("INSERT INTO frames (timestamp, image) VALUES (?, ?)", (time.time(), b""))
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM frames").fetchone()[0], before)
+        with self.db.snapshot() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM frames").fetchone()[0], before + 1)
+
+
+class Test_FrameDatabaseEncodeStage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "frames.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_parallel_encode_keeps_queue_order(self):
+        db = FrameDatabase(self.path, encode_workers=3, encode_window=2, max_rows=0, max_bytes=0, max_age_s=0)
+        now = time.time()
+        for i in range(20):
+            db.insert_frame(Frame(image=np.full((16, 16, 3), i * 10, dtype=np.uint8), timestamp=now - 1 + i * 0.01))
+        db.close()
+        db = FrameDatabase(self.path)
+        stored = [ts for ts, _ in db.iter_frames(now - 2)]
+        db.close()
+        self.assertEqual(stored, [now - 1 + i * 0.01 for i in range(20)])
+
+
+class Test_FrameDatabaseRawStorage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "frames.db")
+        self.db = FrameDatabase(self.path, storage="raw", keyframe_interval=4, max_rows=0, max_bytes=0, max_age_s=0)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.dir)
+
+    def test_thermal_frames_round_trip(self):
+        rng = np.random.default_rng(1)
+        now = time.time()
+        thermals = [(7000 + rng.integers(0, 50, size=(12, 16))).astype(np.uint16) for _ in range(10)]
+        for i, thermal in enumerate(thermals):
+            self.db.insert_frame(Frame(thermal=thermal, timestamp=now - 1 + i * 0.01))
+        # close() lets the writer commit everything that is queued
+        self.db.close()
+        self.db = FrameDatabase(self.path, storage="raw")
+        result = self.db.get_thermal_from_last_n_seconds(5)
+        self.assertEqual(len(result), len(thermals))
+        for (_, decoded), thermal in zip(result, thermals):
+            np.testing.assert_array_equal(decoded, thermal)
+
+        # Starts inside a keyframe group and spans several read chunks
+        streamed = list(self.db.iter_thermal(now - 1 + 0.025, chunk_rows=3, workers=2))
+        self.assertEqual([ts for ts, _ in streamed], [ts for ts, _ in result[3:]])
+        for (_, decoded), thermal in zip(streamed, thermals[3:]):
+            np.testing.assert_array_equal(decoded, thermal)
+
+
+    def test_nearest_and_sampled_lookups(self):
+        thermals = [np.full((6, 8), 7000 + i, dtype=np.uint16) for i in range(20)]
+        for i, thermal in enumerate(thermals):
+            self.db.insert_frame(Frame(thermal=thermal, timestamp=1000.0 + i * 0.25))
+        self.db.close()
+        self.db = FrameDatabase(self.path, storage="raw")
+
+        timestamp, thermal = self.db.get_nearest_frame(1002.3, thermal=True)
+        self.assertEqual(timestamp, 1002.25)
+        np.testing.assert_array_equal(thermal, thermals[9])
+        self.assertIsNone(self.db.get_nearest_frame(1100.0, max_distance_s=1.0))
+
+        per_second = self.db.get_frames_sampled(1000.0, 1005.0, interval_s=1.0, thermal=True)
+        self.assertEqual([ts for ts, _ in per_second], [1000.0, 1001.0, 1002.0, 1003.0, 1004.0])
+        for ts, thermal in per_second:
+            np.testing.assert_array_equal(thermal, thermals[int((ts - 1000.0) * 4)])
+        every_third = self.db.get_frames_sampled(1000.0, 1005.0, every=3)
+        self.assertEqual([ts for ts, _ in every_third], [1000.0 + i * 0.75 for i in range(7)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from tb_ir.mjpeg_avi import MjpegAviWriter, jpeg_size
+
+
+class Test_MjpegAviWriter(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_encoded_and_passthrough_frames_are_readable(self):
+        path = os.path.join(self.dir, "clip.avi")
+        images = [np.full((48, 64, 3), 40 * i, dtype=np.uint8) for i in range(6)]
+        writer = MjpegAviWriter(path, 64, 48, fps=32)
+        for image in images[:3]:
+            writer.write(image)
+        for image in images[3:]:
+            jpeg = cv2.imencode(".jpg", image)[1].tobytes()
+            self.assertEqual(jpeg_size(jpeg), (64, 48))
+            writer.write_jpeg(jpeg)
+        writer.close()
+
+        cap = cv2.VideoCapture(path)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 6)
+        self.assertAlmostEqual(cap.get(cv2.CAP_PROP_FPS), 32.0)
+        for image in images:
+            ok, frame = cap.read()
+            self.assertTrue(ok)
+            self.assertLessEqual(abs(int(frame[0, 0, 0]) - int(image[0, 0, 0])), 2)
+        cap.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from tb_ir.frame import Frame
+from tb_ir.palette import Colouriser, palette_colors
+from tb_ir.thermal_stats import celsius_to_raw
+
+
+class Test_Colouriser(unittest.TestCase):
+    def test_lookup_matches_direct_mapping(self):
+        thermal = np.array([[1200, 1250], [1300, 1400]], dtype=np.uint16)
+        colouriser = Colouriser(palette="grey", span_c=(20.0, 30.0))
+        image = colouriser.render(Frame(thermal=thermal))
+        self.assertEqual(image.shape, (2, 2, 3))
+        self.assertEqual(image[0, 0].tolist(), [0, 0, 0])
+        self.assertEqual(image[0, 1].tolist(), [127, 127, 127])
+        self.assertEqual(image[1, 1].tolist(), [255, 255, 255])  # above span clamps
+        self.assertEqual(palette_colors("ironbow").shape, (256, 3))
+
+    def test_lut_rebuilt_only_beyond_tolerance(self):
+        colouriser = Colouriser(tolerance_c=1.0)
+        thermal = np.full((4, 4), celsius_to_raw(20.0), dtype=np.uint16)
+        thermal[0, 0] = celsius_to_raw(40.0)
+        out = np.empty((4, 4, 3), dtype=np.uint8)
+        colouriser.render(Frame(thermal=thermal), out)
+        thermal[0, 0] = celsius_to_raw(40.5)
+        colouriser.render(Frame(thermal=thermal), out)
+        self.assertEqual(colouriser.rebuilds, 1)
+        thermal[0, 0] = celsius_to_raw(45.0)
+        colouriser.render(Frame(thermal=thermal), out)
+        self.assertEqual(colouriser.rebuilds, 2)
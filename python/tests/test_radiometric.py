@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from tb_ir.frame import Frame
+from tb_ir.radiometric import RadiometricWriter, RadiometricRecording
+from tb_ir.thermal_stats import raw_to_celsius
+
+
+class Test_RadiometricRecording(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "clip.tbr")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_frames_and_metadata_map_back(self):
+        writer = RadiometricWriter(self.path, 16, 12, fps=32)
+        thermals = [np.arange(12 * 16, dtype=np.uint16).reshape(12, 16) + 1000 * i for i in range(5)]
+        for i, thermal in enumerate(thermals):
+            frame = Frame(thermal=thermal, timestamp=100.0 + i * 0.1)
+            frame.counter = i
+            writer.write_frame(frame)
+        writer.set_fps(10.0)
+        writer.close()
+
+        recording = RadiometricRecording(self.path)
+        self.assertTrue(recording.complete)
+        self.assertIsInstance(recording.thermal, np.memmap)
+        self.assertEqual(recording.thermal.shape, (5, 12, 16))
+        self.assertTrue(recording.thermal.flags.c_contiguous)
+        self.assertEqual(recording.fps, 10.0)
+        np.testing.assert_array_equal(recording.thermal[3], thermals[3])
+        np.testing.assert_allclose(recording.metadata["timestamp"], [100.0 + i * 0.1 for i in range(5)])
+        np.testing.assert_array_equal(recording.metadata["counter"], np.arange(5))
+        np.testing.assert_allclose(recording.celsius(2), raw_to_celsius(thermals[2].astype(np.float64)))
+
+    def test_incomplete_last_record_is_ignored(self):
+        writer = RadiometricWriter(self.path, 4, 3)
+        for i in range(3):
+            writer.append(np.full((3, 4), i, dtype=np.uint16))
+        # No close(): as after a crash, with half a record at the end
+        writer._file.write(b"\0" * 10)
+        writer._file.flush()
+        recording = RadiometricRecording(self.path)
+        self.assertFalse(recording.complete)
+        self.assertEqual(len(recording), 3)
+        self.assertEqual(int(recording.thermal[2, 0, 0]), 2)
+        np.testing.assert_allclose(np.diff(recording.metadata["timestamp"]), 1 / 32)
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
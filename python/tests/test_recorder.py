@@ -0,0 +1,71 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import cv2
+import numpy as np
+from tb_ir.frame import Frame
+from tb_ir.frame_bus import FrameBus
+from tb_ir.radiometric import RadiometricRecording
+from tb_ir.recorder import BusRecorder
+
+
+class Test_BusRecorder(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, "clip.avi")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_container_rate_is_measured_capture_rate(self):
+        bus = FrameBus()
+        recorder = BusRecorder(bus, self.filename, queue_frames=64)
+        result = []
+        t = threading.Thread(target=lambda: result.append(recorder.record(1.85)))
+        t.start()
+        time.sleep(0.1)
+        # 10 fps capture, counter 5 delivered twice by the SDK
+        for i, counter in enumerate([0, 1, 2, 3, 4, 5, 5] + list(range(6, 25))):
+            frame = Frame(image=np.full((8, 8, 3), counter * 10, dtype=np.uint8))
+            frame.counter = counter
+            bus.publish(frame, timestamp=1000.0 + counter * 0.1 + (0.01 if i == 6 else 0.0))
+        t.join(timeout=5.0)
+
+        self.assertEqual(result, [19])
+        stats = recorder.stats()
+        self.assertEqual(stats["duplicates"], 1)
+        self.assertAlmostEqual(stats["capture_fps"], 10.0)
+        cap = cv2.VideoCapture(self.filename)
+        self.assertAlmostEqual(cap.get(cv2.CAP_PROP_FPS), 10.0, places=2)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 19)
+        cap.release()
+
+    def test_radiometric_only_recording_never_renders(self):
+        bus = FrameBus()
+        raw_filename = os.path.join(self.dir, "clip.tbr")
+        recorder = BusRecorder(bus, None, raw_filename=raw_filename)
+        rendered = []
+        result = []
+        t = threading.Thread(target=lambda: result.append(recorder.record(0.95)))
+        t.start()
+        time.sleep(0.1)
+        for i in range(12):
+            frame = Frame(thermal=np.full((6, 8), 7000 + i, dtype=np.uint16))
+            frame.defer_image(lambda f, out: rendered.append(f))
+            bus.publish(frame, timestamp=1000.0 + i * 0.1)
+        t.join(timeout=5.0)
+
+        self.assertEqual(result, [10])
+        self.assertEqual(rendered, [])
+        self.assertFalse(os.path.exists(self.filename))
+        recording = RadiometricRecording(raw_filename)
+        self.assertEqual(len(recording), 10)
+        self.assertAlmostEqual(recording.fps, 10.0)
+        self.assertEqual(int(recording.thermal[9, 0, 0]), 7009)
+
+
+if __name__ == "__main__":
+    unittest.main()
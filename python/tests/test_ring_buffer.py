@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from tb_ir.ring_buffer import FrameRingBuffer
+from tb_ir.persistent_ring import PersistentFrameRing
+
+
+class Test_FrameRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.ring = FrameRingBuffer(capacity=5)
+        for i in range(8):
+            self.ring.append(np.full((2, 3), i, dtype=np.uint16), float(i))
+
+    def test_window_returns_views_oldest_first(self):
+        segments = self.ring.window(4.0, 7.0)
+        values = [int(f[0, 0]) for frames, _, _ in segments for f in frames]
+        self.assertEqual(values, [4, 5, 6])
+        for frames, _, _ in segments:
+            self.assertTrue(np.shares_memory(frames, self.ring.data))
+        self.assertEqual(len(self.ring), 5)
+
+    def test_frame_rate_of_buffered_frames(self):
+        self.assertAlmostEqual(self.ring.frame_rate(), 1.0)
+        self.assertIsNone(FrameRingBuffer(capacity=5).frame_rate())
+
+    def test_iter_window_skips_overwritten_frames(self):
+        frames = self.ring.iter_window(0.0)
+        first, ts = next(frames)
+        self.assertEqual((int(first[0, 0]), ts), (3, 3.0))
+        # Writer laps the reader: frames 3 and 4 are overwritten by 8 and 9
+        for i in range(8, 10):
+            self.ring.append(np.full((2, 3), i, dtype=np.uint16), float(i))
+        rest = [ts for _, ts in frames]
+        self.assertEqual(rest, [5.0, 6.0, 7.0])
+        self.assertEqual(self.ring.overruns, 1)
+
+
+class Test_PersistentFrameRing(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "pre_event.ring")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_reopen_keeps_frames_and_cursor(self):
+        ring = PersistentFrameRing(self.path, capacity=5)
+        for i in range(8):
+            ring.append(np.full((2, 3), i, dtype=np.uint16), float(i))
+        ring.close()
+
+        ring = PersistentFrameRing(self.path, capacity=5)
+        self.assertEqual([ts for _, ts in ring.iter_window(0.0)], [3.0, 4.0, 5.0, 6.0, 7.0])
+        ring.append(np.full((2, 3), 8, dtype=np.uint16), 8.0)
+        self.assertEqual([int(f[0, 0]) for f, _ in ring.iter_window(6.0)], [6, 7, 8])
+        ring.close()
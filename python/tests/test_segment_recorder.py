@@ -0,0 +1,83 @@
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import cv2
+import numpy as np
+from tb_ir.frame import Frame
+from tb_ir.frame_bus import FrameBus
+from tb_ir.frame_database import FrameDatabase
+from tb_ir.segment_recorder import SegmentRecorder
+from tb_ir.anomaly_clip import write_segment_clip
+
+
+class Test_SegmentRecorder(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_clip_is_cut_from_indexed_segments(self):
+        bus = FrameBus()
+        segments = SegmentRecorder(bus, self.dir / "segments", segment_seconds=1.0)
+        segments.start()
+        base = time.time() - 10
+        # 10 fps capture, grey level encodes the frame number
+        for i in range(40):
+            bus.publish(Frame(image=np.full((24, 32, 3), i * 6, dtype=np.uint8)), timestamp=base + i * 0.1)
+        segments.stop()
+
+        self.assertEqual(segments.segments, 4)
+        self.assertAlmostEqual(segments.covered_until(), base + 3.9)
+        self.assertEqual(len(list((self.dir / "segments").glob("segment_*.avi"))), 4)
+
+        # Spans the rollover between the first and the second segment
+        clip = self.dir / "clip.avi"
+        count = write_segment_clip(segments, clip, base + 0.5, end=base + 2.5)
+        self.assertEqual(count, 20)
+        cap = cv2.VideoCapture(str(clip))
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 20)
+        self.assertAlmostEqual(cap.get(cv2.CAP_PROP_FPS), 10.0, places=2)
+        ok, image = cap.read()
+        cap.release()
+        self.assertTrue(ok)
+        self.assertLessEqual(abs(int(image.mean()) - 5 * 6), 2)
+        segments.close()
+
+    def test_segments_reuse_the_database_jpegs(self):
+        db = FrameDatabase(str(self.dir / "frames.db"), max_rows=0, max_bytes=0, max_age_s=0)
+        segments = SegmentRecorder(FrameBus(), self.dir / "segments", segment_seconds=1.0, jpeg_source=db)
+        segments.start()
+        base = time.time() - 10
+        for i in range(25):
+            db.insert_frame(Frame(image=np.full((24, 32, 3), i * 8, dtype=np.uint8), timestamp=base + i * 0.1))
+            time.sleep(0.005)
+        db.close()
+        segments.stop()
+
+        self.assertEqual(segments.stats()["dropped"], 0)
+        self.assertEqual(segments.segments, 3)
+        self.assertAlmostEqual(segments.covered_until(), base + 2.4)
+        clip = self.dir / "clip.avi"
+        self.assertEqual(write_segment_clip(segments, clip, base + 0.5, end=base + 1.5), 10)
+        cap = cv2.VideoCapture(str(clip))
+        ok, image = cap.read()
+        cap.release()
+        self.assertTrue(ok)
+        self.assertEqual(image.shape[:2], (24, 32))
+        self.assertLessEqual(abs(int(image.mean()) - 5 * 8), 2)
+        segments.close()
+
+    def test_jpeg_source_requires_jpeg_storage(self):
+        db = FrameDatabase(str(self.dir / "frames.db"), storage="raw")
+        try:
+            with self.assertRaises(ValueError):
+                SegmentRecorder(FrameBus(), self.dir / "segments", jpeg_source=db).start()
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
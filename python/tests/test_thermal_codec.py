@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from tb_ir.thermal_codec import ThermalEncoder, encode_delta, decode_delta, decode_keyframe
+
+
+class Test_ThermalCodec(unittest.TestCase):
+    def test_delta_is_lossless_across_wraparound(self):
+        key = np.array([[0, 65535, 1, 32768], [7000, 7000, 7000, 7000]], dtype=np.uint16)
+        frame = np.array([[65535, 0, 32768, 1], [7001, 6999, 7000, 7100]], dtype=np.uint16)
+        np.testing.assert_array_equal(decode_delta(encode_delta(frame, key), frame.shape, key), frame)
+
+    def test_encoder_inserts_keyframes(self):
+        rng = np.random.default_rng(0)
+        frames = [(7000 + rng.integers(0, 20, size=(24, 32))).astype(np.uint16) for _ in range(7)]
+        encoder = ThermalEncoder(keyframe_interval=3)
+        decoded, kinds = [], []
+        for frame in frames:
+            is_key, blob = encoder.encode(frame)
+            kinds.append(is_key)
+            if is_key:
+                key = decode_keyframe(blob, frame.shape)
+                decoded.append(key)
+            else:
+                decoded.append(decode_delta(blob, frame.shape, key))
+        self.assertEqual(kinds, [True, False, False, True, False, False, True])
+        for frame, result in zip(frames, decoded):
+            np.testing.assert_array_equal(result, frame)
+        self.assertLess(encoder.encoded_bytes, encoder.raw_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
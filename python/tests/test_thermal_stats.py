@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from tb_ir.thermal_stats import ThermalStatsEngine, celsius_to_raw, raw_to_celsius, parse_metric
+
+
+class Test_ThermalStats(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.thermal = rng.integers(1200, 1300, size=(60, 80), dtype=np.uint16)
+        self.thermal[12, 34] = celsius_to_raw(80.0)  # small hot spot
+        self.engine = ThermalStatsEngine(percentiles=(50, 99))
+
+    def test_matches_numpy_reference(self):
+        stats = self.engine.compute(self.thermal)
+        self.assertAlmostEqual(stats.min, raw_to_celsius(int(self.thermal.min())))
+        self.assertAlmostEqual(stats.max, 80.0)
+        self.assertAlmostEqual(stats.mean, raw_to_celsius(self.thermal.mean()), places=6)
+        for q in (50, 99):
+            expected = raw_to_celsius(int(np.percentile(self.thermal, q, method="inverted_cdf")))
+            self.assertAlmostEqual(stats.value(f"p{q}"), expected)
+        self.assertEqual(stats.argmax, (12, 34))
+
+    def test_hot_spot_visible_in_max_not_in_mean(self):
+        stats = self.engine.compute(self.thermal)
+        self.assertGreater(stats.value("max"), 50.0)
+        self.assertLess(stats.value("mean"), 50.0)
+
+    def test_mask_restricts_pixels(self):
+        mask = np.zeros(self.thermal.shape, dtype=np.uint8)
+        mask[:10, :10] = 1
+        stats = self.engine.compute(self.thermal, mask)
+        self.assertEqual(stats.count, 100)
+        self.assertAlmostEqual(stats.max, raw_to_celsius(int(self.thermal[:10, :10].max())))
+        self.assertIsNone(self.engine.compute(self.thermal, np.zeros_like(mask)))
+
+    def test_parse_metric(self):
+        self.assertIsNone(parse_metric("max"))
+        self.assertEqual(parse_metric("p99.5"), 99.5)
+        with self.assertRaises(ValueError):
+            parse_metric("median")
@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from tb_ir.frame import Frame
+from tb_ir.thermal_stats import ThermalStatsEngine, celsius_to_raw, raw_to_celsius
+from tb_ir.zones import ZoneSet, GLOBAL_ZONE_ID
+
+
+class Test_Zones(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        thermal = rng.integers(1200, 1300, size=(60, 80), dtype=np.uint16)
+        thermal[40, 70] = celsius_to_raw(90.0)
+        self.frame = Frame(thermal=thermal)
+        self.frame.stats = ThermalStatsEngine().compute(thermal)
+
+    def test_rect_and_polygon_match_numpy(self):
+        configs = [
+            {"id": "left", "rect": [0, 0, 20, 30], "metric": "mean"},
+            {"id": "tri", "polygon": [[50, 20], [79, 20], [79, 59]], "metric": "mean"},
+            {"id": "tri_max", "polygon": [[50, 20], [79, 20], [79, 59]], "metric": "max"},
+        ]
+        zone_set = ZoneSet.from_config(configs, self.frame.thermal.shape, 50.0, 45.0)
+        values = {zone.id: value for zone, value in zone_set.evaluate(self.frame)}
+
+        thermal = self.frame.thermal
+        self.assertAlmostEqual(values["left"], raw_to_celsius(thermal[:30, :20].mean()), places=6)
+        tri = zone_set.zones[1]
+        y0, y1, x0, x1 = tri.bbox
+        pixels = thermal[y0:y1, x0:x1][tri.mask.astype(bool)]
+        self.assertAlmostEqual(values["tri"], raw_to_celsius(pixels.mean()), places=6)
+        self.assertAlmostEqual(values["tri_max"], raw_to_celsius(int(pixels.max())))
+
+    def test_hysteresis_defaults_and_global_zone(self):
+        zone_set = ZoneSet.from_config([{"id": "a", "rect": [0, 0, 5, 5], "start_threshold": 60}],
+                                       self.frame.thermal.shape, 50.0, 45.0)
+        self.assertEqual(zone_set.zones[0].stop_threshold, 55.0)
+
+        fallback = ZoneSet.from_config([{"id": "bad"}], self.frame.thermal.shape, 50.0, 45.0)
+        (zone, value), = fallback.evaluate(self.frame)
+        self.assertEqual(zone.id, GLOBAL_ZONE_ID)
+        self.assertAlmostEqual(value, 90.0)
+
+    def test_apply_defaults_keeps_explicit_thresholds_and_state(self):
+        configs = [{"id": "a", "rect": [0, 0, 5, 5], "start_threshold": 60},
+                   {"id": "b", "rect": [5, 5, 5, 5], "start_threshold": 70, "stop_threshold": 65}]
+        zone_set = ZoneSet.from_config(configs, self.frame.thermal.shape, 50.0, 45.0)
+        zone_set.zones[0].active = True
+        zone_set.apply_defaults(50.0, 40.0)
+        a, b = zone_set.zones
+        self.assertEqual((a.start_threshold, a.stop_threshold), (60.0, 50.0))
+        self.assertEqual((b.start_threshold, b.stop_threshold), (70.0, 65.0))
+        self.assertTrue(a.active)
+
+        fallback = ZoneSet.from_config([], self.frame.thermal.shape, 50.0, 45.0)
+        fallback.apply_defaults(80.0, 75.0, "mean")
+        zone = fallback.zones[0]
+        self.assertEqual((zone.start_threshold, zone.stop_threshold, zone.metric), (80.0, 75.0, "mean"))